@@ -0,0 +1,187 @@
+"""
+Local stand-ins for the services the backend depends on, for benchmarks.
+
+- create_fake_deepseek_app(): an OpenAI-compatible chat completions
+  endpoint with configurable latency, error rate and canned JSON answers
+  (for the quality, greenwashing, fused and batch prompts), served in
+  plain or streaming mode depending on the request.
+- FakeTranscriptApi: a drop-in for YouTubeTranscriptApi.list() with
+  configurable transcript sizes, latency and failure modes. Outcomes are
+  derived from the video id, so every run sees the same mix.
+"""
+
+import asyncio
+import json
+import random
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from youtube_transcript_api import TranscriptsDisabled, VideoUnavailable
+
+from benchmarks.heuristics import make_transcript
+
+# ============================================
+# FAKE DEEPSEEK
+# ============================================
+
+QUALITY_ANSWER = {
+    "relevance_score": 78,
+    "quality_score": 71,
+    "content_depth_score": 64,
+    "reason": "Covers the topic with some supporting detail",
+    "flags": [],
+}
+
+GREENWASHING_ANSWER = {
+    "transparency_score": 58,
+    "flags": [{"type": "warning", "text": "Vague environmental claims", "evidence": ""}],
+}
+
+
+@dataclass
+class FakeDeepSeekConfig:
+    latency_ms: float = 400.0
+    jitter_ms: float = 100.0
+    error_rate: float = 0.0       # fraction of calls answered with a 500
+    rate_limit_rate: float = 0.0  # fraction answered with a 429
+    chunk_chars: int = 12         # characters per streamed delta
+    seed: int = 0
+
+
+def canned_answer(prompt: str) -> Dict[str, Any]:
+    """A valid answer for whichever prompt template produced `prompt`"""
+    if '"results"' in prompt:
+        count = prompt.count("VIDEO ")
+        return {"results": [{"id": i, **QUALITY_ANSWER} for i in range(count)]}
+    if '"quality": {' in prompt:
+        return {"quality": QUALITY_ANSWER, "greenwashing": GREENWASHING_ANSWER}
+    return {**QUALITY_ANSWER, **GREENWASHING_ANSWER, "flags": []}
+
+
+def create_fake_deepseek_app(config: FakeDeepSeekConfig) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(config.seed)
+    counters = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    @app.get("/stats")
+    async def stats():
+        return counters
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counters["requests"] += 1
+        prompt = body["messages"][-1]["content"]
+
+        roll = rng.random()
+        if roll < config.rate_limit_rate:
+            counters["rate_limited"] += 1
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "0.2"})
+        if roll < config.rate_limit_rate + config.error_rate:
+            counters["errors"] += 1
+            return JSONResponse({"error": "upstream failure"}, status_code=500)
+
+        latency = max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+        content = json.dumps(canned_answer(prompt))
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4,
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return {
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                "usage": usage,
+            }
+
+        async def stream():
+            # Time to first token is most of the latency; the rest is spread over the chunks
+            chunks = [content[i:i + config.chunk_chars] for i in range(0, len(content), config.chunk_chars)]
+            await asyncio.sleep(latency * 0.6)
+            per_chunk = latency * 0.4 / max(1, len(chunks))
+            for chunk in chunks:
+                yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': {'content': chunk}}]})}\n\n"
+                await asyncio.sleep(per_chunk)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+# ============================================
+# FAKE TRANSCRIPT PROVIDER
+# ============================================
+
+@dataclass
+class FakeTranscriptConfig:
+    sizes: Sequence[int] = (2_000, 10_000, 40_000)  # transcript characters, picked per video
+    latency_ms: float = 150.0
+    disabled_rate: float = 0.1     # TranscriptsDisabled (cached as a negative entry)
+    unavailable_rate: float = 0.02  # VideoUnavailable
+    transient_rate: float = 0.02    # network-style error (not cached)
+
+
+@dataclass
+class FakeSnippet:
+    text: str
+    start: float
+    duration: float
+
+
+@dataclass
+class FakeTrack:
+    video_id: str
+    size: int
+    latency: float
+    language_code: str = "en"
+    is_generated: bool = False
+    translation_languages: List[Any] = field(default_factory=list)
+
+    def fetch(self) -> List[FakeSnippet]:
+        time.sleep(self.latency)
+        words = make_transcript(self.size, seed=zlib.crc32(self.video_id.encode())).split()
+        return [
+            FakeSnippet(" ".join(words[i:i + 12]), start=i * 0.4, duration=4.8)
+            for i in range(0, len(words), 12)
+        ]
+
+
+class FakeTranscriptApi:
+    """Blocking, like the real client (the backend runs it on its fetch pool)"""
+
+    def __init__(self, config: FakeTranscriptConfig):
+        self.config = config
+
+    def _roll(self, video_id: str) -> float:
+        return (zlib.crc32(video_id.encode()) % 10_000) / 10_000
+
+    def list(self, video_id: str) -> List[FakeTrack]:
+        config = self.config
+        time.sleep(config.latency_ms / 2000)  # listing is about half a fetch
+
+        roll = self._roll(video_id)
+        if roll < config.disabled_rate:
+            raise TranscriptsDisabled(video_id)
+        roll -= config.disabled_rate
+        if roll < config.unavailable_rate:
+            raise VideoUnavailable(video_id)
+        roll -= config.unavailable_rate
+        if roll < config.transient_rate:
+            raise ConnectionError("simulated network failure")
+
+        size = config.sizes[zlib.crc32(video_id.encode(), 1) % len(config.sizes)]
+        return [FakeTrack(video_id, size, latency=config.latency_ms / 2000)]
+
+
+def install_fake_transcripts(main_module, config: Optional[FakeTranscriptConfig] = None) -> None:
+    """Point the backend's transcript client at a FakeTranscriptApi"""
+    fake = FakeTranscriptApi(config or FakeTranscriptConfig())
+    main_module._get_transcript_api = lambda: fake
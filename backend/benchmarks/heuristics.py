@@ -0,0 +1,314 @@
+"""
+Microbenchmark: heuristic scorers vs. the pre-KeywordMatcher implementation.
+
+Checks that results are identical and reports the per-call time of the
+quality heuristic, the greenwashing heuristic and the sustainability gate
+on synthetic transcripts of increasing size.
+
+Also compares ranking a large candidate pool with score_quality_bulk
+against one score_quality_heuristic call per video.
+
+Run from backend/:  python -m benchmarks.heuristics
+"""
+
+import random
+import statistics
+import time
+from typing import Any, Dict, Optional
+
+import main
+from main import SUSTAINABILITY_KEYWORDS, GREENWASH_SIGNALS, EVIDENCE_SIGNALS
+
+# ============================================
+# BASELINE (per-list substring scans)
+# ============================================
+
+def legacy_score_quality_heuristic(
+    title: str,
+    description: str,
+    transcript: Optional[str],
+    channel: str,
+    subs: int,
+    query: str
+) -> Dict[str, Any]:
+    """Heuristic-based quality scoring fallback"""
+    
+    title_lower = title.lower()
+    desc_lower = (description or "").lower()
+    query_lower = query.lower()
+    full_text = f"{title_lower} {desc_lower}"
+    
+    # Relevance scoring
+    relevance_score = 0.5  # Base
+    query_words = query_lower.split()
+    
+    # Check title match
+    title_matches = sum(1 for word in query_words if word in title_lower and len(word) > 2)
+    if title_matches > 0:
+        relevance_score += min(0.3, title_matches * 0.1)
+    
+    # Check description match
+    desc_matches = sum(1 for word in query_words if word in desc_lower and len(word) > 2)
+    if desc_matches > 0:
+        relevance_score += min(0.2, desc_matches * 0.05)
+    
+    # Quality scoring
+    quality_score = 0.5  # Base
+    flags = []
+    
+    # Positive signals
+    if subs > 1000:
+        quality_score += 0.1
+        flags.append("Established channel")
+    
+    if len(description or "") > 200:
+        quality_score += 0.1
+        flags.append("Detailed description")
+    
+    # Negative signals (clickbait)
+    clickbait_patterns = [
+        'you won\'t believe', 'shocking', 'insane', '!!!',
+        'gone wrong', 'exposed', 'clickbait', '😱', '🤯'
+    ]
+    
+    clickbait_count = sum(1 for p in clickbait_patterns if p in full_text)
+    if clickbait_count > 0:
+        quality_score -= min(0.2, clickbait_count * 0.1)
+        flags.append(f"Potential clickbait ({clickbait_count} indicators)")
+    
+    # ALL CAPS title
+    if title.isupper() and len(title) > 10:
+        quality_score -= 0.1
+        flags.append("ALL CAPS title")
+    
+    # Content depth from transcript
+    content_depth = None
+    if transcript and len(transcript) > 500:
+        content_depth = 0.5
+        
+        # Longer transcript = more depth
+        if len(transcript) > 2000:
+            content_depth += 0.2
+        if len(transcript) > 5000:
+            content_depth += 0.1
+        
+        # Educational indicators
+        edu_terms = ['research', 'study', 'data', 'evidence', 'according to', 'explains']
+        edu_count = sum(1 for t in edu_terms if t in transcript.lower())
+        if edu_count >= 2:
+            content_depth += 0.2
+            flags.append("Contains educational content")
+    
+    # Clamp scores
+    relevance_score = max(0, min(1, relevance_score))
+    quality_score = max(0, min(1, quality_score))
+    if content_depth:
+        content_depth = max(0, min(1, content_depth))
+    
+    # Combined score
+    combined = relevance_score * 0.4 + quality_score * 0.4
+    if content_depth:
+        combined = relevance_score * 0.3 + quality_score * 0.3 + content_depth * 0.4
+    
+    return {
+        "relevance_score": round(relevance_score, 2),
+        "quality_score": round(quality_score, 2),
+        "content_depth_score": round(content_depth, 2) if content_depth else None,
+        "combined_score": round(combined, 2),
+        "reason": "Heuristic analysis based on title, description, and transcript patterns",
+        "flags": flags,
+        "method": "heuristic-transcript" if transcript else "heuristic"
+    }
+
+def legacy_detect_greenwashing_heuristic(
+    title: str,
+    description: str,
+    transcript: Optional[str],
+    subs: int
+) -> Dict[str, Any]:
+    """Heuristic-based greenwashing detection"""
+    
+    full_text = f"{title} {description or ''} {transcript or ''}".lower()
+    
+    flags = []
+    risk_score = 0
+    
+    # Count signals
+    vague_count = sum(1 for s in GREENWASH_SIGNALS if s in full_text)
+    evidence_count = sum(1 for s in EVIDENCE_SIGNALS if s in full_text)
+    
+    # Vague terms without evidence
+    if vague_count > 0 and evidence_count == 0:
+        risk_score += 40
+        flags.append({
+            "type": "warning",
+            "text": f"Found {vague_count} vague sustainability term(s) without evidence"
+        })
+    elif vague_count > evidence_count * 2:
+        risk_score += 25
+        flags.append({
+            "type": "warning",
+            "text": f"More vague claims ({vague_count}) than evidence ({evidence_count})"
+        })
+    
+    # Large channel making sustainability claims
+    if subs > 1000000 and vague_count > 0:
+        risk_score += 20
+        flags.append({
+            "type": "risk",
+            "text": "Large channel making sustainability claims - verify independence"
+        })
+    
+    # Positive signals
+    if evidence_count >= 2:
+        flags.append({
+            "type": "positive",
+            "text": "Contains evidence-based language"
+        })
+        risk_score -= 15
+    
+    # Missing metrics
+    has_numbers = any(c.isdigit() for c in full_text)
+    if vague_count > 0 and not has_numbers:
+        risk_score += 15
+        flags.append({
+            "type": "warning",
+            "text": "Sustainability claims without specific metrics"
+        })
+    
+    # Calculate transparency score (inverse of risk)
+    transparency_score = max(0, min(100, 100 - risk_score))
+    
+    # Risk level
+    risk_level = "low"
+    if transparency_score < 40:
+        risk_level = "high"
+    elif transparency_score < 70:
+        risk_level = "medium"
+    
+    return {
+        "transparency_score": transparency_score,
+        "risk_level": risk_level,
+        "flags": flags,
+        "method": "heuristic"
+    }
+
+def legacy_is_sustainability(title: str, description: str) -> bool:
+    full_text = f"{title} {description or ''}".lower()
+    return any(kw in full_text for kw in SUSTAINABILITY_KEYWORDS)
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+FILLER = (
+    "so today we are going to look at how the grid works and what it means for "
+    "households across the region because honestly nobody explains this well "
+).split()
+
+def make_transcript(chars: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < chars:
+        word = rng.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    # A few signal terms near the end, where head-truncation never looks
+    words += ["according", "to", "peer-reviewed", "research", "the", "green", "claims", "hold"]
+    return " ".join(words)
+
+def time_call(fn, repeat: int = 30) -> float:
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def run() -> Dict[str, Any]:
+    title = "Is Green Energy Actually Clean? Climate Myths Explained"
+    description = "We look at eco-friendly claims, carbon offsetting and what the data shows. " * 3
+    results = {}
+
+    for size in (10_000, 50_000, 200_000):
+        base = make_transcript(size)
+
+        def fresh(i: int) -> str:
+            # Different text every round, so the matcher's per-document memo
+            # only helps within a round (as it does within one request)
+            return f"{base} {i}"
+
+        args = dict(title=title, description=description, channel="c", subs=5000, query="green energy")
+        assert legacy_score_quality_heuristic(transcript=base, **args) == main.score_quality_heuristic(transcript=base, **args)
+        assert (
+            legacy_detect_greenwashing_heuristic(title, description, base, 2_000_000)
+            == main.detect_greenwashing_heuristic(title, description, base, 2_000_000)
+        )
+        assert legacy_is_sustainability(title, description) == main.is_sustainability_content(title, description)
+
+        def legacy_all(i: int):
+            transcript = fresh(i)
+            legacy_is_sustainability(title, description)
+            legacy_score_quality_heuristic(transcript=transcript, **args)
+            legacy_detect_greenwashing_heuristic(title, description, transcript, 2_000_000)
+
+        def current_all(i: int):
+            transcript = fresh(i)
+            main.is_sustainability_content(title, description)
+            main.score_quality_heuristic(transcript=transcript, **args)
+            main.detect_greenwashing_heuristic(title, description, transcript, 2_000_000)
+
+        legacy_ms = time_call(legacy_all)
+        current_ms = time_call(current_all)
+        results[size] = {
+            "legacy_ms": round(legacy_ms, 3),
+            "current_ms": round(current_ms, 3),
+            "speedup": round(legacy_ms / current_ms, 2) if current_ms else None,
+        }
+
+    return results
+
+def run_bulk(pool_size: int = 5000) -> Dict[str, Any]:
+    rng = random.Random(1)
+    words = FILLER + ["green", "energy", "SHOCKING", "insane", "!!!", "research", "study"]
+    titles = [" ".join(rng.choice(words) for _ in range(rng.randint(3, 12))) for _ in range(pool_size)]
+    titles = [t.upper() if rng.random() < 0.05 else t for t in titles]
+    descriptions = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 60))) for _ in range(pool_size)]
+    subs = [rng.choice([0, 800, 5000, 250_000]) for _ in range(pool_size)]
+    transcripts = [make_transcript(rng.choice([0, 400, 3000, 8000]), seed=i) if i % 3 else None for i in range(pool_size)]
+
+    def scalar():
+        return [
+            main.score_quality_heuristic(titles[i], descriptions[i], transcripts[i], "", subs[i], "green energy")
+            for i in range(pool_size)
+        ]
+
+    def bulk():
+        return main.score_quality_bulk(titles, descriptions, subs, "green energy", transcripts=transcripts)
+
+    expected = scalar()
+    arrays = bulk()
+    for i, row in enumerate(expected):
+        for field in ("relevance_score", "quality_score", "combined_score"):
+            assert row[field] == arrays[field][i], (i, field)
+        depth = arrays["content_depth_score"][i]
+        assert row["content_depth_score"] == (None if depth != depth else depth), (i, "content_depth_score")
+
+    scalar_ms = time_call(lambda i: scalar(), repeat=5)
+    bulk_ms = time_call(lambda i: bulk(), repeat=5)
+    return {
+        "pool_size": pool_size,
+        "scalar_ms": round(scalar_ms, 2),
+        "bulk_ms": round(bulk_ms, 2),
+        "speedup": round(scalar_ms / bulk_ms, 2) if bulk_ms else None,
+    }
+
+if __name__ == "__main__":
+    print(f"{'transcript chars':>16}  {'legacy ms':>10}  {'current ms':>10}  {'speedup':>8}")
+    for size, row in run().items():
+        print(f"{size:>16}  {row['legacy_ms']:>10}  {row['current_ms']:>10}  {row['speedup']:>7}x")
+    if main.load_numpy() is not None:
+        row = run_bulk()
+        print(f"\nbulk ranking of {row['pool_size']} candidates: scalar {row['scalar_ms']} ms, "
+              f"bulk {row['bulk_ms']} ms ({row['speedup']}x)")
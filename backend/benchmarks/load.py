@@ -0,0 +1,357 @@
+"""
+Load and latency benchmark for the backend, against local stand-ins.
+
+Starts a fake DeepSeek server and the backend (with a fake transcript
+provider) as separate processes, then drives /analyze, /quality-score,
+/greenwashing, /transcript and /bias-receipt at each concurrency level
+and reports throughput, p50/p95/p99 latency, errors and the backend's
+resident memory. The heuristic microbenchmarks run too (in this
+process). Results are saved as JSON so runs can be compared.
+
+Run from backend/:
+
+    python -m benchmarks.load
+    python -m benchmarks.load --concurrency 1,16,64 --requests 400
+    python -m benchmarks.load --compare benchmarks/results/<earlier run>.json
+
+Every request uses a new video id unless --repeat-ratio is set, so by
+default the numbers are for cold caches.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+TITLES = [
+    "Is Green Energy Actually Clean? Climate Myths Explained",
+    "How Solar Panels Work - Full Breakdown",
+    "SHOCKING truth about electric cars!!!",
+    "Carbon offsetting: research and data",
+    "10 eco-friendly swaps for your kitchen",
+    "Sustainable investing for beginners",
+]
+DESCRIPTION = "We look at eco-friendly claims, carbon offsetting and what the data shows. Sources in the description."
+
+# ============================================
+# PROCESSES
+# ============================================
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_process(args: List[str], env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    with open(log_path, "wb") as log:
+        return subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.serve", *args],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+
+
+def wait_ready(url: str, timeout: float = 30.0) -> float:
+    """Poll url until it answers; returns seconds waited"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process, from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+# ============================================
+# WORKLOAD
+# ============================================
+
+Builder = Callable[[str, int], Tuple[str, str, Optional[dict]]]
+
+def make_payloads(repeat_ratio: float, seed: int) -> Dict[str, Builder]:
+    """
+    Per-endpoint request builders: (scenario id, i) -> (method, path, json body).
+
+    Video ids and titles are unique per scenario (titles too, since the
+    DeepSeek result cache is keyed on the prompt) unless repeated on purpose.
+    """
+    rng = random.Random(seed)
+
+    def video_id(scenario: str, i: int) -> str:
+        if i > 0 and rng.random() < repeat_ratio:
+            i = rng.randrange(i)
+        return f"{scenario}-{i}"
+
+    def title(vid: str, i: int) -> str:
+        return f"{TITLES[i % len(TITLES)]} [{vid}]"
+
+    def analyze(scenario, i):
+        vid = video_id(scenario, i)
+        return "POST", "/analyze", {
+            "video_id": vid,
+            "title": title(vid, i),
+            "description": DESCRIPTION,
+            "channel_title": "Bench Channel",
+            "subscriber_count": 5000 * (i % 7),
+            "query": "green energy",
+        }
+
+    def quality(scenario, i):
+        vid = video_id(scenario, i)
+        return "POST", "/quality-score", {
+            "video_id": vid,
+            "title": title(vid, i),
+            "description": DESCRIPTION,
+            "channel_title": "Bench Channel",
+            "subscriber_count": 5000,
+            "query": "green energy",
+        }
+
+    def greenwashing(scenario, i):
+        vid = video_id(scenario, i)
+        return "POST", "/greenwashing", {
+            "video_id": vid,
+            "title": title(vid, i),
+            "description": DESCRIPTION,
+            "channel_subscriber_count": 2_000_000,
+        }
+
+    def transcript(scenario, i):
+        return "GET", f"/transcript/{video_id(scenario, i)}", None
+
+    def bias_receipt(scenario, i):
+        return "POST", "/bias-receipt", {
+            "video_id": video_id(scenario, i),
+            "subscriber_count": 1000 * i,
+            "views_per_day": 50.0 * (i % 13),
+            "engagement_ratio": 0.04,
+            "video_title": TITLES[i % len(TITLES)],
+            "channel_title": "Bench Channel",
+        }
+
+    return {
+        "analyze": analyze,
+        "quality-score": quality,
+        "greenwashing": greenwashing,
+        "transcript": transcript,
+        "bias-receipt": bias_receipt,
+    }
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def drive(base_url: str, scenario: str, build: Builder, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    next_index = 0
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal next_index
+            while next_index < requests:
+                i = next_index
+                next_index += 1
+                method, path, body = build(scenario, i)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    status = str(response.status_code)
+                    if response.status_code == 200 and response.json().get("success") is False:
+                        status = "200-unsuccessful"
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "rps": round(requests / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 1) if ordered else 0.0,
+        "statuses": statuses,
+    }
+
+# ============================================
+# REPORTING
+# ============================================
+
+def print_table(results: Dict[str, Any]) -> None:
+    print(f"{'scenario':<26} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rss MB':>8}  statuses")
+    for name, row in results["scenarios"].items():
+        print(
+            f"{name:<26} {row['rps']:>8} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} "
+            f"{str(row.get('backend_rss_mb')):>8}  {row['statuses']}"
+        )
+
+
+def print_comparison(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    print(f"\nvs {previous.get('started_at')} ({previous.get('git_rev')})")
+    print(f"{'scenario':<26} {'rps':>16} {'p50 ms':>18} {'p95 ms':>18}")
+    for name, row in current["scenarios"].items():
+        old = previous.get("scenarios", {}).get(name)
+        if not old:
+            continue
+
+        def delta(field: str) -> str:
+            if not old.get(field):
+                return f"{row[field]}"
+            change = (row[field] - old[field]) / old[field] * 100
+            return f"{row[field]} ({change:+.0f}%)"
+
+        print(f"{name:<26} {delta('rps'):>16} {delta('p50_ms'):>18} {delta('p95_ms'):>18}")
+
+
+def git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# ============================================
+# MAIN
+# ============================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default="analyze,quality-score,greenwashing,transcript,bias-receipt")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="fraction of requests reusing an earlier video id")
+    parser.add_argument("--deepseek-latency-ms", type=float, default=400.0)
+    parser.add_argument("--deepseek-error-rate", type=float, default=0.0)
+    parser.add_argument("--deepseek-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--transcript-latency-ms", type=float, default=150.0)
+    parser.add_argument("--transcript-sizes", default="2000,10000,40000")
+    parser.add_argument("--no-ai", action="store_true", help="run without a DeepSeek key (heuristics only)")
+    parser.add_argument("--skip-micro", action="store_true", help="skip the heuristic microbenchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    started_at = datetime.now(timezone.utc)
+    run_id = started_at.strftime("%Y%m%dT%H%M%S")
+    deepseek_port, backend_port = free_port(), free_port()
+    scratch = tempfile.mkdtemp(prefix="bench-cache-")
+
+    env = dict(os.environ)
+    env.update({
+        "DEEPSEEK_API_URL": f"http://127.0.0.1:{deepseek_port}/v1/chat/completions",
+        "DEEPSEEK_API_KEY": "" if args.no_ai else "bench-key",
+        "CACHE_DB_PATH": os.path.join(scratch, "cache.sqlite3"),
+        # Measure the backend, not our own outbound rate limit
+        "DEEPSEEK_REQUESTS_PER_SECOND": env.get("DEEPSEEK_REQUESTS_PER_SECOND", "0"),
+    })
+
+    processes = [
+        start_process([
+            "deepseek", "--port", str(deepseek_port),
+            "--latency-ms", str(args.deepseek_latency_ms),
+            "--error-rate", str(args.deepseek_error_rate),
+            "--rate-limit-rate", str(args.deepseek_rate_limit_rate),
+        ], env, os.path.join(scratch, "deepseek.log")),
+    ]
+    backend_started = time.perf_counter()
+    processes.append(start_process([
+        "backend", "--port", str(backend_port),
+        "--transcript-latency-ms", str(args.transcript_latency_ms),
+        "--transcript-sizes", args.transcript_sizes,
+    ], env, os.path.join(scratch, "backend.log")))
+    backend = processes[-1]
+
+    results: Dict[str, Any] = {
+        "started_at": started_at.isoformat(),
+        "git_rev": git_rev(),
+        "config": vars(args),
+        "scenarios": {},
+    }
+    try:
+        wait_ready(f"http://127.0.0.1:{deepseek_port}/stats")
+        wait_ready(f"http://127.0.0.1:{backend_port}/health")
+        results["backend_ready_s"] = round(time.perf_counter() - backend_started, 2)
+        results["backend_idle_rss_mb"] = rss_mb(backend.pid)
+
+        payloads = make_payloads(args.repeat_ratio, args.seed)
+        base_url = f"http://127.0.0.1:{backend_port}"
+        for endpoint in args.endpoints.split(","):
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                name = f"{endpoint}@c{concurrency}"
+                row = asyncio.run(drive(base_url, f"{run_id}-{name}", payloads[endpoint], args.requests, concurrency))
+                row["backend_rss_mb"] = rss_mb(backend.pid)
+                results["scenarios"][name] = row
+                print(f"  {name}: {row['rps']} rps, p95 {row['p95_ms']} ms", flush=True)
+
+        results["deepseek_fake"] = httpx.get(f"http://127.0.0.1:{deepseek_port}/stats").json()
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    if not args.skip_micro:
+        from benchmarks import heuristics
+        results["microbenchmarks"] = {
+            "heuristics": {str(size): row for size, row in heuristics.run().items()},
+        }
+        if heuristics.main.load_numpy() is not None:
+            results["microbenchmarks"]["bulk"] = heuristics.run_bulk(2000)
+
+    print()
+    print_table(results)
+    if args.compare:
+        with open(args.compare) as previous:
+            print_comparison(results, json.load(previous))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{run_id}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nSaved {output} (server logs in {scratch})")
+
+
+if __name__ == "__main__":
+    main()
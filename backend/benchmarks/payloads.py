@@ -0,0 +1,97 @@
+"""
+Payload measurement: /analyze responses with the transcript inlined vs.
+by reference, encoded with the stdlib json module vs. orjson, and their
+size after gzip.
+
+Serialization time covers what FastAPI does per response: dump the model
+to plain data, then render it to bytes.
+
+Run from backend/:  python -m benchmarks.payloads
+"""
+
+import gzip
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict
+
+import main
+from main import (
+    FullAnalysisResponse,
+    GreenwashingResponse,
+    QualityScoreResponse,
+    TranscriptResponse,
+    transcript_for_response,
+)
+from benchmarks.heuristics import make_transcript
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def stdlib_render(data: Any) -> bytes:
+    # Same settings as starlette's JSONResponse
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def time_render(response: FullAnalysisResponse, render: Callable[[Any], bytes], repeat: int = 50) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(response.model_dump(mode="json"))
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def make_response(chars: int, include_transcript: bool) -> FullAnalysisResponse:
+    transcript = TranscriptResponse(
+        success=True,
+        video_id="dQw4w9WgXcQ",
+        transcript=make_transcript(chars),
+        language="en",
+        duration_seconds=chars / 14.0,
+    )
+    return FullAnalysisResponse(
+        success=True,
+        video_id="dQw4w9WgXcQ",
+        transcript=transcript_for_response(transcript, include_transcript),
+        quality=QualityScoreResponse(
+            success=True, video_id="dQw4w9WgXcQ", relevance_score=0.78, quality_score=0.71,
+            content_depth_score=0.64, combined_score=0.74, method="deepseek",
+            reason="Covers the topic with some supporting detail",
+        ),
+        greenwashing=GreenwashingResponse(
+            success=True, video_id="dQw4w9WgXcQ", transparency_score=58, risk_level="medium",
+            flags=[{"type": "warning", "text": "Vague environmental claims", "evidence": ""}],
+            method="deepseek",
+        ),
+        timings_ms={"transcript": 412.0, "quality": 903.1, "greenwashing": 877.4},
+    )
+
+
+def run() -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for chars in (2_000, 10_000, 40_000, 150_000):
+        row: Dict[str, Any] = {}
+        for mode, include in (("full", True), ("reference", False)):
+            response = make_response(chars, include)
+            body = stdlib_render(response.model_dump(mode="json"))
+            row[mode] = {
+                "bytes": len(body),
+                "gzip_bytes": len(gzip.compress(body, compresslevel=main.RESPONSE_GZIP_LEVEL)),
+                "json_ms": round(time_render(response, stdlib_render), 3),
+                "orjson_ms": round(time_render(response, orjson.dumps), 3) if orjson is not None else None,
+            }
+        results[chars] = row
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'transcript chars':>16}  {'mode':>9}  {'bytes':>8}  {'gzip':>7}  {'json ms':>8}  {'orjson ms':>9}")
+    for chars, row in run().items():
+        for mode, stats in row.items():
+            orjson_ms = stats["orjson_ms"] if stats["orjson_ms"] is not None else "n/a"
+            print(f"{chars:>16}  {mode:>9}  {stats['bytes']:>8}  {stats['gzip_bytes']:>7}  "
+                  f"{stats['json_ms']:>8}  {orjson_ms:>9}")
@@ -0,0 +1,59 @@
+"""
+Run one side of the load benchmark as its own process.
+
+    python -m benchmarks.serve deepseek --port 9100 --latency-ms 400
+    python -m benchmarks.serve backend --port 9000 --transcript-latency-ms 150
+
+The backend role imports main with the environment it was started with
+(the load driver points DEEPSEEK_API_URL at the fake and sets a scratch
+CACHE_DB_PATH) and swaps the YouTube transcript client for the fake one.
+"""
+
+import argparse
+
+import uvicorn
+
+from benchmarks.fakes import (
+    FakeDeepSeekConfig,
+    FakeTranscriptConfig,
+    create_fake_deepseek_app,
+    install_fake_transcripts,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("role", choices=["deepseek", "backend"])
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--latency-ms", type=float, default=400.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--transcript-latency-ms", type=float, default=150.0)
+    parser.add_argument("--transcript-sizes", default="2000,10000,40000")
+    parser.add_argument("--transcript-disabled-rate", type=float, default=0.1)
+    parser.add_argument("--transcript-transient-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    if args.role == "deepseek":
+        app = create_fake_deepseek_app(FakeDeepSeekConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+        ))
+    else:
+        import main as backend
+        install_fake_transcripts(backend, FakeTranscriptConfig(
+            sizes=tuple(int(size) for size in args.transcript_sizes.split(",")),
+            latency_ms=args.transcript_latency_ms,
+            disabled_rate=args.transcript_disabled_rate,
+            transient_rate=args.transcript_transient_rate,
+        ))
+        app = backend.app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
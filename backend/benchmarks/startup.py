@@ -0,0 +1,103 @@
+"""
+Cold-start check: time from interpreter start to a ready app.
+
+Each run is a fresh interpreter that imports main and runs the app's
+startup (lifespan) exactly as uvicorn would, then reports both phases.
+Exits non-zero if the median import-to-ready time is over the budget, so
+it can run in CI to catch regressions (e.g. a heavy module imported at
+the top of main.py again, or a cache database opened at import).
+tests/test_startup.py runs the same check under pytest.
+
+Run from backend/:  python -m benchmarks.startup [--budget-ms 500] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Lazily loaded: importing any of these at startup is a regression
+LAZY_MODULES = ("httpx", "numpy", "youtube_transcript_api")
+
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+# SQLite disk tiers are opened by the lifespan, not at import
+opened_at_import = [
+    store.name for store in (main.transcript_cache, *main.llm_result_caches.values(), main.topic_index)
+    if store._db is not None
+]
+
+async def ready():
+    async with main.app.router.lifespan_context(main.app):
+        done = time.perf_counter()
+        # Modules present at the moment the app is ready (warm-up runs after)
+        loaded = [m for m in LAZY_MODULES if m in sys.modules]
+    return done, loaded
+
+done, loaded = asyncio.run(ready())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (done - imported) * 1000,
+    "total_ms": (done - started) * 1000,
+    "eager_lazy_modules": loaded,
+    "opened_at_import": opened_at_import,
+}))
+"""
+
+
+def measure_once() -> dict:
+    env = dict(os.environ)
+    env.setdefault("CACHE_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="startup-"), "cache.sqlite3"))
+    env["STARTUP_WARM_UP"] = "false"  # background warm-up would skew the module check
+    output = subprocess.run(
+        [sys.executable, "-c", f"LAZY_MODULES = {LAZY_MODULES!r}\n{PROBE}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", 500)))
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    summary = {
+        field: round(statistics.median(run[field] for run in runs), 1)
+        for field in ("import_ms", "startup_ms", "total_ms")
+    }
+    eager = sorted({module for run in runs for module in run["eager_lazy_modules"]})
+    opened = sorted({name for run in runs for name in run["opened_at_import"]})
+
+    print(f"import {summary['import_ms']} ms + startup {summary['startup_ms']} ms "
+          f"= {summary['total_ms']} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if summary["total_ms"] > args.budget_ms:
+        print(f"FAIL: import-to-ready time is over budget by {summary['total_ms'] - args.budget_ms:.0f} ms")
+        failed = True
+    if eager:
+        print(f"FAIL: loaded before the first request: {', '.join(eager)}")
+        failed = True
+    if opened:
+        print(f"FAIL: cache databases opened at import: {', '.join(opened)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
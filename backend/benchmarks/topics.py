@@ -0,0 +1,105 @@
+"""
+Topic index benchmark: ingest and read cost, memory as the number of
+topics grows, and sketch accuracy against exact statistics.
+
+Videos are spread over --topics topics (Zipf popularity) and channels
+(Zipf within a topic), with log-uniform subscriber counts. Memory is what
+an in-memory index retains after ingesting everything (tracemalloc),
+including its recent-video dedup table; it levels off once the topic
+count passes max_topics. Accuracy compares the snapshot of the most
+popular topic with the exact per-video median and top-10 share.
+
+Run from backend/:  python -m benchmarks.topics [--videos 200000]
+"""
+
+import argparse
+import gc
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from topicindex import TopicIndex
+
+Row = Tuple[str, str, int, float]
+
+
+def make_stream(videos: int, topics: int, seed: int) -> List[Tuple[str, Row]]:
+    rng = random.Random(seed)
+    topic_weights = [1 / (rank + 1) for rank in range(topics)]
+    channel_weights = [1 / (rank + 1) for rank in range(500)]
+    picked = rng.choices(range(topics), weights=topic_weights, k=videos)
+    channels = rng.choices(range(500), weights=channel_weights, k=videos)
+    stream = []
+    for i, (topic, channel) in enumerate(zip(picked, channels)):
+        subscribers = int(10 ** rng.uniform(1, 7))
+        stream.append((f"topic {topic}", (f"v{i}", f"t{topic}-c{channel}", subscribers, rng.uniform(0, 500))))
+    return stream
+
+
+def run(videos: int, topics: int, max_topics: int, seed: int) -> Dict[str, Any]:
+    stream = make_stream(videos, topics, seed)
+
+    gc.collect()
+    tracemalloc.start()
+    in_memory = TopicIndex("", max_topics=max_topics)
+    for query, row in stream:
+        in_memory.ingest(query, [row])
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del in_memory
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-topics-"), "topics.sqlite3")
+    index = TopicIndex(path, max_topics=max_topics)
+    started = time.perf_counter()
+    for query, row in stream:
+        index.ingest(query, [row])
+    ingest_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.flush()
+    flush_seconds = time.perf_counter() - started
+
+    # Reads of a hot topic hit the memoized snapshot
+    index.snapshot("topic 0")
+    reads = 10000
+    started = time.perf_counter()
+    for _ in range(reads):
+        index.snapshot("topic 0").subscriber_percentile(5000)
+    read_us = (time.perf_counter() - started) / reads * 1e6
+
+    rows = [row for query, row in stream if query == "topic 0"]
+    exact_median = statistics.median(row[2] for row in rows)
+    views: Counter = Counter()
+    for _, channel, _, views_per_day in rows:
+        views[channel] += views_per_day
+    exact_share = sum(v for _, v in views.most_common(10)) / sum(views.values()) * 100
+    snapshot = index.snapshot("topic 0")
+
+    return {
+        "ingest_us": round(ingest_seconds / videos * 1e6, 2),
+        "flush_ms": round(flush_seconds * 1000, 1),
+        "read_us": round(read_us, 2),
+        "memory_kb": round(retained / 1024),
+        "median_error": round(abs(snapshot.median_subscribers - exact_median) / exact_median * 100, 2),
+        "top10_share": (round(snapshot.top10_share, 1), round(exact_share, 1)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=100000)
+    parser.add_argument("--max-topics", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'topics':>7}  {'ingest us':>9}  {'flush ms':>8}  {'read us':>7}  {'memory KB':>9}  "
+          f"{'median err %':>12}  {'top10 share (sketch, exact)':>27}")
+    for topics in (10, 100, 1000, 10000):
+        row = run(args.videos, topics, args.max_topics, args.seed)
+        print(f"{topics:>7}  {row['ingest_us']:>9}  {row['flush_ms']:>8}  {row['read_us']:>7}  "
+              f"{row['memory_kb']:>9}  {row['median_error']:>12}  {str(row['top10_share']):>27}", flush=True)
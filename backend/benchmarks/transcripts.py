@@ -0,0 +1,114 @@
+"""
+Memory benchmark: cached transcripts as CompactTranscript vs. the old
+string-per-video TranscriptResponse dict.
+
+For each transcript size, builds the cached value for a set of videos
+from the same caption snippets and reports the memory retained per
+transcript (tracemalloc), the disk-tier row size, the time to read the
+text back, and the time to build a prompt excerpt (word split vs. caption
+segment boundaries). "dict + segments" is what keeping the timings the
+old way (a list of per-segment dicts) would have cost.
+
+Run from backend/:  python -m benchmarks.transcripts [--videos 200]
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.fakes import FakeTrack
+from excerpt import ExcerptBuilder
+from transcript import CompactTranscript, resolve_codec, segment_boundaries
+
+
+def legacy_value(video_id: str, snippets) -> Dict[str, Any]:
+    """What _fetch_transcript used to cache (TranscriptResponse(...).model_dump())"""
+    last = snippets[-1]
+    return {
+        "success": True,
+        "video_id": video_id,
+        "transcript": " ".join([entry.text for entry in snippets]),
+        "language": "en",
+        "duration_seconds": last.start + last.duration,
+        "error": None,
+    }
+
+
+def legacy_with_segments(video_id: str, snippets) -> Dict[str, Any]:
+    value = legacy_value(video_id, snippets)
+    value["segments"] = [{"text": s.text, "start": s.start, "duration": s.duration} for s in snippets]
+    return value
+
+
+def retained_bytes(build: Callable[[], Any], count: int) -> float:
+    """Memory still held after building `count` values, per value"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    values = [build() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del values
+    return (after - before) / count
+
+
+def median_ms(fn: Callable[[], Any], repeat: int = 30) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def run(videos: int) -> Dict[int, Dict[str, Any]]:
+    codecs = list(dict.fromkeys(resolve_codec(codec) for codec in ("none", "zlib", "zstd")))
+    excerpts = ExcerptBuilder("bench", ["research", "data", "green", "claims"], token_budget=1200, head_chars=4000)
+    results = {}
+
+    for chars in (10_000, 50_000, 200_000):
+        snippets = FakeTrack(f"bench-{chars}", chars, latency=0).fetch()
+        row: Dict[str, Dict[str, Any]] = {}
+
+        legacy = legacy_value("v", snippets)
+        row["dict"] = {
+            "memory_bytes": round(retained_bytes(lambda: legacy_value("v", snippets), videos)),
+            "disk_bytes": len(json.dumps(legacy)),
+            "text_ms": median_ms(lambda: legacy["transcript"]),
+            "excerpt_ms": median_ms(lambda: excerpts.build(legacy["transcript"])),
+        }
+        row["dict + segments"] = {
+            "memory_bytes": round(retained_bytes(lambda: legacy_with_segments("v", snippets), videos)),
+            "disk_bytes": len(json.dumps(legacy_with_segments("v", snippets))),
+        }
+
+        for codec in codecs:
+            compact = CompactTranscript.from_segments("v", "en", snippets, codec=codec)
+            assert compact.text == legacy["transcript"]
+            text = compact.text
+            row[f"compact ({codec})"] = {
+                "memory_bytes": round(retained_bytes(
+                    lambda: CompactTranscript.from_segments("v", "en", snippets, codec=codec), videos
+                )),
+                "disk_bytes": len(compact.to_bytes()),
+                "text_ms": median_ms(lambda: compact.text),
+                "excerpt_ms": median_ms(lambda: excerpts.build(text, boundaries=segment_boundaries(text))),
+            }
+        results[chars] = row
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'chars':>7}  {'representation':<16}  {'memory/video':>12}  {'disk row':>9}  {'text ms':>8}  {'excerpt ms':>10}")
+    for chars, row in run(args.videos).items():
+        for name, stats in row.items():
+            print(f"{chars:>7}  {name:<16}  {stats['memory_bytes']:>12}  {stats['disk_bytes']:>9}  "
+                  f"{stats.get('text_ms', ''):>8}  {stats.get('excerpt_ms', ''):>10}")
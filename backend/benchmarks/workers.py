@@ -0,0 +1,192 @@
+"""
+Multi-worker cache benchmark: hit rate and latency as workers go 1..N.
+
+Runs N backend processes (like `uvicorn --workers N`) against the local
+fakes and spreads a skewed (Zipf) stream of requests over a fixed
+catalog of videos across them round-robin. Hit rate is 1 - upstream
+calls / requests, with upstream calls counted at the source (transcript
+fetches per worker, requests seen by the fake DeepSeek).
+
+Modes:
+  shared    every worker uses the same SQLite file (the default setup)
+  nolease   shared file, but CACHE_SHARED_FILL=false (no cross-worker
+            coordination of concurrent misses)
+  isolated  one SQLite file per worker, i.e. per-worker caches
+
+Run from backend/:
+
+    python -m benchmarks.workers
+    python -m benchmarks.workers --workers 1,2,4,8 --endpoints transcript --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.load import TITLES, free_port, percentile, start_process, wait_ready
+
+MODES = ("shared", "nolease", "isolated")
+
+
+def zipf_sequence(catalog: int, count: int, skew: float, seed: int) -> List[int]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** skew for rank in range(catalog)]
+    return rng.choices(range(catalog), weights=weights, k=count)
+
+
+def request_for(endpoint: str, run_id: str, video: int):
+    video_id = f"{run_id}-{video}"
+    if endpoint == "transcript":
+        return "GET", f"/transcript/{video_id}", None
+    return "POST", "/quality-score", {
+        "video_id": video_id,
+        "title": f"{TITLES[video % len(TITLES)]} [{video_id}]",
+        "description": "We look at eco-friendly claims and what the data shows.",
+        "channel_title": "Bench Channel",
+        "subscriber_count": 5000,
+        "query": "green energy",
+    }
+
+
+async def drive(ports: List[int], endpoint: str, run_id: str, videos: List[int], concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+    clients = [
+        httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60.0) for port in ports
+    ]
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < len(videos):
+            i = next_index
+            next_index += 1
+            method, path, body = request_for(endpoint, run_id, videos[i])
+            started = time.perf_counter()
+            try:
+                response = await clients[i % len(clients)].request(method, path, json=body)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    finally:
+        for client in clients:
+            await client.aclose()
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "rps": round(len(videos) / elapsed, 1),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+        "errors": errors,
+    }
+
+
+def upstream_calls(endpoint: str, ports: List[int], deepseek_port: int) -> int:
+    if endpoint == "transcript":
+        total = 0
+        for port in ports:
+            fetch = httpx.get(f"http://127.0.0.1:{port}/health").json()["transcript_fetch"]
+            total += fetch["completed"] + fetch["failed"]
+        return total
+    return httpx.get(f"http://127.0.0.1:{deepseek_port}/stats").json()["requests"]
+
+
+def peer_fills(endpoint: str, ports: List[int]) -> int:
+    total = 0
+    for port in ports:
+        stats = httpx.get(f"http://127.0.0.1:{port}/cache/stats").json()
+        total += stats["transcripts"]["peer_fills"] if endpoint == "transcript" else stats["llm"]["quality"]["peer_fills"]
+    return total
+
+
+def run_case(mode: str, workers: int, endpoint: str, args, env: Dict[str, str], scratch: str) -> Dict[str, Any]:
+    case_dir = tempfile.mkdtemp(prefix=f"{mode}-{workers}-", dir=scratch)
+    deepseek_port = free_port()
+    processes = [start_process(
+        ["deepseek", "--port", str(deepseek_port), "--latency-ms", str(args.deepseek_latency_ms)],
+        env, os.path.join(case_dir, "deepseek.log"),
+    )]
+    ports = [free_port() for _ in range(workers)]
+    for index, port in enumerate(ports):
+        worker_env = dict(env)
+        worker_env["DEEPSEEK_API_URL"] = f"http://127.0.0.1:{deepseek_port}/v1/chat/completions"
+        worker_env["CACHE_DB_PATH"] = os.path.join(
+            case_dir, f"cache-{index}.sqlite3" if mode == "isolated" else "cache.sqlite3"
+        )
+        worker_env["CACHE_SHARED_FILL"] = "false" if mode == "nolease" else "true"
+        processes.append(start_process([
+            "backend", "--port", str(port),
+            "--transcript-latency-ms", str(args.transcript_latency_ms),
+            "--transcript-disabled-rate", "0",
+            "--transcript-transient-rate", "0",
+        ], worker_env, os.path.join(case_dir, f"backend-{index}.log")))
+
+    try:
+        wait_ready(f"http://127.0.0.1:{deepseek_port}/stats")
+        for port in ports:
+            wait_ready(f"http://127.0.0.1:{port}/health")
+
+        run_id = os.path.basename(case_dir)
+        videos = zipf_sequence(args.catalog, args.requests, args.skew, args.seed)
+        row = asyncio.run(drive(ports, endpoint, run_id, videos, args.concurrency))
+        upstream = upstream_calls(endpoint, ports, deepseek_port)
+        row["upstream_calls"] = upstream
+        row["hit_rate"] = round(1 - upstream / args.requests, 4)
+        row["peer_fills"] = peer_fills(endpoint, ports)
+        return row
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--endpoints", default="transcript,quality-score")
+    parser.add_argument("--requests", type=int, default=1200)
+    parser.add_argument("--catalog", type=int, default=300, help="distinct videos")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of video popularity")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--transcript-latency-ms", type=float, default=150.0)
+    parser.add_argument("--deepseek-latency-ms", type=float, default=400.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench-workers-")
+    env = dict(os.environ)
+    env.update({
+        "DEEPSEEK_API_KEY": "bench-key",
+        "DEEPSEEK_REQUESTS_PER_SECOND": "0",
+        "QUALITY_BATCH_WINDOW_MS": "0",  # one upstream call per miss, so calls count misses
+    })
+
+    print(f"{'endpoint':<14} {'mode':<9} {'workers':>7} {'hit rate':>9} {'upstream':>9} "
+          f"{'peer fills':>10} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+    for endpoint in args.endpoints.split(","):
+        for mode in args.modes.split(","):
+            for workers in (int(w) for w in args.workers.split(",")):
+                row = run_case(mode, workers, endpoint, args, env, scratch)
+                print(f"{endpoint:<14} {mode:<9} {workers:>7} {row['hit_rate']:>9.1%} {row['upstream_calls']:>9} "
+                      f"{row['peer_fills']:>10} {row['rps']:>7} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+                      f"{row['errors']:>6}", flush=True)
+    print(f"\nServer logs in {scratch}")
+
+
+if __name__ == "__main__":
+    main()
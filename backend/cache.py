@@ -0,0 +1,484 @@
+"""
+Tiered caching for the backend.
+
+Each cache is an in-memory LRU "hot" tier in front of a SQLite table on
+local disk. Entries carry an expiry time, the disk tier is trimmed to a
+maximum number of rows (least recently used first), and "negative" entries
+(e.g. "this video has no captions") get their own, shorter TTL so we stop
+re-asking upstream for things we already know are missing.
+
+The disk tier is the host-level tier: every uvicorn worker on a host opens
+the same SQLite file (WAL mode, so readers never block the writer), and a
+value cached by one worker is a hit for all of them. To keep that cheap
+and safe with several processes:
+
+- lock waits are capped at CACHE_BUSY_TIMEOUT_MS (a busy database is
+  treated as a miss / skipped write rather than stalling the event loop),
+- reads only rewrite accessed_at once per CACHE_TOUCH_INTERVAL_SECONDS,
+  so hits don't queue for the single writer lock,
+- connections are reopened after a fork,
+- coroutines use aget/aset/acontains: hot-tier hits are answered inline
+  and disk-tier queries run on a worker thread, never on the event loop, and
+- shared_fill() gives one worker a lease to fill a missing key while the
+  others wait for its result instead of repeating the upstream call.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", os.path.join(CACHE_DIR, "backend-cache.sqlite3"))
+
+# How many writes between disk-size checks (trimming is amortized)
+TRIM_EVERY_N_WRITES = 100
+
+# Longest a query waits for another process's write lock
+CACHE_BUSY_TIMEOUT_MS = int(os.getenv("CACHE_BUSY_TIMEOUT_MS", 100))
+
+# Disk hits refresh a row's LRU timestamp at most this often
+CACHE_TOUCH_INTERVAL_SECONDS = float(os.getenv("CACHE_TOUCH_INTERVAL_SECONDS", 60))
+
+
+class TieredCache:
+    """LRU memory tier + SQLite disk tier with TTL, size limits and negative entries"""
+
+    def __init__(
+        self,
+        name: str,
+        path: str = CACHE_DB_PATH,
+        hot_size: int = 512,
+        max_entries: int = 50000,
+        ttl_seconds: float = 7 * 86400,
+        negative_ttl_seconds: float = 86400,
+        dumps: Callable[[Any], Any] = json.dumps,
+        loads: Callable[[Any], Any] = json.loads,
+    ):
+        self.name = name
+        self.path = path
+        self.hot_size = hot_size
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        # Disk tier encoding: str (stored as TEXT) or bytes (stored as BLOB)
+        self._dumps = dumps
+        self._loads = loads
+
+        # key -> (expires_at, negative, value)
+        self._hot: "OrderedDict[str, tuple]" = OrderedDict()
+        # _lock guards the hot tier and counters and is never held across disk
+        # I/O; _db_lock guards the connection. Take _db_lock first if both.
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._writes_since_trim = 0
+
+        self._counters = {
+            "hot_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "writes": 0,
+            "evictions": 0,
+            "leases": 0,
+            "peer_fills": 0,
+        }
+
+        # Opened by open() or on first use, never at construction (i.e. import)
+        self._pid: Optional[int] = None
+        self._db: Optional[sqlite3.Connection] = None
+
+    # ---------- setup ----------
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier; on failure the cache degrades to memory only"""
+        if not self.path:
+            return None
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(
+                self.path,
+                timeout=CACHE_BUSY_TIMEOUT_MS / 1000,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.name}" ('
+                "key TEXT PRIMARY KEY, "
+                "value TEXT NOT NULL, "
+                "negative INTEGER NOT NULL DEFAULT 0, "
+                "expires_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            db.execute(
+                f'CREATE INDEX IF NOT EXISTS "{self.name}_accessed" ON "{self.name}" (accessed_at)'
+            )
+            # Which process is filling a missing key (see shared_fill)
+            db.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.name}_leases" ('
+                "key TEXT PRIMARY KEY, "
+                "holder TEXT NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+            return db
+        except sqlite3.Error:
+            return None
+
+    def open(self) -> None:
+        """Open the disk tier now rather than on first use (e.g. during app startup)"""
+        with self._db_lock:
+            self._disk()
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """The disk tier connection (call with _db_lock held); opened lazily, reopened in a forked child"""
+        if self._pid != os.getpid():
+            if self._pid is not None:
+                # Inherited across a fork: a connection must not be shared
+                # between processes (e.g. gunicorn --preload)
+                with self._lock:
+                    self._hot.clear()
+            self._pid = os.getpid()
+            self._db = self._open()
+        return self._db
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._counters[name] += 1
+
+    # ---------- hot tier ----------
+
+    def _hot_put(self, key: str, entry: tuple) -> None:
+        self._hot[key] = entry
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def _hot_get(self, key: str, now: float) -> Tuple[bool, Optional[Any]]:
+        """(found, value) from the memory tier alone"""
+        with self._lock:
+            entry = self._hot.get(key)
+            if entry is None:
+                return False, None
+            expires_at, negative, value = entry
+            if expires_at <= now:
+                del self._hot[key]
+                self._counters["expired"] += 1
+                return False, None
+            self._hot.move_to_end(key)
+            self._counters["hot_hits"] += 1
+            if negative:
+                self._counters["negative_hits"] += 1
+            return True, value
+
+    def _hot_contains(self, key: str, now: float) -> bool:
+        with self._lock:
+            entry = self._hot.get(key)
+            return entry is not None and entry[0] > now
+
+    def _hot_set(self, key: str, value: Any, negative: bool, ttl_seconds: Optional[float]) -> Tuple[float, float]:
+        """Store in the memory tier; returns (now, expires_at) for the disk write"""
+        now = time.time()
+        if ttl_seconds is None:
+            ttl_seconds = self.negative_ttl_seconds if negative else self.ttl_seconds
+        expires_at = now + ttl_seconds
+        with self._lock:
+            self._hot_put(key, (expires_at, negative, value))
+            self._counters["writes"] += 1
+        return now, expires_at
+
+    # ---------- disk tier ----------
+
+    def _disk_get(self, key: str, now: float) -> Optional[Any]:
+        with self._db_lock:
+            db = self._disk()
+            if db is None:
+                self._count("misses")
+                return None
+
+            try:
+                row = db.execute(
+                    f'SELECT value, negative, expires_at, accessed_at FROM "{self.name}" WHERE key = ?',
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    self._count("misses")
+                    return None
+
+                raw, negative, expires_at, accessed_at = row
+                if expires_at <= now:
+                    db.execute(f'DELETE FROM "{self.name}" WHERE key = ?', (key,))
+                    self._count("expired", "misses")
+                    return None
+
+                if now - accessed_at >= CACHE_TOUCH_INTERVAL_SECONDS:
+                    db.execute(
+                        f'UPDATE "{self.name}" SET accessed_at = ? WHERE key = ?', (now, key)
+                    )
+            except sqlite3.Error:
+                self._count("misses")
+                return None
+
+        try:
+            value = self._loads(raw)
+        except Exception:
+            # Unreadable (corrupt, truncated or from an incompatible version): a miss
+            self._count("misses")
+            return None
+        with self._lock:
+            self._hot_put(key, (expires_at, bool(negative), value))
+            self._counters["disk_hits"] += 1
+            if negative:
+                self._counters["negative_hits"] += 1
+        return value
+
+    def _disk_contains(self, key: str, now: float) -> bool:
+        with self._db_lock:
+            db = self._disk()
+            if db is None:
+                return False
+            try:
+                row = db.execute(
+                    f'SELECT 1 FROM "{self.name}" WHERE key = ? AND expires_at > ?', (key, now)
+                ).fetchone()
+            except sqlite3.Error:
+                return False
+            return row is not None
+
+    def _disk_set(self, key: str, value: Any, negative: bool, now: float, expires_at: float) -> None:
+        if not self.path:
+            return
+        raw = self._dumps(value)
+        with self._db_lock:
+            db = self._disk()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    f'INSERT OR REPLACE INTO "{self.name}" '
+                    "(key, value, negative, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, raw, int(negative), expires_at, now),
+                )
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= TRIM_EVERY_N_WRITES:
+                    self._writes_since_trim = 0
+                    self._trim(now)
+            except sqlite3.Error:
+                pass
+
+    # ---------- public API (blocking: worker threads) ----------
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        now = time.time()
+        found, value = self._hot_get(key, now)
+        if found:
+            return value
+        return self._disk_get(key, now)
+
+    def contains(self, key: str) -> bool:
+        """Whether key has a live entry, without counting a hit/miss or promoting it"""
+        now = time.time()
+        return self._hot_contains(key, now) or self._disk_contains(key, now)
+
+    def set(self, key: str, value: Any, negative: bool = False, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value (JSON-serializable by default); negative entries use the negative TTL"""
+        now, expires_at = self._hot_set(key, value, negative, ttl_seconds)
+        self._disk_set(key, value, negative, now, expires_at)
+
+    # ---------- public API (coroutines) ----------
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get() for the event loop: a hot-tier hit is answered inline, the disk lookup runs on a thread"""
+        now = time.time()
+        found, value = self._hot_get(key, now)
+        if found:
+            return value
+        return await asyncio.to_thread(self._disk_get, key, now)
+
+    async def acontains(self, key: str) -> bool:
+        """contains() for the event loop"""
+        now = time.time()
+        if self._hot_contains(key, now):
+            return True
+        return await asyncio.to_thread(self._disk_contains, key, now)
+
+    async def aset(self, key: str, value: Any, negative: bool = False, ttl_seconds: Optional[float] = None) -> None:
+        """set() for the event loop: the hot tier is updated inline, the disk write runs on a thread"""
+        now, expires_at = self._hot_set(key, value, negative, ttl_seconds)
+        if self.path:
+            await asyncio.to_thread(self._disk_set, key, value, negative, now, expires_at)
+
+    # ---------- cross-process fill leases ----------
+
+    def try_lease(self, key: str, seconds: float) -> Optional[str]:
+        """
+        Claim the right to fill key for `seconds`. Returns the lease's token
+        (pass it to release_lease), or None while someone else holds it.
+        """
+        # Unique per claim, so one coroutine can't release another's lease
+        token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        now = time.time()
+        with self._db_lock:
+            db = self._disk()
+            if db is None:
+                return token  # memory only: in-process coalescing is all there is
+            try:
+                cursor = db.execute(
+                    f'INSERT INTO "{self.name}_leases" (key, holder, expires_at) VALUES (?, ?, ?) '
+                    "ON CONFLICT(key) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at "
+                    "WHERE expires_at <= ?",
+                    (key, token, now + seconds, now),
+                )
+            except sqlite3.Error:
+                return token  # can't coordinate: fill it ourselves
+            if cursor.rowcount == 0:
+                return None
+        self._count("leases")
+        return token
+
+    def lease_held(self, key: str) -> bool:
+        """Whether some process holds an unexpired fill lease on key"""
+        with self._db_lock:
+            db = self._disk()
+            if db is None:
+                return False
+            try:
+                row = db.execute(
+                    f'SELECT 1 FROM "{self.name}_leases" WHERE key = ? AND expires_at > ?', (key, time.time())
+                ).fetchone()
+            except sqlite3.Error:
+                return False
+            return row is not None
+
+    def release_lease(self, key: str, token: str) -> None:
+        """Give up a lease taken by try_lease (no-op if it expired and was taken over)"""
+        with self._db_lock:
+            db = self._disk()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    f'DELETE FROM "{self.name}_leases" WHERE key = ? AND holder = ?', (key, token)
+                )
+            except sqlite3.Error:
+                pass
+
+    def _trim(self, now: float) -> None:
+        """Drop expired rows, then least-recently-used rows above max_entries (_db_lock held)"""
+        self._db.execute(f'DELETE FROM "{self.name}" WHERE expires_at <= ?', (now,))
+        self._db.execute(f'DELETE FROM "{self.name}_leases" WHERE expires_at <= ?', (now,))
+        count = self._db.execute(f'SELECT COUNT(*) FROM "{self.name}"').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._db.execute(
+                f'DELETE FROM "{self.name}" WHERE key IN ('
+                f'SELECT key FROM "{self.name}" ORDER BY accessed_at ASC LIMIT ?)',
+                (overflow,),
+            )
+            with self._lock:
+                self._counters["evictions"] += overflow
+
+    def clear(self) -> None:
+        with self._db_lock:
+            with self._lock:
+                self._hot.clear()
+            db = self._disk()
+            if db is not None:
+                db.execute(f'DELETE FROM "{self.name}"')
+
+    def stats(self, disk: bool = True) -> Dict[str, Any]:
+        """
+        Hit/miss counters plus current sizes, for sizing the cache. Counting the
+        disk rows blocks; with disk=False (safe on the event loop) it's None.
+        """
+        disk_entries = None
+        with self._db_lock if disk else nullcontext():
+            db = self._disk() if disk else None
+            if db is not None:
+                try:
+                    disk_entries = db.execute(
+                        f'SELECT COUNT(*) FROM "{self.name}"'
+                    ).fetchone()[0]
+                except sqlite3.Error:
+                    pass
+        with self._lock:
+            counters = dict(self._counters)
+            hot_entries = len(self._hot)
+
+        hits = counters["hot_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hits": hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "hot_entries": hot_entries,
+            "disk_entries": disk_entries,
+            "max_entries": self.max_entries,
+        }
+
+
+@asynccontextmanager
+async def shared_fill(
+    cache: TieredCache,
+    key: str,
+    lease_seconds: float,
+    max_wait: Optional[float] = None,
+    poll_seconds: float = 0.02,
+) -> AsyncIterator[Optional[Any]]:
+    """
+    Coordinate filling a missing key across worker processes.
+
+    Yields the value another worker stored while this one waited for its
+    lease, or None if this worker should compute (and set) the value
+    itself: it got the lease, or the holder gave up or ran past the lease
+    (or max_wait, if shorter). The lease is released on exit.
+
+    Taking, polling and releasing the lease are SQLite writes and reads,
+    so they run on a worker thread rather than on the event loop.
+    """
+    token = await asyncio.to_thread(cache.try_lease, key, lease_seconds)
+    value = None
+    if token is None:
+        wait = lease_seconds if max_wait is None else min(lease_seconds, max_wait)
+        deadline = time.monotonic() + wait
+        delay = poll_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 0.25)
+            value, held = await asyncio.to_thread(_poll_fill, cache, key)
+            if value is not None:
+                cache._count("peer_fills")
+                break
+            if not held:
+                break
+        if value is None:
+            token = await asyncio.to_thread(cache.try_lease, key, lease_seconds)
+    try:
+        yield value
+    finally:
+        if token is not None:
+            await asyncio.to_thread(cache.release_lease, key, token)
+
+
+def _poll_fill(cache: TieredCache, key: str) -> Tuple[Optional[Any], bool]:
+    """(value if another worker stored it, whether a lease on key is still held)"""
+    if cache.contains(key):
+        value = cache.get(key)
+        if value is not None:
+            return value, True
+    return None, cache.lease_held(key)
@@ -0,0 +1,121 @@
+"""
+Response compression that also works for streamed responses.
+
+Starlette's GZipMiddleware holds streamed chunks in the compressor until
+the response ends, which would delay every server-sent event and NDJSON
+line. Here each streamed chunk is flushed (Z_SYNC_FLUSH / brotli flush)
+as it is sent, so streams stay incremental and still get compressed.
+Brotli is used when the optional `brotli` package is installed and the
+client accepts it; otherwise gzip.
+"""
+
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+def _accepted_encodings(scope) -> str:
+    for name, value in scope.get("headers", ()):
+        if name == b"accept-encoding":
+            return value.decode("latin-1").lower()
+    return ""
+
+
+class CompressionMiddleware:
+    """gzip / brotli for response bodies of at least minimum_size bytes"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoder(self, scope):
+        accepted = _accepted_encodings(scope)
+        if brotli is not None and "br" in accepted:
+            return lambda: _BrotliEncoder(self.brotli_quality)
+        if "gzip" in accepted:
+            return lambda: _GzipEncoder(self.gzip_level)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        make_encoder = self._encoder(scope) if scope["type"] == "http" else None
+        if make_encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[dict] = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                headers = start_message["headers"]
+                already_encoded = any(name == b"content-encoding" for name, _ in headers)
+                if already_encoded or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = make_encoder()
+                body = encoder.compress(body, final=not more_body)
+                headers = [
+                    (name, value) for name, value in headers
+                    if name not in (b"content-length", b"etag")
+                ]
+                for name, value in start_message["headers"]:
+                    if name == b"etag":
+                        # Same representation rules as the uncompressed body, but
+                        # different bytes: keep the ETag distinct per encoding
+                        headers.append((b"etag", value.rstrip(b'"') + b"-" + encoder.name.encode() + b'"'))
+                headers.append((b"content-encoding", encoder.name.encode()))
+                headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body:
+                    headers.append((b"content-length", str(len(body)).encode()))
+                await send({**start_message, "headers": headers})
+                await send({**message, "body": body})
+                return
+
+            await send({**message, "body": encoder.compress(body, final=not more_body)})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,177 @@
+"""
+Token-budgeted transcript excerpts for the DeepSeek prompts.
+
+Instead of sending the first N characters of a transcript (which always
+pays for the intro / sponsor read and never sees the substance later in
+the video), the transcript is cut into windows, each window is scored by
+the density of terms relevant to the prompt, and the best windows from
+across the whole video are sent, in chronological order, within a token
+budget. Windows with no relevant terms are still used to fill any budget
+left over, spread evenly, so the model sees the whole arc of the video.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Rough chars-per-token ratio for English text with DeepSeek's tokenizer
+CHARS_PER_TOKEN = 4
+
+GAP_MARKER = " [...] "
+
+
+def estimate_tokens(text_or_length) -> int:
+    length = text_or_length if isinstance(text_or_length, int) else len(text_or_length)
+    return (length + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def group_windows(pieces: Sequence[str], window_chars: int) -> List[str]:
+    """Merge consecutive pieces (words or caption segments) into windows of about window_chars"""
+    windows = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        current.append(piece)
+        size += len(piece) + 1
+        if size >= window_chars:
+            windows.append(" ".join(current))
+            current = []
+            size = 0
+    if current:
+        windows.append(" ".join(current))
+    return windows
+
+
+def group_spans(text: str, boundaries: Sequence[int], window_chars: int) -> List[str]:
+    """
+    group_windows() over the segments of a space-joined text, given where
+    each segment starts: windows are sliced straight out of the text
+    """
+    windows = []
+    start = 0
+    for boundary in list(boundaries[1:]) + [len(text) + 1]:
+        if boundary - start >= window_chars:
+            windows.append(text[start:boundary - 1])
+            start = boundary
+    if start < len(text):
+        windows.append(text[start:])
+    return windows
+
+
+class ExcerptBuilder:
+    """Selects the most relevant transcript windows for one prompt type"""
+
+    def __init__(
+        self,
+        name: str,
+        keywords: Iterable[str],
+        token_budget: int,
+        head_chars: int,
+        window_chars: int = 600,
+    ):
+        self.name = name
+        self.keywords = tuple(dict.fromkeys(k.lower() for k in keywords))
+        self.token_budget = token_budget
+        self.head_chars = head_chars  # what plain slicing used to send
+        self.window_chars = window_chars
+
+        self._lock = threading.Lock()
+        self._excerpts = 0
+        self._baseline_tokens = 0
+        self._excerpt_tokens = 0
+
+    def build(
+        self,
+        transcript: Optional[str] = None,
+        segments: Optional[Sequence[str]] = None,
+        extra_keywords: Iterable[str] = (),
+        boundaries: Optional[Sequence[int]] = None,
+    ) -> str:
+        """
+        Excerpt for a transcript (plain text, or caption segments if available).
+
+        `boundaries` are the offsets in `transcript` where caption segments
+        start; windows are then cut at segment boundaries, as with
+        `segments`, without splitting the text into words.
+
+        A token_budget of 0 or less keeps the old behaviour: the first
+        head_chars characters.
+        """
+        text = " ".join(segments) if segments is not None else (transcript or "")
+        baseline_tokens = estimate_tokens(min(len(text), self.head_chars))
+
+        if self.token_budget <= 0:
+            head = text[:self.head_chars]
+            self._record(baseline_tokens, estimate_tokens(head))
+            return head
+
+        budget_chars = self.token_budget * CHARS_PER_TOKEN
+        if len(text) <= budget_chars:
+            self._record(baseline_tokens, estimate_tokens(text))
+            return text
+
+        if segments is None and boundaries is not None:
+            windows = group_spans(text, boundaries, self.window_chars)
+        else:
+            windows = group_windows(segments if segments is not None else text.split(), self.window_chars)
+
+        keywords = self.keywords + tuple(k.lower() for k in extra_keywords if len(k) > 2)
+        scores = []
+        for window in windows:
+            lowered = window.lower()
+            hits = sum(lowered.count(k) for k in keywords)
+            scores.append(hits / max(len(window), 1))
+
+        selected = self._select(windows, scores, budget_chars)
+        parts = []
+        previous = None
+        for index in selected:
+            if previous is not None:
+                parts.append(" " if index == previous + 1 else GAP_MARKER)
+            parts.append(windows[index])
+            previous = index
+        excerpt = "".join(parts)
+
+        self._record(baseline_tokens, estimate_tokens(excerpt))
+        return excerpt
+
+    def _select(self, windows: List[str], scores: List[float], budget_chars: int) -> List[int]:
+        selected = set()
+        used = 0
+
+        def take(index: int) -> bool:
+            nonlocal used
+            cost = len(windows[index]) + len(GAP_MARKER)
+            if used + cost > budget_chars:
+                return False
+            selected.add(index)
+            used += cost
+            return True
+
+        # Densest windows first (earlier wins ties)
+        for index in sorted((i for i, s in enumerate(scores) if s > 0), key=lambda i: (-scores[i], i)):
+            take(index)
+
+        # Spread whatever budget is left evenly over the rest of the video
+        remaining = [i for i in range(len(windows)) if i not in selected]
+        slots = (budget_chars - used) // (self.window_chars + len(GAP_MARKER))
+        if remaining and slots > 0:
+            for index in remaining[::max(1, len(remaining) // slots)]:
+                take(index)
+
+        return sorted(selected)
+
+    def _record(self, baseline_tokens: int, excerpt_tokens: int) -> None:
+        with self._lock:
+            self._excerpts += 1
+            self._baseline_tokens += baseline_tokens
+            self._excerpt_tokens += excerpt_tokens
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "token_budget": self.token_budget,
+                "excerpts": self._excerpts,
+                "baseline_tokens": self._baseline_tokens,
+                "excerpt_tokens": self._excerpt_tokens,
+                "tokens_saved": self._baseline_tokens - self._excerpt_tokens,
+            }
@@ -0,0 +1,115 @@
+"""
+Bounded thread pools for blocking work.
+
+Some of our dependencies (youtube-transcript-api) are synchronous. Running
+them directly inside an async endpoint blocks uvicorn's event loop, so they
+go through a dedicated pool instead: parallelism is fixed by the pool size
+and the number of waiting jobs is capped so a burst can't queue unbounded
+work behind a slow upstream.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the pool's pending queue is already full"""
+
+
+class BoundedExecutor:
+    """Thread pool with a pending-job limit and queue-depth / wait-time metrics"""
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._max_queued_seen = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.name
+            )
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) on the pool without blocking the event loop"""
+        with self._lock:
+            if self._queued + self._active >= self.max_workers + self.max_pending:
+                self._rejected += 1
+                raise ExecutorSaturated(f"{self.name} pool is saturated")
+            self._queued += 1
+            self._max_queued_seen = max(self._max_queued_seen, self._queued)
+
+        submitted_at = time.perf_counter()
+        # Whether the job has left the queue, either to start or abandoned by its caller
+        dequeued = False
+
+        def job():
+            nonlocal dequeued
+            started_at = time.perf_counter()
+            with self._lock:
+                if dequeued:
+                    return None  # the caller gave up while it was queued
+                dequeued = True
+                self._queued -= 1
+                self._active += 1
+                self._total_wait += started_at - submitted_at
+            ok = False
+            try:
+                result = fn(*args)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._total_run += time.perf_counter() - started_at
+                    if ok:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), job)
+        finally:
+            # Cancelled (or the pool shut down) before the job started: it never will
+            with self._lock:
+                if not dequeued:
+                    dequeued = True
+                    self._queued -= 1
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "queued": self._queued,
+                "active": self._active,
+                "max_queued_seen": self._max_queued_seen,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait / finished * 1000, 2) if finished else 0.0,
+                "avg_run_ms": round(self._total_run / finished * 1000, 2) if finished else 0.0,
+            }
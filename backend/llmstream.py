@@ -0,0 +1,79 @@
+"""
+Helpers for streaming: reading DeepSeek's streamed completions and
+writing server-sent events to the extension.
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class JsonObjectTracker:
+    """
+    Watches streamed text and reports when the first top-level JSON object closes.
+
+    Text before the opening brace (e.g. a ```json fence) is ignored, and
+    braces inside JSON strings don't count.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.complete = False
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once the object is complete"""
+        if self.complete:
+            return True
+        for char in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+            if char == '"' and self.started:
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif char == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+                    return True
+        return False
+
+
+def parse_stream_chunk(line: str) -> Optional[Dict[str, Any]]:
+    """
+    One chunk of an OpenAI-compatible streaming response.
+
+    Returns None for non-data lines and the [DONE] marker.
+    """
+    if not line.startswith("data:"):
+        return None
+    payload = line[5:].strip()
+    if not payload or payload == "[DONE]":
+        return None
+    return json.loads(payload)
+
+
+def stream_delta(chunk: Dict[str, Any]) -> str:
+    """Content added by a chunk (the final usage-only chunk has none)"""
+    choices = chunk.get("choices") or [{}]
+    return choices[0].get("delta", {}).get("content") or ""
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event; pydantic models are serialized as JSON"""
+    if isinstance(data, BaseModel):
+        body = data.model_dump_json()
+    else:
+        body = json.dumps(data)
+    return f"event: {event}\ndata: {body}\n\n"
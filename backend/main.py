@@ -13,9 +13,13 @@ Last updated: 2026-01-18 - Switched from Gemini to DeepSeek
 
 import os
 import json
+import asyncio
+import hashlib
 import logging
-import httpx
-from typing import Optional, List, Dict, Any
+import statistics
+import time
+from contextlib import asynccontextmanager, nullcontext
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Callable, Awaitable, Tuple, Union, Sequence
 from datetime import datetime, timedelta
 from functools import lru_cache
 
@@ -23,18 +27,38 @@ from functools import lru_cache
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-# YouTube transcript API (v1.2.x - new API)
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api import (
-    TranscriptsDisabled,
-    NoTranscriptFound,
-    VideoUnavailable
-)
+try:
+    import orjson
+except ImportError:  # optional: responses fall back to the stdlib json encoder
+    orjson = None
+
+# httpx, youtube-transcript-api and numpy are imported on first use (or
+# warmed in the background after startup), keeping them off the cold-start
+# path: together they are about half of the import time of this module
+if TYPE_CHECKING:
+    import httpx
+    import numpy as np
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+from cache import TieredCache, shared_fill
+from executor import BoundedExecutor, ExecutorSaturated
+from singleflight import SingleFlight
+from microbatch import MicroBatcher
+from textscan import KeywordMatcher
+from excerpt import ExcerptBuilder, estimate_tokens
+from llmstream import JsonObjectTracker, parse_stream_chunk, stream_delta, sse_event
+from resilience import CircuitBreaker, DeadlineMiddleware, LatencyTracker, remaining_budget
+from ratelimit import LLMScheduler, RateLimited, current_priority, parse_retry_after
+from precompute import BackgroundQueue
+from metrics import LoopLagMonitor, MetricsMiddleware, Registry
+from compression import CompressionMiddleware
+from transcript import CompactTranscript, dump_cache_value, load_cache_value, resolve_codec, segment_boundaries
+from topicindex import TopicIndex, TopicSnapshot, normalize_topic
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -54,13 +78,130 @@ logger.info(f"YOUTUBE_API_KEY loaded: {'Yes' if YOUTUBE_API_KEY else 'No'} ({len
 AI_AVAILABLE = bool(DEEPSEEK_API_KEY)
 logger.info(f"AI_AVAILABLE: {AI_AVAILABLE}")
 
+# DeepSeek HTTP client (one pooled client per worker)
+DEEPSEEK_API_URL = os.getenv("DEEPSEEK_API_URL", "https://api.deepseek.com/v1/chat/completions")
+DEEPSEEK_MAX_CONNECTIONS = int(os.getenv("DEEPSEEK_MAX_CONNECTIONS", 50))
+DEEPSEEK_MAX_KEEPALIVE = int(os.getenv("DEEPSEEK_MAX_KEEPALIVE", 20))
+DEEPSEEK_KEEPALIVE_EXPIRY = float(os.getenv("DEEPSEEK_KEEPALIVE_EXPIRY", 60.0))
+DEEPSEEK_CONNECT_TIMEOUT = float(os.getenv("DEEPSEEK_CONNECT_TIMEOUT", 5.0))
+DEEPSEEK_READ_TIMEOUT = float(os.getenv("DEEPSEEK_READ_TIMEOUT", 30.0))
+DEEPSEEK_HTTP2 = os.getenv("DEEPSEEK_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# Read completions in streaming mode and stop as soon as the JSON object closes
+DEEPSEEK_STREAM = os.getenv("DEEPSEEK_STREAM", "true").lower() in ("1", "true", "yes")
+
+# Request latency budgets, from the X-Deadline-Ms header or ?deadline_ms=
+# (0 = requests without one have no deadline)
+DEFAULT_REQUEST_BUDGET_MS = float(os.getenv("DEFAULT_REQUEST_BUDGET_MS", 0))
+# Skip DeepSeek when less than this is left; the reserve is kept for the heuristic fallback
+DEEPSEEK_MIN_BUDGET_MS = float(os.getenv("DEEPSEEK_MIN_BUDGET_MS", 1000))
+DEADLINE_FALLBACK_RESERVE_MS = float(os.getenv("DEADLINE_FALLBACK_RESERVE_MS", 50))
+
+# Circuit breaker: stop calling DeepSeek after a run of failed/slow calls
+DEEPSEEK_BREAKER_FAILURES = int(os.getenv("DEEPSEEK_BREAKER_FAILURES", 5))
+DEEPSEEK_SLOW_CALL_SECONDS = float(os.getenv("DEEPSEEK_SLOW_CALL_SECONDS", 15.0))
+DEEPSEEK_BREAKER_RESET_SECONDS = float(os.getenv("DEEPSEEK_BREAKER_RESET_SECONDS", 30.0))
+
+# Hedged requests: send a second copy of a call that outlives this latency percentile
+DEEPSEEK_HEDGE = os.getenv("DEEPSEEK_HEDGE", "false").lower() in ("1", "true", "yes")
+DEEPSEEK_HEDGE_PERCENTILE = float(os.getenv("DEEPSEEK_HEDGE_PERCENTILE", 95))
+
+# Outbound DeepSeek rate limits (0 = unlimited); interactive calls go first
+DEEPSEEK_REQUESTS_PER_SECOND = float(os.getenv("DEEPSEEK_REQUESTS_PER_SECOND", 0))
+DEEPSEEK_REQUEST_BURST = int(os.getenv("DEEPSEEK_REQUEST_BURST", 10))
+DEEPSEEK_TOKENS_PER_MINUTE = float(os.getenv("DEEPSEEK_TOKENS_PER_MINUTE", 0))
+DEEPSEEK_MAX_RATE_LIMIT_RETRIES = int(os.getenv("DEEPSEEK_MAX_RATE_LIMIT_RETRIES", 2))
+DEEPSEEK_DEFAULT_RETRY_AFTER = float(os.getenv("DEEPSEEK_DEFAULT_RETRY_AFTER", 1.0))
+
+# HTTP caching of GET /transcript/{video_id} (negative = no captions available)
+TRANSCRIPT_HTTP_MAX_AGE = int(os.getenv("TRANSCRIPT_HTTP_MAX_AGE", 86400))
+TRANSCRIPT_HTTP_NEGATIVE_MAX_AGE = int(os.getenv("TRANSCRIPT_HTTP_NEGATIVE_MAX_AGE", 3600))
+
+# Response compression (gzip, or brotli if installed) for bodies of at least this size
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", 1024))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", 6))
+
+# Import lazily loaded dependencies in the background once the app is up
+STARTUP_WARM_UP = os.getenv("STARTUP_WARM_UP", "true").lower() in ("1", "true", "yes")
+
+# Use one combined DeepSeek prompt for quality + greenwashing in /analyze
+FUSED_ANALYSIS = os.getenv("FUSED_ANALYSIS", "false").lower() in ("1", "true", "yes")
+
+# Micro-batching of title-only quality scoring (0 disables)
+QUALITY_BATCH_WINDOW_MS = float(os.getenv("QUALITY_BATCH_WINDOW_MS", 0))
+QUALITY_BATCH_MAX_ITEMS = int(os.getenv("QUALITY_BATCH_MAX_ITEMS", 10))
+
+# Bulk heuristic ranking
+BULK_SCORE_MAX_ITEMS = int(os.getenv("BULK_SCORE_MAX_ITEMS", 10000))
+
+# Batch bias receipts (one candidate set per request)
+BIAS_RECEIPT_BATCH_MAX_ITEMS = int(os.getenv("BIAS_RECEIPT_BATCH_MAX_ITEMS", 2000))
+
+# Transcript excerpts sent to DeepSeek, in estimated tokens (0 = old head slicing)
+QUALITY_TRANSCRIPT_TOKEN_BUDGET = int(os.getenv("QUALITY_TRANSCRIPT_TOKEN_BUDGET", 1500))
+GREENWASHING_TRANSCRIPT_TOKEN_BUDGET = int(os.getenv("GREENWASHING_TRANSCRIPT_TOKEN_BUDGET", 1200))
+
+# Batch analysis
+ANALYZE_BATCH_CONCURRENCY = int(os.getenv("ANALYZE_BATCH_CONCURRENCY", 8))
+ANALYZE_BATCH_MAX_ITEMS = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", 100))
+
+# Background cache warming (/precompute)
+PRECOMPUTE_WORKERS = int(os.getenv("PRECOMPUTE_WORKERS", 2))
+PRECOMPUTE_MAX_QUEUED = int(os.getenv("PRECOMPUTE_MAX_QUEUED", 1000))
+PRECOMPUTE_MAX_ATTEMPTS = int(os.getenv("PRECOMPUTE_MAX_ATTEMPTS", 3))
+PRECOMPUTE_RETRY_BASE_SECONDS = float(os.getenv("PRECOMPUTE_RETRY_BASE_SECONDS", 5.0))
+
+# Transcript fetch pool (youtube-transcript-api is blocking)
+TRANSCRIPT_FETCH_WORKERS = int(os.getenv("TRANSCRIPT_FETCH_WORKERS", 8))
+TRANSCRIPT_FETCH_MAX_PENDING = int(os.getenv("TRANSCRIPT_FETCH_MAX_PENDING", 64))
+
+# Transcript track selection
+TRANSCRIPT_ALLOW_TRANSLATION = os.getenv("TRANSCRIPT_ALLOW_TRANSLATION", "false").lower() in ("1", "true", "yes")
+TRANSCRIPT_TRACK_LIST_TTL_SECONDS = float(os.getenv("TRANSCRIPT_TRACK_LIST_TTL_SECONDS", 3600))
+TRANSCRIPT_TRACK_LIST_CACHE_SIZE = int(os.getenv("TRANSCRIPT_TRACK_LIST_CACHE_SIZE", 2048))
+
+# DeepSeek result cache (content-addressed on the rendered prompt).
+# Bump LLM_CACHE_VERSION to drop every cached result at once; editing a
+# prompt template invalidates that prompt type's entries automatically.
+DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+LLM_CACHE_VERSION = os.getenv("LLM_CACHE_VERSION", "1")
+LLM_CACHE_HOT_SIZE = int(os.getenv("LLM_CACHE_HOT_SIZE", 1024))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 100000))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 14 * 86400))
+
+# Transcript cache (memory LRU + SQLite on disk)
+TRANSCRIPT_CACHE_HOT_SIZE = int(os.getenv("TRANSCRIPT_CACHE_HOT_SIZE", 256))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", 20000))
+TRANSCRIPT_CACHE_TTL_SECONDS = float(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", 30 * 86400))
+TRANSCRIPT_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("TRANSCRIPT_CACHE_NEGATIVE_TTL_SECONDS", 86400))
+# Cached transcript text: "none", "zlib" or "zstd" (zstd needs the zstandard package, else zlib)
+TRANSCRIPT_CODEC = resolve_codec(os.getenv("TRANSCRIPT_CODEC", "none"))
+
+# Cross-worker miss coordination on the shared disk tier: one worker fills
+# a missing transcript / DeepSeek result, the others wait for it
+CACHE_SHARED_FILL = os.getenv("CACHE_SHARED_FILL", "true").lower() in ("1", "true", "yes")
+CACHE_FILL_LEASE_SECONDS = float(os.getenv("CACHE_FILL_LEASE_SECONDS", 20))
+
+# Per-topic channel statistics built from every analyzed video (same SQLite file as the caches)
+TOPIC_INDEX_ENABLED = os.getenv("TOPIC_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+TOPIC_INDEX_MAX_TOPICS = int(os.getenv("TOPIC_INDEX_MAX_TOPICS", 500))  # held in memory
+TOPIC_INDEX_HEAVY_HITTERS = int(os.getenv("TOPIC_INDEX_HEAVY_HITTERS", 64))  # channels tracked per topic
+TOPIC_INDEX_MAX_STORED = int(os.getenv("TOPIC_INDEX_MAX_STORED", 100000))
+TOPIC_INDEX_HALF_LIFE_SECONDS = float(os.getenv("TOPIC_INDEX_HALF_LIFE_SECONDS", 14 * 86400))
+TOPIC_INDEX_FLUSH_SECONDS = float(os.getenv("TOPIC_INDEX_FLUSH_SECONDS", 30))
+# Topics with fewer (decayed) videos than this are not used by the scorers
+TOPIC_INDEX_MIN_VIDEOS = float(os.getenv("TOPIC_INDEX_MIN_VIDEOS", 20))
+
 # ============================================
 # PYDANTIC MODELS
 # ============================================
 
+# What /analyze fetches; /analyze's transcript URLs ask for the same languages
+DEFAULT_TRANSCRIPT_LANGUAGES = ["en", "en-US", "en-GB"]
+
 class TranscriptRequest(BaseModel):
     video_id: str
-    languages: List[str] = Field(default=["en", "en-US", "en-GB"])
+    languages: List[str] = Field(default=DEFAULT_TRANSCRIPT_LANGUAGES)
 
 class TranscriptResponse(BaseModel):
     success: bool
@@ -70,6 +211,16 @@ class TranscriptResponse(BaseModel):
     duration_seconds: Optional[float] = None
     error: Optional[str] = None
 
+class TranscriptSummary(BaseModel):
+    """Transcript metadata, returned by /analyze instead of the full text"""
+    success: bool
+    video_id: str
+    language: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    chars: Optional[int] = None
+    url: Optional[str] = None  # GET this for the full transcript (same languages, same cache entry)
+    error: Optional[str] = None
+
 class QualityScoreRequest(BaseModel):
     video_id: str
     title: str
@@ -112,10 +263,12 @@ class BiasReceiptRequest(BaseModel):
     subscriber_count: int = 0
     views_per_day: float = 0
     engagement_ratio: float = 0
-    avg_subs_in_topic: int = 100000
-    topic_concentration: int = 50
+    # Taken from the topic index for `query` when omitted
+    avg_subs_in_topic: Optional[int] = None
+    topic_concentration: Optional[int] = None
     video_title: str = ""
     channel_title: str = ""
+    query: str = ""
 
 class BiasReceiptResponse(BaseModel):
     success: bool
@@ -130,165 +283,806 @@ class BiasReceiptResponse(BaseModel):
 # FASTAPI APP
 # ============================================
 
-app = FastAPI(
-    title="Silenced by the Algorithm - Backend",
-    description="Python backend for transcript fetching and DeepSeek AI analysis",
-    version="1.1.0"
-)
+deepseek_client: Optional["httpx.AsyncClient"] = None
+
+def create_deepseek_client() -> "httpx.AsyncClient":
+    """Build the pooled, keep-alive HTTP client used for all DeepSeek calls"""
+    import httpx
+    
+    http2 = DEEPSEEK_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401  (httpx needs it for HTTP/2)
+        except ImportError:
+            logger.warning("DEEPSEEK_HTTP2 is set but 'h2' is not installed - using HTTP/1.1")
+            http2 = False
+    
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=DEEPSEEK_MAX_CONNECTIONS,
+            max_keepalive_connections=DEEPSEEK_MAX_KEEPALIVE,
+            keepalive_expiry=DEEPSEEK_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(
+            DEEPSEEK_READ_TIMEOUT,
+            connect=DEEPSEEK_CONNECT_TIMEOUT
+        ),
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {DEEPSEEK_API_KEY}"
+        }
+    )
+
+def get_deepseek_client() -> "httpx.AsyncClient":
+    """Shared DeepSeek client, created on first use"""
+    global deepseek_client
+    if deepseek_client is None or deepseek_client.is_closed:
+        deepseek_client = create_deepseek_client()
+    return deepseek_client
+
+@lru_cache(maxsize=None)
+def load_numpy():
+    """numpy, imported on first use; None if it isn't installed"""
+    try:
+        import numpy
+        return numpy
+    except ImportError:  # optional: bulk scoring falls back to the scalar heuristic
+        return None
+
+def _warm_up() -> None:
+    """Import the lazily loaded dependencies ahead of the first request that needs them"""
+    started = time.perf_counter()
+    import httpx  # noqa: F401
+    import youtube_transcript_api  # noqa: F401
+    logger.info(f"Warm-up imports done in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+def _open_caches() -> None:
+    """Open the SQLite disk tiers (not at import, so importing main stays cheap)"""
+    for cache in (transcript_cache, *llm_result_caches.values()):
+        cache.open()
+    if TOPIC_INDEX_ENABLED:
+        topic_index.open()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers; close long-lived clients on shutdown"""
+    global deepseek_client
+    await asyncio.to_thread(_open_caches)
+    precompute_queue.start()
+    loop_lag_monitor.start()
+    # Off the startup path: the app reports ready while this runs
+    warm_up = asyncio.get_running_loop().run_in_executor(None, _warm_up) if STARTUP_WARM_UP else None
+    topic_flusher = asyncio.create_task(_flush_topic_index_periodically()) if TOPIC_INDEX_ENABLED else None
+    try:
+        yield
+    finally:
+        if warm_up is not None:
+            await warm_up
+        if topic_flusher is not None:
+            topic_flusher.cancel()
+            await asyncio.to_thread(topic_index.flush)
+        await loop_lag_monitor.stop()
+        await precompute_queue.stop()
+        if deepseek_client is not None:
+            await deepseek_client.aclose()
+            deepseek_client = None
+        transcript_executor.shutdown()
+
+# Endpoints are registered on this router; create_app() mounts it
+router = APIRouter()
+
+# ============================================
+# METRICS
+# ============================================
 
-# CORS - allow extension to call this
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, restrict to extension origin
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+metrics = Registry()
+http_requests = metrics.counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_latency = metrics.histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+stage_latency = metrics.histogram("stage_duration_seconds", "Time spent in pipeline stages", ("stage",))
+deepseek_responses = metrics.counter("deepseek_responses_total", "DeepSeek responses by HTTP status ('error' = no response)", ("status",))
+deepseek_tokens = metrics.counter("deepseek_tokens_total", "DeepSeek token usage reported by completions", ("type",))
+analysis_results = metrics.counter("analysis_results_total", "Quality / greenwashing results by method (AI vs heuristic fallback)", ("kind", "method"))
+loop_lag = metrics.histogram(
+    "event_loop_lag_seconds", "How late the event loop wakes from a 0.5 s sleep",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
 )
+loop_lag_monitor = LoopLagMonitor(loop_lag)
+
+_route_paths: Dict[Any, str] = {}
+
+def _route_of(scope: dict) -> Optional[str]:
+    """Path template of the route that handled the request"""
+    if not _route_paths:
+        _route_paths.update({route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")})
+    return _route_paths.get(scope.get("endpoint"))
+
+def record_analysis_result(kind: str, method: Optional[str]) -> None:
+    analysis_results.inc(kind, method or "unknown")
+
+def _record_usage(usage: Optional[Dict[str, Any]]) -> None:
+    if usage:
+        deepseek_tokens.inc("prompt", amount=usage.get("prompt_tokens") or 0)
+        deepseek_tokens.inc("completion", amount=usage.get("completion_tokens") or 0)
+
+# Gauges are read from the components' own stats when /metrics is scraped
+metrics.gauge("cache_hit_ratio", "Hit ratio per cache", ("cache",), lambda: {
+    (name,): cache.stats(disk=False)["hit_ratio"]
+    for name, cache in [("transcripts", transcript_cache), ("transcript_tracks", track_list_cache)]
+    + [(f"llm_{t}", c) for t, c in llm_result_caches.items()]
+})
+metrics.gauge("queue_depth", "Work waiting in each queue", ("queue",), lambda: {
+    ("transcript_fetch",): transcript_executor.stats()["queued"],
+    ("precompute",): precompute_queue.stats()["queued"],
+    **{(f"deepseek_{p}",): c["queued"] for p, c in deepseek_scheduler.stats()["classes"].items()}
+})
+metrics.gauge("deepseek_circuit_open", "1 while the DeepSeek circuit breaker is open", (), lambda: {
+    (): 1 if deepseek_breaker.state == CircuitBreaker.OPEN else 0
+})
+metrics.gauge("event_loop_lag_max_seconds", "Worst event loop lag since startup", (), lambda: {
+    (): loop_lag_monitor.max_lag
+})
 
 # ============================================
 # DEEPSEEK API HELPER
 # ============================================
 
+# Identical prompts in flight at the same time share one API call
+deepseek_flight = SingleFlight("deepseek")
+
+deepseek_breaker = CircuitBreaker(
+    "deepseek",
+    failure_threshold=DEEPSEEK_BREAKER_FAILURES,
+    slow_call_seconds=DEEPSEEK_SLOW_CALL_SECONDS,
+    reset_seconds=DEEPSEEK_BREAKER_RESET_SECONDS,
+)
+deepseek_latency = LatencyTracker()
+deepseek_guard_stats = {"deadline_skips": 0, "deadline_timeouts": 0, "hedged": 0, "hedge_wins": 0, "hedge_skips": 0}
+
 async def call_deepseek_api(prompt: str, max_tokens: int = 500, temperature: float = 0.3) -> Optional[str]:
-    """Call DeepSeek API (OpenAI-compatible)"""
+    """
+    Call DeepSeek API (OpenAI-compatible)
+    
+    Returns None (so callers fall back to their heuristic) when there is no
+    key, the circuit is open, or the request's deadline leaves too little
+    time for a completion.
+    """
     if not DEEPSEEK_API_KEY:
         return None
     
+    budget = remaining_budget()
+    if budget is not None:
+        budget -= DEADLINE_FALLBACK_RESERVE_MS / 1000
+        if budget < DEEPSEEK_MIN_BUDGET_MS / 1000:
+            deepseek_guard_stats["deadline_skips"] += 1
+            return None
+    
+    normalized = " ".join(prompt.split())
+    key = hashlib.sha256(f"{max_tokens}:{temperature}:{normalized}".encode("utf-8")).hexdigest()
+    call = deepseek_flight.do(key, lambda: _guarded_deepseek(prompt, max_tokens, temperature))
+    if budget is None:
+        return await call
+    
+    try:
+        # Only this caller stops waiting; the shared call keeps running
+        return await asyncio.wait_for(call, budget)
+    except asyncio.TimeoutError:
+        deepseek_guard_stats["deadline_timeouts"] += 1
+        logger.warning(f"DeepSeek call exceeded the request deadline (gave up after {budget * 1000:.0f} ms)")
+        return None
+
+async def _guarded_deepseek(prompt: str, max_tokens: int, temperature: float) -> Optional[str]:
+    """
+    One logical call: a rate-limit permit, then the send through the circuit breaker.
+    
+    Only the sends are timed (for the breaker and for hedging): waiting for a
+    permit, or out a 429's Retry-After, is our own queueing, not a slow upstream.
+    """
+    payload = {
+        "model": DEEPSEEK_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    tokens = estimate_tokens(prompt) + max_tokens
+    for attempt in range(DEEPSEEK_MAX_RATE_LIMIT_RETRIES + 1):
+        if not deepseek_breaker.allow():
+            return None
+        try:
+            await deepseek_scheduler.acquire(tokens)
+        except BaseException:
+            deepseek_breaker.release()
+            raise
+        
+        started = time.perf_counter()
+        result = None
+        try:
+            result = await _hedged_deepseek(payload, tokens)
+        except RateLimited as e:
+            # The upstream answered; it just wants fewer calls
+            deepseek_breaker.release()
+            deepseek_scheduler.backoff(e.retry_after)
+            logger.warning(f"DeepSeek rate limited, retrying after {e.retry_after:.1f}s")
+            continue
+        except BaseException:
+            deepseek_breaker.record(False, time.perf_counter() - started)
+            raise
+        
+        duration = time.perf_counter() - started
+        deepseek_breaker.record(result is not None, duration)
+        if result is not None:
+            deepseek_latency.record(duration)
+        return result
+    
+    logger.error("DeepSeek API still rate limited after retries")
+    return None
+
+async def _hedged_deepseek(payload: Dict[str, Any], tokens: float) -> Optional[str]:
+    """
+    Send the request; with DEEPSEEK_HEDGE, send a second copy once the first
+    has run longer than the recent p95 and take whichever answers first.
+    The copy only goes out if a permit is free right away: while we are
+    being rate limited, a hedge would just queue behind the first call.
+    """
+    hedge_after = deepseek_latency.percentile(DEEPSEEK_HEDGE_PERCENTILE) if DEEPSEEK_HEDGE else None
+    if hedge_after is None:
+        return await _send_deepseek(payload)
+    
+    first = asyncio.ensure_future(_send_deepseek(payload))
+    pending = {first}
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.deepseek.com/v1/chat/completions",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {DEEPSEEK_API_KEY}"
-                },
-                json={
-                    "model": "deepseek-chat",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": temperature,
-                    "max_tokens": max_tokens
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("choices", [{}])[0].get("message", {}).get("content")
-            else:
-                logger.error(f"DeepSeek API error {response.status_code}: {response.text}")
-                return None
-                
+        done, pending = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            return first.result()
+        if not deepseek_scheduler.try_acquire(tokens):
+            deepseek_guard_stats["hedge_skips"] += 1
+            return await first
+        
+        deepseek_guard_stats["hedged"] += 1
+        pending.add(asyncio.ensure_future(_send_deepseek(payload)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None and pending:
+                    continue  # the other copy may still answer
+                result = task.result()
+                if result is not None:
+                    if task is not first:
+                        deepseek_guard_stats["hedge_wins"] += 1
+                    return result
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+deepseek_scheduler = LLMScheduler(
+    "deepseek",
+    requests_per_second=DEEPSEEK_REQUESTS_PER_SECOND,
+    request_burst=DEEPSEEK_REQUEST_BURST,
+    tokens_per_minute=DEEPSEEK_TOKENS_PER_MINUTE,
+)
+
+async def _send_deepseek(payload: Dict[str, Any]) -> Optional[str]:
+    """One HTTP request; a 429 raises RateLimited, any other failure is None"""
+    try:
+        with stage_latency.time("deepseek_call"):
+            if DEEPSEEK_STREAM:
+                return await _stream_deepseek(payload)
+            return await _complete_deepseek(payload)
+    except RateLimited:
+        raise
     except Exception as e:
+        deepseek_responses.inc("error")
         logger.error(f"DeepSeek API call failed: {str(e)}")
         return None
 
+def _check_rate_limited(response: "httpx.Response") -> None:
+    if response.status_code == 429:
+        raise RateLimited(parse_retry_after(response.headers.get("retry-after"), DEEPSEEK_DEFAULT_RETRY_AFTER))
+
+async def _complete_deepseek(payload: Dict[str, Any]) -> Optional[str]:
+    response = await get_deepseek_client().post(DEEPSEEK_API_URL, json=payload)
+    deepseek_responses.inc(str(response.status_code))
+    _check_rate_limited(response)
+    
+    if response.status_code == 200:
+        data = response.json()
+        _record_usage(data.get("usage"))
+        return data.get("choices", [{}])[0].get("message", {}).get("content")
+    else:
+        logger.error(f"DeepSeek API error {response.status_code}: {response.text}")
+        return None
+
+# Streams still being drained after their JSON was complete
+_draining_streams: set = set()
+
+async def _stream_deepseek(payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Streaming completion, returned as soon as the top-level JSON object closes.
+    
+    Every prompt asks for JSON only, so whatever follows the closing brace
+    (a code fence, [DONE]) is read in the background just to hand the
+    connection back to the pool.
+    """
+    client = get_deepseek_client()
+    request = client.build_request("POST", DEEPSEEK_API_URL, json={
+        **payload,
+        "stream": True,
+        "stream_options": {"include_usage": True}  # token counts arrive in a final chunk
+    })
+    response = await client.send(request, stream=True)
+    deepseek_responses.inc(str(response.status_code))
+    
+    if response.status_code != 200:
+        body = await response.aread()
+        await response.aclose()
+        _check_rate_limited(response)
+        logger.error(f"DeepSeek API error {response.status_code}: {body.decode('utf-8', 'replace')}")
+        return None
+    
+    tracker = JsonObjectTracker()
+    parts: List[str] = []
+    lines = response.aiter_lines()
+    try:
+        async for line in lines:
+            chunk = parse_stream_chunk(line)
+            if chunk is None:
+                continue
+            _record_usage(chunk.get("usage"))
+            delta = stream_delta(chunk)
+            if not delta:
+                continue
+            parts.append(delta)
+            if tracker.feed(delta):
+                task = asyncio.ensure_future(_drain_stream(response, lines))
+                _draining_streams.add(task)
+                task.add_done_callback(_draining_streams.discard)
+                response = None
+                break
+    finally:
+        if response is not None:
+            await response.aclose()
+    
+    return "".join(parts)
+
+async def _drain_stream(response: "httpx.Response", lines) -> None:
+    try:
+        async for line in lines:
+            if '"usage"' in line:
+                chunk = parse_stream_chunk(line)
+                if chunk is not None:
+                    _record_usage(chunk.get("usage"))
+    except Exception:
+        pass
+    finally:
+        await response.aclose()
+
+# One cache per prompt type so hit ratios can be read separately
+llm_result_caches = {
+    prompt_type: TieredCache(
+        f"llm_{prompt_type}",
+        hot_size=LLM_CACHE_HOT_SIZE,
+        max_entries=LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+    )
+    for prompt_type in ("quality", "greenwashing", "fused")
+}
+
+def fill_lease(cache: TieredCache, key: str):
+    """
+    async with: yields a value another worker cached while we waited, or
+    None if this worker should fill key (waits stay within the request budget)
+    """
+    if not CACHE_SHARED_FILL:
+        return nullcontext()
+    return shared_fill(cache, key, CACHE_FILL_LEASE_SECONDS, max_wait=remaining_budget())
+
+def llm_cache_key(template: str, prompt: str, max_tokens: int, temperature: float) -> str:
+    """Hash of everything that determines a completion, plus the cache/template versions"""
+    template_version = hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+    material = "\x00".join([
+        LLM_CACHE_VERSION, template_version, DEEPSEEK_MODEL,
+        str(max_tokens), str(temperature), prompt
+    ])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+@stage_latency.timed("json_parse")
+def parse_llm_json(response_text: str) -> Dict[str, Any]:
+    """Parse a JSON completion, stripping markdown code fences if present"""
+    response_text = response_text.strip()
+    if response_text.startswith("```"):
+        response_text = response_text.split("```")[1]
+        if response_text.startswith("json"):
+            response_text = response_text[4:]
+    response_text = response_text.strip()
+    
+    result = json.loads(response_text)
+    if not isinstance(result, dict):
+        raise ValueError("Expected a JSON object")
+    return result
+
 # ============================================
 # TRANSCRIPT FETCHING
 # ============================================
 
-@app.get("/health")
+@router.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "ai_available": AI_AVAILABLE,
-        "youtube_api_available": bool(YOUTUBE_API_KEY)
+        "youtube_api_available": bool(YOUTUBE_API_KEY),
+        "transcript_fetch": transcript_executor.stats(),
+        "quality_batching": quality_batcher.stats(),
+        "precompute": precompute_queue.stats(),
+        "deepseek": {
+            "circuit": deepseek_breaker.stats(),
+            "latency": deepseek_latency.stats(),
+            **deepseek_guard_stats
+        },
+        "deepseek_scheduler": deepseek_scheduler.stats(),
+        "transcript_excerpts": {
+            builder.name: builder.stats()
+            for builder in (quality_excerpts, greenwashing_excerpts, fused_excerpts)
+        }
     }
 
-@app.post("/transcript", response_model=TranscriptResponse)
-async def get_transcript(request: TranscriptRequest):
+@router.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text exposition of request, stage, DeepSeek and queue metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def _storage_stats() -> Dict[str, Any]:
+    return {
+        "transcripts": transcript_cache.stats(),
+        "transcript_tracks": track_list_cache.stats(),
+        "topic_index": topic_index.stats(),
+        "llm": {
+            prompt_type: cache.stats()
+            for prompt_type, cache in llm_result_caches.items()
+        },
+    }
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Cache hit/miss and request-coalescing counters, for sizing the caches"""
+    # Row counts and the topic index's lock: off the event loop
+    return {
+        **await asyncio.to_thread(_storage_stats),
+        "coalescing": {
+            "transcript": transcript_flight.stats(),
+            "deepseek": deepseek_flight.stats(),
+            "analyze": analysis_flight.stats()
+        }
+    }
+
+transcript_cache = TieredCache(
+    "transcripts",
+    hot_size=TRANSCRIPT_CACHE_HOT_SIZE,
+    max_entries=TRANSCRIPT_CACHE_MAX_ENTRIES,
+    ttl_seconds=TRANSCRIPT_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=TRANSCRIPT_CACHE_NEGATIVE_TTL_SECONDS,
+    dumps=dump_cache_value,
+    loads=load_cache_value,
+)
+
+# Concurrent misses for the same video/languages share one fetch
+transcript_flight = SingleFlight("transcript")
+
+# Dedicated pool so blocking YouTube fetches never run on the event loop
+transcript_executor = BoundedExecutor(
+    "transcript-fetch",
+    max_workers=TRANSCRIPT_FETCH_WORKERS,
+    max_pending=TRANSCRIPT_FETCH_MAX_PENDING,
+)
+
+# Track listings hold signed caption URLs, so they stay in memory only and
+# expire well before YouTube's URLs do
+track_list_cache = TieredCache(
+    "transcript_tracks",
+    path="",
+    hot_size=TRANSCRIPT_TRACK_LIST_CACHE_SIZE,
+    ttl_seconds=TRANSCRIPT_TRACK_LIST_TTL_SECONDS,
+)
+
+_transcript_api: Optional["YouTubeTranscriptApi"] = None
+
+def _get_transcript_api() -> "YouTubeTranscriptApi":
+    """Shared API instance (reuses one HTTP session across fetches)"""
+    global _transcript_api
+    if _transcript_api is None:
+        from youtube_transcript_api import YouTubeTranscriptApi
+        _transcript_api = YouTubeTranscriptApi()
+    return _transcript_api
+
+def _list_transcript_tracks(video_id: str):
+    """One listing round trip per video; later language variants reuse it"""
+    transcript_list = track_list_cache.get(video_id)
+    if transcript_list is None:
+        transcript_list = _get_transcript_api().list(video_id)
+        track_list_cache.set(video_id, transcript_list)
+    return transcript_list
+
+def _select_track(transcript_list, languages: List[str]):
     """
-    Fetch YouTube video transcript using youtube-transcript-api v1.2+
-    
-    This bypasses CORS issues that the Chrome extension faces.
+    Pick the best track locally, without any network calls.
+
+    Order: the preferred languages in turn, manual before generated within
+    each (as find_transcript does), a translation into the first preferred
+    language (if enabled), then any manual track, then any generated track.
     """
-    video_id = request.video_id
-    languages = request.languages
+    tracks = list(transcript_list)
+    manual = [t for t in tracks if not t.is_generated]
+    generated = [t for t in tracks if t.is_generated]
     
-    logger.info(f"Fetching transcript for video: {video_id}")
+    for lang in languages:
+        for group in (manual, generated):
+            for track in group:
+                if track.language_code == lang:
+                    return track
+    
+    if TRANSCRIPT_ALLOW_TRANSLATION and languages:
+        target = languages[0]
+        for track in manual + generated:
+            if any(t.language_code == target for t in track.translation_languages):
+                return track.translate(target)
+    
+    if manual:
+        return manual[0]
+    if generated:
+        return generated[0]
+    return None
+
+def _track_cache_key(video_id: str, track) -> str:
+    kind = "asr" if track.is_generated else "manual"
+    return f"{video_id}:track:{track.language_code}:{kind}"
+
+def _fetch_transcript(video_id: str, languages: List[str]) -> Dict[str, Any]:
+    """
+    Resolve and download a transcript from YouTube (runs on the fetch pool).
+
+    Returns a cache entry: either {"track_key": ...} pointing at the stored
+    transcript of the selected track, or a negative TranscriptResponse dict
+    for definitive "no captions" outcomes. Anything unexpected (network
+    errors etc.) is raised to the caller.
+    """
+    from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
     
     try:
-        # Create API instance (new in v1.2+)
-        api = YouTubeTranscriptApi()
+        transcript_list = _list_transcript_tracks(video_id)
+        track = _select_track(transcript_list, languages)
         
-        # Try to fetch transcript directly with preferred languages
-        transcript_data = None
-        used_language = None
+        if track is None:
+            return TranscriptResponse(
+                success=False,
+                video_id=video_id,
+                error="No transcript available for this video"
+            ).model_dump()
         
-        # Try each preferred language
-        for lang in languages:
-            try:
-                transcript_data = api.fetch(video_id, languages=[lang])
-                used_language = lang
-                break
-            except (NoTranscriptFound, Exception):
-                continue
+        track_key = _track_cache_key(video_id, track)
+        if transcript_cache.get(track_key) is not None:
+            return {"track_key": track_key}
         
-        # If no preferred language found, try without language filter
-        if transcript_data is None:
-            try:
-                transcript_data = api.fetch(video_id)
-                used_language = 'auto'
-            except NoTranscriptFound:
-                return TranscriptResponse(
-                    success=False,
-                    video_id=video_id,
-                    error="No transcript available for this video"
-                )
+        transcript_data = track.fetch()
         
         if transcript_data is None or len(transcript_data) == 0:
             return TranscriptResponse(
                 success=False,
                 video_id=video_id,
                 error="Empty transcript returned"
-            )
+            ).model_dump()
         
-        # Combine into text (v1.2+ uses .text attribute instead of ['text'])
-        full_text = " ".join([entry.text for entry in transcript_data])
+        # Text stored once plus per-segment offsets and timings
+        # (v1.2+ snippets have .text / .start / .duration attributes)
+        compact = CompactTranscript.from_segments(
+            video_id, track.language_code, transcript_data, codec=TRANSCRIPT_CODEC
+        )
         
-        # Calculate total duration
-        total_duration = 0
-        if transcript_data:
-            last_entry = transcript_data[-1]
-            total_duration = last_entry.start + last_entry.duration
+        logger.info(f"Successfully fetched transcript for {video_id}: {compact.length} chars, {track.language_code}")
         
-        logger.info(f"Successfully fetched transcript for {video_id}: {len(full_text)} chars, {used_language}")
+        transcript_cache.set(track_key, compact)
+        return {"track_key": track_key}
         
+    except NoTranscriptFound:
         return TranscriptResponse(
-            success=True,
+            success=False,
             video_id=video_id,
-            transcript=full_text,
-            language=used_language,
-            duration_seconds=total_duration
-        )
-        
+            error="No transcript available for this video"
+        ).model_dump()
     except TranscriptsDisabled:
         return TranscriptResponse(
             success=False,
             video_id=video_id,
             error="Transcripts are disabled for this video"
-        )
+        ).model_dump()
     except VideoUnavailable:
         return TranscriptResponse(
             success=False,
             video_id=video_id,
             error="Video is unavailable"
+        ).model_dump()
+
+async def _resolve_cached_transcript(
+    entry: Optional[Dict[str, Any]]
+) -> Optional[Union[CompactTranscript, Dict[str, Any]]]:
+    """Follow a request-level entry to the track's stored transcript"""
+    if entry is not None and "track_key" in entry:
+        return await transcript_cache.aget(entry["track_key"])
+    return entry
+
+def _transcript_response(cached: Union[CompactTranscript, Dict[str, Any]]) -> TranscriptResponse:
+    """Response for a cached transcript (or for a cached negative / older dict entry)"""
+    if isinstance(cached, CompactTranscript):
+        return TranscriptResponse(
+            success=True,
+            video_id=cached.video_id,
+            transcript=cached.text,
+            language=cached.language,
+            duration_seconds=cached.duration_seconds
+        )
+    return TranscriptResponse(**cached)
+
+def transcript_cache_key(video_id: str, languages: List[str]) -> str:
+    return f"{video_id}:{','.join(languages)}"
+
+@router.post("/transcript", response_model=TranscriptResponse)
+async def get_transcript(request: TranscriptRequest):
+    """
+    Fetch YouTube video transcript using youtube-transcript-api v1.2+
+    
+    This bypasses CORS issues that the Chrome extension faces.
+    Results (including "no transcript" outcomes) are cached.
+    """
+    video_id = request.video_id
+    languages = request.languages
+    cache_key = transcript_cache_key(video_id, languages)
+    
+    cached = await _resolve_cached_transcript(await transcript_cache.aget(cache_key))
+    if cached is not None:
+        return _transcript_response(cached)
+    
+    return await transcript_flight.do(
+        cache_key, lambda: _fetch_and_cache_transcript(video_id, languages, cache_key)
+    )
+
+async def _fetch_and_cache_transcript(video_id: str, languages: List[str], cache_key: str) -> TranscriptResponse:
+    async with fill_lease(transcript_cache, cache_key) as entry:
+        # Another worker fetched it while we waited
+        resolved = await _resolve_cached_transcript(entry)
+        if resolved is not None:
+            return _transcript_response(resolved)
+        return await _fetch_transcript_into_cache(video_id, languages, cache_key)
+
+async def _fetch_transcript_into_cache(video_id: str, languages: List[str], cache_key: str) -> TranscriptResponse:
+    logger.info(f"Fetching transcript for video: {video_id}")
+    
+    try:
+        with stage_latency.time("transcript_fetch"):
+            entry = await transcript_executor.run(_fetch_transcript, video_id, languages)
+    except ExecutorSaturated:
+        logger.warning(f"Transcript fetch pool saturated, rejecting {video_id}")
+        return TranscriptResponse(
+            success=False,
+            video_id=video_id,
+            error="Transcript service busy, try again shortly"
         )
     except Exception as e:
+        # Transient failures are not cached
         logger.error(f"Error fetching transcript for {video_id}: {str(e)}")
         return TranscriptResponse(
             success=False,
             video_id=video_id,
             error=str(e)
         )
+    
+    # Request-level entries point at the selected track's transcript, so
+    # language variants resolving to the same track share one stored copy.
+    # Negative entries are definitive (disabled / unavailable / none).
+    await transcript_cache.aset(cache_key, entry, negative="track_key" not in entry)
+    resolved = await _resolve_cached_transcript(entry)
+    if resolved is None:
+        return TranscriptResponse(
+            success=False,
+            video_id=video_id,
+            error="Transcript evicted from cache, try again"
+        )
+    return _transcript_response(resolved)
 
-@app.get("/transcript/{video_id}")
+@router.get("/transcript/{video_id}", response_model=TranscriptResponse)
 async def get_transcript_simple(
+    request: Request,
     video_id: str,
-    lang: str = Query(default="en", description="Preferred language code")
+    lang: str = Query(default="en", description="Preferred language code"),
+    languages: Optional[str] = Query(default=None, description="Comma-separated language codes in order of preference; overrides lang")
 ):
-    """Simple GET endpoint for transcript fetching"""
-    return await get_transcript(TranscriptRequest(video_id=video_id, languages=[lang, "en", "en-US"]))
+    """
+    Simple GET endpoint for transcript fetching
+    
+    Cacheable: responses carry a strong ETag and Cache-Control, and a
+    matching If-None-Match gets an empty 304. Transient errors are
+    marked no-store.
+    """
+    languages = [code for code in languages.split(",") if code] if languages else []
+    if not languages:
+        languages = [lang, "en", "en-US"]
+    transcript = await get_transcript(TranscriptRequest(video_id=video_id, languages=languages))
+    
+    body = transcript.model_dump_json().encode("utf-8")
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if not await transcript_cache.acontains(transcript_cache_key(video_id, languages)):
+        cache_control = "no-store"
+    elif transcript.success:
+        cache_control = f"public, max-age={TRANSCRIPT_HTTP_MAX_AGE}"
+    else:
+        cache_control = f"public, max-age={TRANSCRIPT_HTTP_NEGATIVE_MAX_AGE}"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check; the compression layer's per-encoding suffix (-gzip / -br) is ignored"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        for suffix in ('-gzip"', '-br"'):
+            if candidate.endswith(suffix):
+                candidate = candidate[:-len(suffix)] + '"'
+        if candidate == etag:
+            return True
+    return False
+
+# ============================================
+# TOPIC INDEX
+# ============================================
+
+# Decayed channel/subscriber statistics per normalized query, fed by every
+# endpoint that analyzes videos and read by the quality heuristic and the
+# bias receipts. Each worker flushes its additions to the shared store.
+topic_index = TopicIndex(
+    max_topics=TOPIC_INDEX_MAX_TOPICS,
+    max_stored=TOPIC_INDEX_MAX_STORED,
+    half_life_seconds=TOPIC_INDEX_HALF_LIFE_SECONDS,
+    heavy_hitters=TOPIC_INDEX_HEAVY_HITTERS,
+)
+
+# The index may read SQLite (or wait for a flush), so calls go through the thread pool
+
+async def record_topic_videos(query: Optional[str], rows: List[Tuple[str, Optional[str], int, Optional[float]]]) -> None:
+    """Add analyzed videos, as (video_id, channel, subscribers, views/day) rows with None for unknowns, to query's topic"""
+    if TOPIC_INDEX_ENABLED and rows:
+        await asyncio.to_thread(topic_index.ingest, query, rows)
+
+async def topic_snapshot(query: Optional[str]) -> Optional[TopicSnapshot]:
+    """Statistics of query's topic, if enough videos have been seen for them to be used"""
+    if not TOPIC_INDEX_ENABLED:
+        return None
+    return await asyncio.to_thread(topic_index.snapshot, query, TOPIC_INDEX_MIN_VIDEOS)
+
+async def _flush_topic_index_periodically() -> None:
+    while True:
+        await asyncio.sleep(TOPIC_INDEX_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(topic_index.flush)
+        except Exception as e:
+            logger.warning(f"Topic index flush failed: {e}")
+
+@router.get("/topic-stats")
+async def topic_stats(query: str = Query(..., description="Search query; normalized to its topic")):
+    """Current statistics of a topic, however few videos it has"""
+    snapshot = await asyncio.to_thread(topic_index.snapshot, query) if TOPIC_INDEX_ENABLED else None
+    return {
+        "topic": normalize_topic(query),
+        "usable": snapshot is not None and snapshot.videos >= TOPIC_INDEX_MIN_VIDEOS,
+        "stats": snapshot.as_dict() if snapshot else None
+    }
 
 # ============================================
 # QUALITY SCORING
@@ -321,20 +1115,28 @@ Consider:
 
 Respond with ONLY valid JSON."""
 
+CLICKBAIT_PATTERNS = [
+    'you won\'t believe', 'shocking', 'insane', '!!!',
+    'gone wrong', 'exposed', 'clickbait', '😱', '🤯'
+]
+
+EDU_TERMS = ['research', 'study', 'data', 'evidence', 'according to', 'explains']
+
+@stage_latency.timed("heuristic_quality")
 def score_quality_heuristic(
     title: str,
     description: str,
     transcript: Optional[str],
     channel: str,
     subs: int,
-    query: str
+    query: str,
+    topic: Optional[TopicSnapshot] = None
 ) -> Dict[str, Any]:
-    """Heuristic-based quality scoring fallback"""
+    """Heuristic-based quality scoring fallback; `topic` (see topic_snapshot) adds context flags"""
     
     title_lower = title.lower()
     desc_lower = (description or "").lower()
     query_lower = query.lower()
-    full_text = f"{title_lower} {desc_lower}"
     
     # Relevance scoring
     relevance_score = 0.5  # Base
@@ -359,17 +1161,18 @@ def score_quality_heuristic(
         quality_score += 0.1
         flags.append("Established channel")
     
+    # Topic context only adds a flag, so scores stay comparable across topics
+    if topic is not None and subs > 0:
+        percentile = topic.subscriber_percentile(subs)
+        if percentile <= 0.25:
+            flags.append(f"Among the smallest {max(1, round(percentile * 100))}% of channels on this topic")
+    
     if len(description or "") > 200:
         quality_score += 0.1
         flags.append("Detailed description")
     
     # Negative signals (clickbait)
-    clickbait_patterns = [
-        'you won\'t believe', 'shocking', 'insane', '!!!',
-        'gone wrong', 'exposed', 'clickbait', '😱', '🤯'
-    ]
-    
-    clickbait_count = sum(1 for p in clickbait_patterns if p in full_text)
+    clickbait_count = keyword_matcher.scan_joined([title, description or ""]).count("clickbait")
     if clickbait_count > 0:
         quality_score -= min(0.2, clickbait_count * 0.1)
         flags.append(f"Potential clickbait ({clickbait_count} indicators)")
@@ -391,8 +1194,7 @@ def score_quality_heuristic(
             content_depth += 0.1
         
         # Educational indicators
-        edu_terms = ['research', 'study', 'data', 'evidence', 'according to', 'explains']
-        edu_count = sum(1 for t in edu_terms if t in transcript.lower())
+        edu_count = keyword_matcher.scan(transcript).count("edu")
         if edu_count >= 2:
             content_depth += 0.2
             flags.append("Contains educational content")
@@ -418,6 +1220,31 @@ def score_quality_heuristic(
         "method": "heuristic-transcript" if transcript else "heuristic"
     }
 
+def normalize_quality_result(result: Dict[str, Any], method: str) -> Dict[str, Any]:
+    """Turn the model's 0-100 quality JSON into QualityScoreResponse fields"""
+    # Normalize scores to 0-1
+    relevance = result.get("relevance_score", 50) / 100
+    quality = result.get("quality_score", 50) / 100
+    depth = result.get("content_depth_score")
+    if depth is not None:
+        depth = depth / 100
+    
+    # Combined score
+    if depth:
+        combined = relevance * 0.3 + quality * 0.3 + depth * 0.4
+    else:
+        combined = relevance * 0.5 + quality * 0.5
+    
+    return {
+        "relevance_score": round(relevance, 2),
+        "quality_score": round(quality, 2),
+        "content_depth_score": round(depth, 2) if depth else None,
+        "combined_score": round(combined, 2),
+        "reason": result.get("reason", "AI analysis"),
+        "flags": result.get("flags", []),
+        "method": method
+    }
+
 async def score_quality_ai(
     title: str,
     description: str,
@@ -434,9 +1261,13 @@ async def score_quality_ai(
     try:
         transcript_section = ""
         if transcript:
-            # Limit transcript to avoid token limits
-            truncated = transcript[:8000]
-            transcript_section = f"TRANSCRIPT EXCERPT:\n{truncated}\n"
+            # Most relevant windows within the token budget
+            excerpt = quality_excerpts.build(
+                transcript,
+                extra_keywords=(query or "").split(),
+                boundaries=segment_boundaries(transcript)
+            )
+            transcript_section = f"TRANSCRIPT EXCERPT:\n{excerpt}\n"
         
         prompt = QUALITY_PROMPT.format(
             title=title,
@@ -446,67 +1277,158 @@ async def score_quality_ai(
             transcript_section=transcript_section
         )
         
-        response_text = await call_deepseek_api(prompt, max_tokens=500, temperature=0.2)
-        
-        if not response_text:
-            return None
+        cache_key = llm_cache_key(QUALITY_PROMPT, prompt, max_tokens=500, temperature=0.2)
+        cached = await llm_result_caches["quality"].aget(cache_key)
+        if cached is not None:
+            return cached
         
-        # Clean markdown code blocks if present
-        response_text = response_text.strip()
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-        response_text = response_text.strip()
-        
-        result = json.loads(response_text)
-        
-        # Normalize scores to 0-1
-        relevance = result.get("relevance_score", 50) / 100
-        quality = result.get("quality_score", 50) / 100
-        depth = result.get("content_depth_score")
-        if depth is not None:
-            depth = depth / 100
-        
-        # Combined score
-        if depth:
-            combined = relevance * 0.3 + quality * 0.3 + depth * 0.4
-        else:
-            combined = relevance * 0.5 + quality * 0.5
-        
-        return {
-            "relevance_score": round(relevance, 2),
-            "quality_score": round(quality, 2),
-            "content_depth_score": round(depth, 2) if depth else None,
-            "combined_score": round(combined, 2),
-            "reason": result.get("reason", "AI analysis"),
-            "flags": result.get("flags", []),
-            "method": "deepseek-transcript" if transcript else "deepseek"
-        }
+        async with fill_lease(llm_result_caches["quality"], cache_key) as cached:
+            # Another worker filled it while we waited
+            if cached is not None:
+                return cached
+            
+            if not transcript and QUALITY_BATCH_WINDOW_MS > 0:
+                # Title-only prompts are mostly fixed overhead: share it across videos
+                scored = await quality_batcher.submit({
+                    "title": title,
+                    "channel": channel,
+                    "subs": subs,
+                    "query": query,
+                    "prompt": prompt
+                })
+            else:
+                scored = await _score_quality_prompt(prompt, has_transcript=bool(transcript))
+            
+            if scored is None:
+                return None
+            
+            await llm_result_caches["quality"].aset(cache_key, scored)
+            return scored
         
     except Exception as e:
         logger.error(f"DeepSeek quality scoring failed: {str(e)}")
         return None
 
-@app.post("/quality-score", response_model=QualityScoreResponse)
-async def score_video_quality(request: QualityScoreRequest):
-    """
-    Score video quality using DeepSeek AI with heuristic fallback
-    """
-    logger.info(f"Scoring quality for video: {request.video_id}")
+async def _score_quality_prompt(prompt: str, has_transcript: bool) -> Optional[Dict[str, Any]]:
+    """Send one rendered QUALITY_PROMPT and normalize the result"""
+    response_text = await call_deepseek_api(prompt, max_tokens=500, temperature=0.2)
     
-    # Try DeepSeek first
-    ai_result = await score_quality_ai(
-        title=request.title,
-        description=request.description,
-        transcript=request.transcript,
-        channel=request.channel_title,
-        subs=request.subscriber_count,
-        query=request.query
-    )
+    if not response_text:
+        return None
     
-    if ai_result:
-        return QualityScoreResponse(
+    result = parse_llm_json(response_text)
+    return normalize_quality_result(
+        result, method="deepseek-transcript" if has_transcript else "deepseek"
+    )
+
+QUALITY_BATCH_PROMPT = """You are a video quality analyst. Score each of these {count} videos for relevance and quality.
+
+{videos}
+
+Return JSON with one result per video, using the video's number as "id":
+{{
+  "results": [
+    {{
+      "id": <video number>,
+      "relevance_score": <0-100 how relevant to its search query>,
+      "quality_score": <0-100 based on production quality, depth, expertise>,
+      "content_depth_score": null,
+      "reason": "<brief explanation>",
+      "flags": ["<list of quality indicators or concerns>"]
+    }}
+  ]
+}}
+
+Consider:
+- Relevance: Does it actually address the topic?
+- Quality: Is it well-produced? Expert perspective?
+- Depth: Does it provide real value, not just clickbait?
+- Red flags: Clickbait, misleading title, low effort content
+
+Respond with ONLY valid JSON."""
+
+async def _score_quality_single(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    try:
+        return await _score_quality_prompt(item["prompt"], has_transcript=False)
+    except Exception as e:
+        logger.error(f"DeepSeek quality scoring failed: {str(e)}")
+        return None
+
+async def _score_quality_batch(items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Score several title-only videos with one multi-item prompt.
+    
+    Any video the model drops or returns malformed is retried with its own
+    single-video prompt.
+    """
+    if len(items) == 1:
+        return [await _score_quality_single(items[0])]
+    
+    videos = "\n\n".join(
+        f"VIDEO {i}:\nTitle: {item['title']}\nChannel: {item['channel']}\n"
+        f"Subscribers: {item['subs']}\nSearch Query/Topic: {item['query']}"
+        for i, item in enumerate(items)
+    )
+    prompt = QUALITY_BATCH_PROMPT.format(count=len(items), videos=videos)
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    try:
+        response_text = await call_deepseek_api(
+            prompt, max_tokens=min(4000, 200 * len(items)), temperature=0.2
+        )
+        entries = parse_llm_json(response_text).get("results", []) if response_text else []
+        for entry in entries:
+            try:
+                index = int(entry.get("id"))
+                if not 0 <= index < len(items) or results[index] is not None:
+                    continue
+                if "relevance_score" not in entry or "quality_score" not in entry:
+                    continue
+                scored = normalize_quality_result(entry, method="deepseek")
+                QualityScoreResponse(success=True, video_id="", **scored)
+                results[index] = scored
+            except Exception:
+                continue
+    except Exception as e:
+        logger.error(f"DeepSeek batch quality scoring failed: {str(e)}")
+    
+    missing = [i for i, scored in enumerate(results) if scored is None]
+    if missing:
+        logger.info(f"Batch quality scoring: {len(missing)}/{len(items)} items retried individually")
+        retried = await asyncio.gather(*[_score_quality_single(items[i]) for i in missing])
+        for i, scored in zip(missing, retried):
+            results[i] = scored
+    
+    return results
+
+quality_batcher = MicroBatcher(
+    "quality",
+    window_seconds=QUALITY_BATCH_WINDOW_MS / 1000,
+    max_items=QUALITY_BATCH_MAX_ITEMS,
+    run_batch=_score_quality_batch,
+)
+
+@router.post("/quality-score", response_model=QualityScoreResponse)
+async def score_video_quality(request: QualityScoreRequest):
+    """
+    Score video quality using DeepSeek AI with heuristic fallback
+    """
+    logger.info(f"Scoring quality for video: {request.video_id}")
+    await record_topic_videos(request.query, [(request.video_id, request.channel_title, request.subscriber_count, None)])
+    
+    # Try DeepSeek first
+    ai_result = await score_quality_ai(
+        title=request.title,
+        description=request.description,
+        transcript=request.transcript,
+        channel=request.channel_title,
+        subs=request.subscriber_count,
+        query=request.query
+    )
+    
+    if ai_result:
+        record_analysis_result("quality", ai_result["method"])
+        return QualityScoreResponse(
             success=True,
             video_id=request.video_id,
             **ai_result
@@ -519,8 +1441,10 @@ async def score_video_quality(request: QualityScoreRequest):
         transcript=request.transcript,
         channel=request.channel_title,
         subs=request.subscriber_count,
-        query=request.query
+        query=request.query,
+        topic=await topic_snapshot(request.query)
     )
+    record_analysis_result("quality", heuristic_result["method"])
     
     return QualityScoreResponse(
         success=True,
@@ -528,6 +1452,248 @@ async def score_video_quality(request: QualityScoreRequest):
         **heuristic_result
     )
 
+# ============================================
+# BULK HEURISTIC SCORING
+# ============================================
+
+class BulkQualityRequest(BaseModel):
+    """Columnar candidate pool: every list is indexed like video_ids"""
+    query: str = ""
+    video_ids: List[str]
+    titles: List[str]
+    descriptions: Optional[List[Optional[str]]] = None
+    subscriber_counts: Optional[List[int]] = None
+    # Either full transcripts (exact edu-term signal) or just their lengths
+    transcripts: Optional[List[Optional[str]]] = None
+    transcript_lengths: Optional[List[int]] = None
+    top_k: int = Field(default=20, ge=1)
+
+class BulkQualityResponse(BaseModel):
+    success: bool
+    total: int
+    results: List[QualityScoreResponse] = []
+    error: Optional[str] = None
+
+def _round_array(values) -> "np.ndarray":
+    # np.round scales by 100 and rounds half to even, so on exact ties (0.645,
+    # 0.815, ...) it can differ from Python's correctly rounded round(),
+    # which would break parity with score_quality_heuristic: those few
+    # values are re-rounded in Python
+    np = load_numpy()
+    rounded = np.round(values, 2)
+    near_tie = np.abs(values * 100 % 1 - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(v, 2) for v in values[near_tie].tolist()]
+    return rounded
+
+def _count_terms(texts: List[str], terms: Sequence[str]) -> "np.ndarray":
+    """For each text, how many of terms occur in it (one pass over the column per term)"""
+    np = load_numpy()
+    counts = np.zeros(len(texts), dtype=np.int64)
+    for term in terms:
+        counts += np.fromiter((term in text for text in texts), dtype=bool, count=len(texts))
+    return counts
+
+def score_quality_bulk(
+    titles: List[str],
+    descriptions: List[Optional[str]],
+    subscriber_counts: List[int],
+    query: str,
+    transcripts: Optional[List[Optional[str]]] = None,
+    transcript_lengths: Optional[List[int]] = None
+) -> Dict[str, Any]:
+    """
+    score_quality_heuristic for a whole candidate pool at once.
+    
+    Feature arrays are built column by column: each text column is
+    lowercased once and each term (query word, clickbait term, edu term)
+    is counted with one pass over the column. All scoring arithmetic then
+    runs as NumPy array operations in the same order as the scalar
+    function, so the rounded scores are identical. With transcript_lengths
+    instead of transcripts the edu-term bonus is unknown and treated as
+    absent. Returns score arrays (content_depth_score is NaN where the
+    scalar function returns None) plus the feature arrays used for flags.
+    """
+    np = load_numpy()
+    n = len(titles)
+    query_words = [w for w in query.lower().split() if len(w) > 2]
+    descriptions = [description or "" for description in descriptions]
+    
+    titles_lower = [title.lower() for title in titles]
+    title_matches = _count_terms(titles_lower, query_words)
+    desc_matches = _count_terms([description.lower() for description in descriptions], query_words)
+    desc_lengths = np.fromiter(map(len, descriptions), dtype=np.int64, count=n)
+    # Same text as the scalar function's keyword_matcher.scan_joined([title, description])
+    clickbait_counts = _count_terms(
+        [f"{title} {description}".lower() for title, description in zip(titles, descriptions)],
+        keyword_matcher.term_lists["clickbait"]
+    )
+    all_caps = np.fromiter((title.isupper() and len(title) > 10 for title in titles), dtype=bool, count=n)
+    
+    edu_counts = np.zeros(n, dtype=np.int64)
+    if transcripts is not None:
+        transcripts = [transcript or "" for transcript in transcripts]
+        t_lengths = np.fromiter(map(len, transcripts), dtype=np.int64, count=n)
+        long_enough = np.flatnonzero(t_lengths > 500)
+        edu_counts[long_enough] = _count_terms(
+            [transcripts[i].lower() for i in long_enough.tolist()],
+            keyword_matcher.term_lists["edu"]
+        )
+    elif transcript_lengths is not None:
+        t_lengths = np.fromiter((length or 0 for length in transcript_lengths), dtype=np.int64, count=n)
+    else:
+        t_lengths = np.zeros(n, dtype=np.int64)
+    
+    subs = np.asarray(subscriber_counts, dtype=np.int64)
+    zero = np.zeros(n)
+    
+    # Relevance
+    relevance = np.full(n, 0.5)
+    relevance = relevance + np.where(title_matches > 0, np.minimum(0.3, title_matches * 0.1), zero)
+    relevance = relevance + np.where(desc_matches > 0, np.minimum(0.2, desc_matches * 0.05), zero)
+    
+    # Quality
+    quality = np.full(n, 0.5)
+    quality = quality + np.where(subs > 1000, 0.1, zero)
+    quality = quality + np.where(desc_lengths > 200, 0.1, zero)
+    quality = quality - np.where(clickbait_counts > 0, np.minimum(0.2, clickbait_counts * 0.1), zero)
+    quality = quality - np.where(all_caps, 0.1, zero)
+    
+    # Content depth (only for transcripts over 500 chars)
+    has_depth = t_lengths > 500
+    depth = np.full(n, 0.5)
+    depth = depth + np.where(t_lengths > 2000, 0.2, zero)
+    depth = depth + np.where(t_lengths > 5000, 0.1, zero)
+    depth = depth + np.where(edu_counts >= 2, 0.2, zero)
+    
+    # Clamp scores
+    relevance = np.clip(relevance, 0, 1)
+    quality = np.clip(quality, 0, 1)
+    depth = np.clip(depth, 0, 1)
+    
+    combined = np.where(
+        has_depth,
+        relevance * 0.3 + quality * 0.3 + depth * 0.4,
+        relevance * 0.4 + quality * 0.4
+    )
+    
+    return {
+        "relevance_score": _round_array(relevance),
+        "quality_score": _round_array(quality),
+        "content_depth_score": np.where(has_depth, _round_array(depth), np.nan),
+        "combined_score": _round_array(combined),
+        "has_transcript": t_lengths > 0,
+        "features": {
+            "subscriber_count": subs,
+            "description_length": desc_lengths,
+            "clickbait_count": clickbait_counts,
+            "all_caps": all_caps,
+            "has_depth": has_depth,
+            "edu_count": edu_counts,
+        },
+    }
+
+def _bulk_flags(features: Dict[str, Any], i: int) -> List[str]:
+    """Same flags, in the same order, as score_quality_heuristic"""
+    flags = []
+    if features["subscriber_count"][i] > 1000:
+        flags.append("Established channel")
+    if features["description_length"][i] > 200:
+        flags.append("Detailed description")
+    if features["clickbait_count"][i] > 0:
+        flags.append(f"Potential clickbait ({int(features['clickbait_count'][i])} indicators)")
+    if features["all_caps"][i]:
+        flags.append("ALL CAPS title")
+    if features["has_depth"][i] and features["edu_count"][i] >= 2:
+        flags.append("Contains educational content")
+    return flags
+
+@router.post("/quality-score/bulk", response_model=BulkQualityResponse)
+async def score_quality_bulk_endpoint(request: BulkQualityRequest):
+    """
+    Heuristic pre-ranking of a large candidate pool; returns the top_k by combined score
+    """
+    n = len(request.video_ids)
+    columns = {
+        "titles": request.titles,
+        "descriptions": request.descriptions,
+        "subscriber_counts": request.subscriber_counts,
+        "transcripts": request.transcripts,
+        "transcript_lengths": request.transcript_lengths,
+    }
+    for name, column in columns.items():
+        if column is not None and len(column) != n:
+            raise HTTPException(
+                status_code=400,
+                detail=f"'{name}' has {len(column)} items, expected {n}"
+            )
+    if n > BULK_SCORE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many candidates ({n}, max {BULK_SCORE_MAX_ITEMS})"
+        )
+    
+    logger.info(f"Bulk heuristic scoring for {n} videos")
+    
+    descriptions = request.descriptions or [""] * n
+    subscriber_counts = request.subscriber_counts or [0] * n
+    if request.subscriber_counts is not None:
+        # No channel names in a bulk pool: subscriber counts only
+        await record_topic_videos(
+            request.query,
+            [(video_id, None, subs, None) for video_id, subs in zip(request.video_ids, subscriber_counts)]
+        )
+    
+    np = load_numpy()
+    if np is None:
+        # NumPy not installed: same results, one scalar call per video
+        scored = [
+            score_quality_heuristic(
+                title=request.titles[i],
+                description=descriptions[i],
+                transcript=request.transcripts[i] if request.transcripts else None,
+                channel="",
+                subs=subscriber_counts[i],
+                query=request.query
+            )
+            for i in range(n)
+        ]
+        order = sorted(range(n), key=lambda i: -scored[i]["combined_score"])[:request.top_k]
+        results = [
+            QualityScoreResponse(success=True, video_id=request.video_ids[i], **scored[i])
+            for i in order
+        ]
+        return BulkQualityResponse(success=True, total=n, results=results)
+    
+    arrays = await asyncio.to_thread(
+        score_quality_bulk,
+        request.titles,
+        descriptions,
+        subscriber_counts,
+        request.query,
+        request.transcripts,
+        request.transcript_lengths
+    )
+    
+    # Stable sort, so ties keep request order
+    order = np.argsort(-arrays["combined_score"], kind="stable")[:request.top_k]
+    results = []
+    for i in order.tolist():
+        depth = arrays["content_depth_score"][i]
+        results.append(QualityScoreResponse(
+            success=True,
+            video_id=request.video_ids[i],
+            relevance_score=arrays["relevance_score"][i],
+            quality_score=arrays["quality_score"][i],
+            content_depth_score=None if np.isnan(depth) else depth,
+            combined_score=arrays["combined_score"][i],
+            method="heuristic-transcript" if arrays["has_transcript"][i] else "heuristic",
+            reason="Heuristic analysis based on title, description, and transcript patterns",
+            flags=_bulk_flags(arrays["features"], i)
+        ))
+    
+    return BulkQualityResponse(success=True, total=n, results=results)
+
 # ============================================
 # GREENWASHING DETECTION
 # ============================================
@@ -573,6 +1739,37 @@ EVIDENCE_SIGNALS = [
     'measured', 'verified', 'third-party audit', 'methodology'
 ]
 
+# Every heuristic term list, compiled once and shared by all heuristic paths
+keyword_matcher = KeywordMatcher({
+    "sustainability": SUSTAINABILITY_KEYWORDS,
+    "greenwash": GREENWASH_SIGNALS,
+    "evidence": EVIDENCE_SIGNALS,
+    "clickbait": CLICKBAIT_PATTERNS,
+    "edu": EDU_TERMS,
+})
+
+# Transcript excerpts for the AI prompts: the windows densest in terms each
+# prompt cares about, from anywhere in the video, within a token budget
+quality_excerpts = ExcerptBuilder(
+    "quality",
+    keywords=EDU_TERMS + EVIDENCE_SIGNALS,
+    token_budget=QUALITY_TRANSCRIPT_TOKEN_BUDGET,
+    head_chars=8000
+)
+greenwashing_excerpts = ExcerptBuilder(
+    "greenwashing",
+    keywords=SUSTAINABILITY_KEYWORDS + GREENWASH_SIGNALS + EVIDENCE_SIGNALS,
+    token_budget=GREENWASHING_TRANSCRIPT_TOKEN_BUDGET,
+    head_chars=6000
+)
+fused_excerpts = ExcerptBuilder(
+    "fused",
+    keywords=EDU_TERMS + SUSTAINABILITY_KEYWORDS + GREENWASH_SIGNALS + EVIDENCE_SIGNALS,
+    token_budget=QUALITY_TRANSCRIPT_TOKEN_BUDGET,
+    head_chars=8000
+)
+
+@stage_latency.timed("heuristic_greenwashing")
 def detect_greenwashing_heuristic(
     title: str,
     description: str,
@@ -581,14 +1778,14 @@ def detect_greenwashing_heuristic(
 ) -> Dict[str, Any]:
     """Heuristic-based greenwashing detection"""
     
-    full_text = f"{title} {description or ''} {transcript or ''}".lower()
+    scan = keyword_matcher.scan_joined([title, description or "", transcript or ""])
     
     flags = []
     risk_score = 0
     
     # Count signals
-    vague_count = sum(1 for s in GREENWASH_SIGNALS if s in full_text)
-    evidence_count = sum(1 for s in EVIDENCE_SIGNALS if s in full_text)
+    vague_count = scan.count("greenwash")
+    evidence_count = scan.count("evidence")
     
     # Vague terms without evidence
     if vague_count > 0 and evidence_count == 0:
@@ -621,8 +1818,7 @@ def detect_greenwashing_heuristic(
         risk_score -= 15
     
     # Missing metrics
-    has_numbers = any(c.isdigit() for c in full_text)
-    if vague_count > 0 and not has_numbers:
+    if vague_count > 0 and not scan.has_digits:
         risk_score += 15
         flags.append({
             "type": "warning",
@@ -646,6 +1842,18 @@ def detect_greenwashing_heuristic(
         "method": "heuristic"
     }
 
+def normalize_greenwashing_result(result: Dict[str, Any], method: str) -> Dict[str, Any]:
+    """Turn the model's greenwashing JSON into GreenwashingResponse fields"""
+    transparency = result.get("transparency_score", 50)
+    risk_level = "low" if transparency >= 70 else "medium" if transparency >= 40 else "high"
+    
+    return {
+        "transparency_score": transparency,
+        "risk_level": risk_level,
+        "flags": result.get("flags", []),
+        "method": method
+    }
+
 async def detect_greenwashing_ai(
     title: str,
     description: str,
@@ -659,8 +1867,8 @@ async def detect_greenwashing_ai(
     try:
         transcript_section = ""
         if transcript:
-            truncated = transcript[:6000]
-            transcript_section = f"TRANSCRIPT EXCERPT:\n{truncated}\n"
+            excerpt = greenwashing_excerpts.build(transcript, boundaries=segment_boundaries(transcript))
+            transcript_section = f"TRANSCRIPT EXCERPT:\n{excerpt}\n"
         
         prompt = GREENWASHING_PROMPT.format(
             title=title,
@@ -668,35 +1876,45 @@ async def detect_greenwashing_ai(
             transcript_section=transcript_section
         )
         
-        response_text = await call_deepseek_api(prompt, max_tokens=500, temperature=0.2)
-        
-        if not response_text:
-            return None
-        
-        response_text = response_text.strip()
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-        response_text = response_text.strip()
-        
-        result = json.loads(response_text)
-        
-        transparency = result.get("transparency_score", 50)
-        risk_level = "low" if transparency >= 70 else "medium" if transparency >= 40 else "high"
+        cache_key = llm_cache_key(GREENWASHING_PROMPT, prompt, max_tokens=500, temperature=0.2)
+        cached = await llm_result_caches["greenwashing"].aget(cache_key)
+        if cached is not None:
+            return cached
         
-        return {
-            "transparency_score": transparency,
-            "risk_level": risk_level,
-            "flags": result.get("flags", []),
-            "method": "deepseek"
-        }
+        async with fill_lease(llm_result_caches["greenwashing"], cache_key) as cached:
+            # Another worker filled it while we waited
+            if cached is not None:
+                return cached
+            
+            response_text = await call_deepseek_api(prompt, max_tokens=500, temperature=0.2)
+            
+            if not response_text:
+                return None
+            
+            result = parse_llm_json(response_text)
+            detected = normalize_greenwashing_result(result, method="deepseek")
+            await llm_result_caches["greenwashing"].aset(cache_key, detected)
+            return detected
         
     except Exception as e:
         logger.error(f"DeepSeek greenwashing detection failed: {str(e)}")
         return None
 
-@app.post("/greenwashing", response_model=GreenwashingResponse)
+def is_sustainability_content(title: str, description: Optional[str]) -> bool:
+    """Greenwashing analysis only applies to sustainability-related videos"""
+    return keyword_matcher.scan_joined([title, description or ""]).any("sustainability")
+
+def greenwashing_skip_response(video_id: str) -> GreenwashingResponse:
+    return GreenwashingResponse(
+        success=True,
+        video_id=video_id,
+        transparency_score=100,
+        risk_level="low",
+        flags=[{"type": "info", "text": "Not sustainability-related content"}],
+        method="skip"
+    )
+
+@router.post("/greenwashing", response_model=GreenwashingResponse)
 async def detect_greenwashing(request: GreenwashingRequest):
     """
     Detect greenwashing in sustainability content (KPMG challenge)
@@ -704,18 +1922,9 @@ async def detect_greenwashing(request: GreenwashingRequest):
     logger.info(f"Analyzing greenwashing for video: {request.video_id}")
     
     # Check if content is sustainability-related
-    full_text = f"{request.title} {request.description or ''}".lower()
-    is_sustainability = any(kw in full_text for kw in SUSTAINABILITY_KEYWORDS)
-    
-    if not is_sustainability:
-        return GreenwashingResponse(
-            success=True,
-            video_id=request.video_id,
-            transparency_score=100,
-            risk_level="low",
-            flags=[{"type": "info", "text": "Not sustainability-related content"}],
-            method="skip"
-        )
+    if not is_sustainability_content(request.title, request.description):
+        record_analysis_result("greenwashing", "skip")
+        return greenwashing_skip_response(request.video_id)
     
     # Try DeepSeek first
     ai_result = await detect_greenwashing_ai(
@@ -725,6 +1934,7 @@ async def detect_greenwashing(request: GreenwashingRequest):
     )
     
     if ai_result:
+        record_analysis_result("greenwashing", ai_result["method"])
         return GreenwashingResponse(
             success=True,
             video_id=request.video_id,
@@ -738,6 +1948,7 @@ async def detect_greenwashing(request: GreenwashingRequest):
         transcript=request.transcript,
         subs=request.channel_subscriber_count
     )
+    record_analysis_result("greenwashing", heuristic_result["method"])
     
     return GreenwashingResponse(
         success=True,
@@ -749,16 +1960,44 @@ async def detect_greenwashing(request: GreenwashingRequest):
 # BIAS RECEIPT GENERATION
 # ============================================
 
-@app.post("/bias-receipt", response_model=BiasReceiptResponse)
+@router.post("/bias-receipt", response_model=BiasReceiptResponse)
 async def generate_bias_receipt(request: BiasReceiptRequest):
     """
     Generate explainability receipt for why a video was surfaced
     """
     logger.info(f"Generating bias receipt for video: {request.video_id}")
-    
+    topic = None
+    if request.avg_subs_in_topic is None or request.topic_concentration is None:
+        topic = await topic_snapshot(request.query)
+    receipt = build_bias_receipt(request, topic)
+    # After the receipt, so a video isn't compared against itself
+    await record_topic_videos(
+        request.query,
+        [(request.video_id, request.channel_title, request.subscriber_count, request.views_per_day)]
+    )
+    return receipt
+
+# Used when the request leaves them out and the topic index has too little data
+DEFAULT_AVG_SUBS_IN_TOPIC = 100000
+DEFAULT_TOPIC_CONCENTRATION = 50
+
+def build_bias_receipt(request: BiasReceiptRequest, topic: Optional[TopicSnapshot] = None) -> BiasReceiptResponse:
+    """
+    The receipt rules, shared by the single and batch endpoints. `topic`
+    (see topic_snapshot) fills in whichever topic figures the request leaves out.
+    """
     why_not_shown = []
     why_surfaced = []
     
+    avg_subs_in_topic = request.avg_subs_in_topic
+    if avg_subs_in_topic is None:
+        avg_subs_in_topic = round(topic.mean_subscribers) if topic else DEFAULT_AVG_SUBS_IN_TOPIC
+    topic_concentration = request.topic_concentration
+    if topic_concentration is None:
+        # No share without any channel names in the topic
+        known = topic.top10_share if topic else None
+        topic_concentration = round(known) if known is not None else DEFAULT_TOPIC_CONCENTRATION
+    
     # Why not shown (barriers to visibility)
     if request.subscriber_count < 10000:
         why_not_shown.append("Channel has under 10K subscribers, limiting algorithmic reach")
@@ -767,8 +2006,8 @@ async def generate_bias_receipt(request: BiasReceiptRequest):
     elif request.subscriber_count < 100000:
         why_not_shown.append("Mid-sized channel may receive less algorithmic priority")
     
-    if request.topic_concentration > 70:
-        why_not_shown.append(f"Topic is {request.topic_concentration}% dominated by top 10 channels")
+    if topic_concentration > 70:
+        why_not_shown.append(f"Topic is {topic_concentration}% dominated by top 10 channels")
     
     if request.views_per_day < 100 and request.subscriber_count > 1000:
         why_not_shown.append("Lower view velocity may reduce recommendation frequency")
@@ -780,7 +2019,7 @@ async def generate_bias_receipt(request: BiasReceiptRequest):
     if request.engagement_ratio > 0.05:
         why_surfaced.append(f"High engagement ratio ({request.engagement_ratio:.1%}) indicates quality content")
     
-    if request.subscriber_count < request.avg_subs_in_topic * 0.5:
+    if request.subscriber_count < avg_subs_in_topic * 0.5:
         why_surfaced.append("Smaller than average for this topic - surfaced to balance representation")
     
     why_surfaced.append("Content matches search topic and passed quality filters")
@@ -801,6 +2040,267 @@ async def generate_bias_receipt(request: BiasReceiptRequest):
         method="heuristic"  # Could add DeepSeek enhancement here
     )
 
+class BiasReceiptCandidate(BaseModel):
+    video_id: str
+    channel_id: str = ""  # groups videos by channel; channel_title is used if empty, and
+                          # videos with neither are left out of the top-10 share
+    channel_title: str = ""
+    subscriber_count: int = 0
+    views_per_day: float = 0
+    engagement_ratio: float = 0
+    video_title: str = ""
+
+class BatchBiasReceiptRequest(BaseModel):
+    """The full candidate set for one query"""
+    query: str = ""
+    candidates: List[BiasReceiptCandidate]
+
+class TopicStats(BaseModel):
+    videos: int
+    channels: int  # distinct known channels
+    mean_subscribers: float    # per video, as the topic index reports it
+    median_subscribers: float
+    # % of the views/day held by the 10 most-viewed channels, among videos
+    # with a known channel (None if there are none), as in the topic index
+    top10_share: Optional[float]
+
+class BatchBiasReceiptResponse(BaseModel):
+    success: bool
+    topic_stats: TopicStats
+    receipts: List[BiasReceiptResponse] = []
+    error: Optional[str] = None
+
+def topic_statistics(
+    channel_keys: List[Optional[str]],
+    subscriber_counts: List[int],
+    views_per_day: List[float]
+) -> TopicStats:
+    """
+    Topic-level statistics of a candidate set, defined as the topic index defines them.
+    
+    Subscriber mean and median are per video. The top-10 share only covers
+    videos with a known channel (key not None): each channel is credited
+    with the views/day of all its videos, or with its video count if none
+    of them report views.
+    """
+    n = len(subscriber_counts)
+    if n == 0:
+        return TopicStats(videos=0, channels=0, mean_subscribers=0, median_subscribers=0, top10_share=None)
+    
+    np = load_numpy()
+    if np is None:
+        channel_views: Dict[str, float] = {}
+        channel_videos: Dict[str, int] = {}
+        for key, views in zip(channel_keys, views_per_day):
+            if key is not None:
+                channel_views[key] = channel_views.get(key, 0.0) + views
+                channel_videos[key] = channel_videos.get(key, 0) + 1
+        share = None
+        if channel_videos:
+            weights = channel_views if sum(channel_views.values()) > 0 else channel_videos
+            top10 = sum(sorted(weights.values(), reverse=True)[:10])
+            share = round(top10 / sum(weights.values()) * 100, 1)
+        return TopicStats(
+            videos=n,
+            channels=len(channel_videos),
+            mean_subscribers=round(statistics.fmean(subscriber_counts), 1),
+            median_subscribers=round(statistics.median(subscriber_counts), 1),
+            top10_share=share
+        )
+    
+    subs = np.asarray(subscriber_counts, dtype=np.int64)
+    known = np.fromiter((key is not None for key in channel_keys), dtype=bool, count=n)
+    channels = 0
+    share = None
+    if known.any():
+        keys = np.asarray(channel_keys, dtype=object)[known]
+        _, channel_of = np.unique(keys, return_inverse=True)
+        channels = int(channel_of.max()) + 1
+        weights = np.bincount(channel_of, weights=np.asarray(views_per_day, dtype=float)[known], minlength=channels)
+        if weights.sum() <= 0:
+            weights = np.bincount(channel_of, minlength=channels).astype(float)
+        top10 = np.sort(weights)[::-1][:10].sum()
+        share = round(float(top10 / weights.sum() * 100), 1)
+    return TopicStats(
+        videos=n,
+        channels=channels,
+        mean_subscribers=round(float(subs.mean()), 1),
+        median_subscribers=round(float(np.median(subs)), 1),
+        top10_share=share
+    )
+
+@router.post("/bias-receipt/batch", response_model=BatchBiasReceiptResponse)
+async def generate_bias_receipts_batch(request: BatchBiasReceiptRequest):
+    """
+    Receipts for a whole candidate set in one request.
+    
+    avg_subs_in_topic and topic_concentration are computed from the set
+    itself instead of being supplied by the client.
+    """
+    candidates = request.candidates
+    if len(candidates) > BIAS_RECEIPT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many candidates ({len(candidates)}, max {BIAS_RECEIPT_BATCH_MAX_ITEMS})"
+        )
+    
+    logger.info(f"Generating {len(candidates)} bias receipts for query: {request.query!r}")
+    
+    channel_keys = [c.channel_id or c.channel_title or None for c in candidates]
+    stats = topic_statistics(
+        channel_keys,
+        [c.subscriber_count for c in candidates],
+        [c.views_per_day for c in candidates]
+    )
+    avg_subs_in_topic = round(stats.mean_subscribers)
+    topic_concentration = round(stats.top10_share) if stats.top10_share is not None else DEFAULT_TOPIC_CONCENTRATION
+    
+    receipts = [
+        build_bias_receipt(BiasReceiptRequest(
+            video_id=c.video_id,
+            subscriber_count=c.subscriber_count,
+            views_per_day=c.views_per_day,
+            engagement_ratio=c.engagement_ratio,
+            avg_subs_in_topic=avg_subs_in_topic,
+            topic_concentration=topic_concentration,
+            video_title=c.video_title,
+            channel_title=c.channel_title
+        ))
+        for c in candidates
+    ]
+    await record_topic_videos(
+        request.query,
+        [(c.video_id, key, c.subscriber_count, c.views_per_day) for c, key in zip(candidates, channel_keys)]
+    )
+    return BatchBiasReceiptResponse(success=True, topic_stats=stats, receipts=receipts)
+
+# ============================================
+# FUSED QUALITY + GREENWASHING PROMPT
+# ============================================
+
+FUSED_ANALYSIS_PROMPT = """You are a video quality analyst and sustainability expert detecting greenwashing.
+
+VIDEO INFO:
+Title: {title}
+Channel: {channel}
+Subscribers: {subs}
+Search Query/Topic: {query}
+Description: {description}
+
+{transcript_section}
+
+Return JSON with exactly these two objects:
+{{
+  "quality": {{
+    "relevance_score": <0-100 how relevant to the search query>,
+    "quality_score": <0-100 based on production quality, depth, expertise>,
+    "content_depth_score": <0-100 based on transcript analysis, null if no transcript>,
+    "reason": "<brief explanation>",
+    "flags": ["<list of quality indicators or concerns>"]
+  }},
+  "greenwashing": {{
+    "transparency_score": <0-100, higher = more transparent>,
+    "flags": [
+      {{"type": "positive|warning|risk", "text": "description", "evidence": "quote if any"}}
+    ]
+  }}
+}}
+
+For quality consider:
+- Relevance: Does it actually address the topic?
+- Quality: Is it well-produced? Expert perspective?
+- Depth: Does it provide real value, not just clickbait?
+- Red flags: Clickbait, misleading title, low effort content
+
+For greenwashing look for:
+- Vague terms: "eco-friendly", "green", "natural" without specifics
+- Missing evidence for claims
+- Hidden trade-offs
+- Corporate marketing without substance
+- False impressions or certifications
+
+Respond with ONLY valid JSON."""
+
+async def analyze_fused_ai(
+    title: str,
+    description: str,
+    transcript: Optional[str],
+    channel: str,
+    subs: int,
+    query: str
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    One DeepSeek call returning both quality and greenwashing results.
+    
+    The transcript excerpt is sent once instead of twice. Returns None if
+    the output is missing fields or fails response-model validation, so the
+    caller can fall back to the separate prompts.
+    """
+    
+    if not AI_AVAILABLE:
+        return None
+    
+    try:
+        transcript_section = ""
+        if transcript:
+            excerpt = fused_excerpts.build(
+                transcript,
+                extra_keywords=(query or "").split(),
+                boundaries=segment_boundaries(transcript)
+            )
+            transcript_section = f"TRANSCRIPT EXCERPT:\n{excerpt}\n"
+        
+        prompt = FUSED_ANALYSIS_PROMPT.format(
+            title=title,
+            channel=channel,
+            subs=subs,
+            query=query,
+            description=description or "No description",
+            transcript_section=transcript_section
+        )
+        
+        cache_key = llm_cache_key(FUSED_ANALYSIS_PROMPT, prompt, max_tokens=800, temperature=0.2)
+        cached = await llm_result_caches["fused"].aget(cache_key)
+        if cached is not None:
+            return cached["quality"], cached["greenwashing"]
+        
+        async with fill_lease(llm_result_caches["fused"], cache_key) as cached:
+            # Another worker filled it while we waited
+            if cached is not None:
+                return cached["quality"], cached["greenwashing"]
+            
+            response_text = await call_deepseek_api(prompt, max_tokens=800, temperature=0.2)
+            
+            if not response_text:
+                return None
+            
+            result = parse_llm_json(response_text)
+            quality_raw = result.get("quality")
+            greenwashing_raw = result.get("greenwashing")
+            if not isinstance(quality_raw, dict) or not isinstance(greenwashing_raw, dict):
+                raise ValueError("Missing 'quality' or 'greenwashing' object")
+            for field in ("relevance_score", "quality_score"):
+                if field not in quality_raw:
+                    raise ValueError(f"Missing quality.{field}")
+            if "transparency_score" not in greenwashing_raw:
+                raise ValueError("Missing greenwashing.transparency_score")
+            
+            quality = normalize_quality_result(
+                quality_raw, method="deepseek-fused-transcript" if transcript else "deepseek-fused"
+            )
+            greenwashing = normalize_greenwashing_result(greenwashing_raw, method="deepseek-fused")
+            
+            # Validate against the response models before trusting the output
+            QualityScoreResponse(success=True, video_id="", **quality)
+            GreenwashingResponse(success=True, video_id="", **greenwashing)
+            
+            await llm_result_caches["fused"].aset(cache_key, {"quality": quality, "greenwashing": greenwashing})
+            return quality, greenwashing
+        
+    except Exception as e:
+        logger.warning(f"DeepSeek fused analysis unusable, falling back: {str(e)}")
+        return None
+
 # ============================================
 # COMBINED ANALYSIS ENDPOINT
 # ============================================
@@ -813,66 +2313,498 @@ class FullAnalysisRequest(BaseModel):
     subscriber_count: Optional[int] = 0
     query: Optional[str] = ""
     fetch_transcript: bool = True
+    include_transcript: bool = False  # full text in the response, not just a summary
 
 class FullAnalysisResponse(BaseModel):
     success: bool
     video_id: str
-    transcript: Optional[TranscriptResponse] = None
+    transcript: Optional[Union[TranscriptResponse, TranscriptSummary]] = None
     quality: Optional[QualityScoreResponse] = None
     greenwashing: Optional[GreenwashingResponse] = None
+    timings_ms: Optional[Dict[str, float]] = None  # per-stage wall time
     error: Optional[str] = None
 
-@app.post("/analyze", response_model=FullAnalysisResponse)
+def summarize_transcript(
+    transcript: TranscriptResponse, languages: List[str] = DEFAULT_TRANSCRIPT_LANGUAGES
+) -> TranscriptSummary:
+    """
+    Metadata of a transcript fetched for `languages`. Its URL asks for the
+    same languages, so following it hits the cache entry the fetch left
+    rather than resolving (and possibly re-listing) the video's tracks again.
+    """
+    return TranscriptSummary(
+        success=transcript.success,
+        video_id=transcript.video_id,
+        language=transcript.language,
+        duration_seconds=transcript.duration_seconds,
+        chars=len(transcript.transcript) if transcript.transcript is not None else None,
+        url=f"/transcript/{transcript.video_id}?languages={','.join(languages)}" if transcript.success else None,
+        error=transcript.error
+    )
+
+def transcript_for_response(
+    transcript: Optional[TranscriptResponse], include_text: bool
+) -> Optional[Union[TranscriptResponse, TranscriptSummary]]:
+    """The transcript as /analyze returns it: a summary unless the text was asked for"""
+    if transcript is None or include_text:
+        return transcript
+    return summarize_transcript(transcript)
+
+# A stage is (names of stages it depends on, async fn taking their results)
+Stage = Tuple[List[str], Callable[[Dict[str, Any]], Awaitable[Any]]]
+
+async def run_stage_graph(stages: Dict[str, Stage]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run stages as soon as their dependencies finish, independent ones concurrently.
+    
+    Stages must be listed in dependency order. Timings cover each stage's
+    own work, not the time spent waiting on its dependencies.
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+    timings: Dict[str, float] = {}
+    
+    async def run(name: str) -> Any:
+        deps, fn = stages[name]
+        dep_results = {dep: await tasks[dep] for dep in deps}
+        started = time.perf_counter()
+        result = await fn(dep_results)
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+    
+    for name in stages:
+        tasks[name] = asyncio.create_task(run(name))
+    try:
+        results = await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    return dict(zip(stages, results)), timings
+
+analysis_flight = SingleFlight("analyze")
+
+@router.post("/analyze", response_model=FullAnalysisResponse)
 async def full_analysis(request: FullAnalysisRequest):
     """
     Combined endpoint: fetch transcript + quality score + greenwashing detection
     
     This is the main endpoint for the Chrome extension to call.
+    Quality scoring and greenwashing detection both only need the
+    transcript, so they run concurrently once it arrives; non-sustainability
+    videos skip greenwashing without waiting for the transcript at all.
     """
+    # Identical requests (same video, title, query, ...) in flight together
+    # share one pipeline run. Only within a priority class: an interactive
+    # request must not wait on a run scheduled at batch/prefetch priority
+    key = f"{current_priority.get()}:{request.model_dump_json()}"
+    return await analysis_flight.do(key, lambda: _run_full_analysis(request))
+
+async def _run_full_analysis(request: FullAnalysisRequest) -> FullAnalysisResponse:
     logger.info(f"Full analysis for video: {request.video_id}")
+    started = time.perf_counter()
+    await record_topic_videos(request.query, [(request.video_id, request.channel_title, request.subscriber_count, None)])
+    
+    is_sustainability = is_sustainability_content(request.title, request.description)
+    
+    async def transcript_stage(deps: Dict[str, Any]) -> Optional[TranscriptResponse]:
+        if not request.fetch_transcript:
+            return None
+        return await get_transcript(TranscriptRequest(video_id=request.video_id))
+    
+    def transcript_text(deps: Dict[str, Any]) -> Optional[str]:
+        transcript_response = deps.get("transcript")
+        if transcript_response is not None and transcript_response.success:
+            return transcript_response.transcript
+        return None
+    
+    async def fused_stage(deps: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        return await analyze_fused_ai(
+            title=request.title,
+            description=request.description,
+            transcript=transcript_text(deps),
+            channel=request.channel_title,
+            subs=request.subscriber_count,
+            query=request.query
+        )
+    
+    async def quality_stage(deps: Dict[str, Any]) -> QualityScoreResponse:
+        if deps.get("fused"):
+            record_analysis_result("quality", deps["fused"][0]["method"])
+            return QualityScoreResponse(success=True, video_id=request.video_id, **deps["fused"][0])
+        return await score_video_quality(
+            QualityScoreRequest(
+                video_id=request.video_id,
+                title=request.title,
+                description=request.description,
+                transcript=transcript_text(deps),
+                channel_title=request.channel_title,
+                subscriber_count=request.subscriber_count,
+                query=request.query
+            )
+        )
+    
+    async def greenwashing_stage(deps: Dict[str, Any]) -> GreenwashingResponse:
+        if deps.get("fused"):
+            record_analysis_result("greenwashing", deps["fused"][1]["method"])
+            return GreenwashingResponse(success=True, video_id=request.video_id, **deps["fused"][1])
+        return await detect_greenwashing(
+            GreenwashingRequest(
+                video_id=request.video_id,
+                title=request.title,
+                description=request.description,
+                transcript=transcript_text(deps),
+                channel_subscriber_count=request.subscriber_count
+            )
+        )
+    
+    async def greenwashing_skip_stage(deps: Dict[str, Any]) -> GreenwashingResponse:
+        return greenwashing_skip_response(request.video_id)
     
-    transcript_text = None
-    transcript_response = None
+    # Fused mode only pays off when both prompts would run; if the fused
+    # output is unusable the stages below fall back to the separate prompts
+    use_fused = FUSED_ANALYSIS and AI_AVAILABLE and is_sustainability
+    analysis_deps = ["transcript", "fused"] if use_fused else ["transcript"]
     
-    # Step 1: Fetch transcript
+    stages: Dict[str, Stage] = {"transcript": ([], transcript_stage)}
+    if use_fused:
+        stages["fused"] = (["transcript"], fused_stage)
+    stages["quality"] = (analysis_deps, quality_stage)
+    stages["greenwashing"] = (
+        (analysis_deps, greenwashing_stage) if is_sustainability
+        else ([], greenwashing_skip_stage)
+    )
+    results, timings = await run_stage_graph(stages)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    
+    return FullAnalysisResponse(
+        success=True,
+        video_id=request.video_id,
+        transcript=transcript_for_response(results["transcript"], request.include_transcript),
+        quality=results["quality"],
+        greenwashing=results["greenwashing"],
+        timings_ms=timings
+    )
+
+# ============================================
+# BATCH ANALYSIS ENDPOINT
+# ============================================
+
+class BatchAnalysisRequest(BaseModel):
+    items: List[FullAnalysisRequest]
+
+# Shared by all batch requests on this worker, so concurrent pages
+# can't multiply the fan-out
+_batch_semaphore: Optional[asyncio.Semaphore] = None
+
+def _get_batch_semaphore() -> asyncio.Semaphore:
+    global _batch_semaphore
+    if _batch_semaphore is None:
+        _batch_semaphore = asyncio.Semaphore(ANALYZE_BATCH_CONCURRENCY)
+    return _batch_semaphore
+
+async def _analyze_one(item: FullAnalysisRequest) -> FullAnalysisResponse:
+    """Run full_analysis under the batch semaphore, turning errors into a result"""
+    # Page-wide batches yield DeepSeek capacity to interactive requests
+    current_priority.set("batch")
+    async with _get_batch_semaphore():
+        try:
+            return await full_analysis(item)
+        except Exception as e:
+            logger.error(f"Batch analysis failed for {item.video_id}: {str(e)}")
+            return FullAnalysisResponse(
+                success=False,
+                video_id=item.video_id,
+                error=str(e)
+            )
+
+@router.post("/analyze/batch")
+async def full_analysis_batch(request: BatchAnalysisRequest):
+    """
+    Analyze a whole results page at once.
+    
+    Items run concurrently (bounded by ANALYZE_BATCH_CONCURRENCY) and each
+    FullAnalysisResponse is streamed back as one line of NDJSON as soon as
+    it finishes, so results arrive in completion order, not request order.
+    """
+    if len(request.items) > ANALYZE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large ({len(request.items)} items, max {ANALYZE_BATCH_MAX_ITEMS})"
+        )
+    
+    logger.info(f"Batch analysis for {len(request.items)} videos")
+    
+    async def stream_results():
+        tasks = [asyncio.create_task(_analyze_one(item)) for item in request.items]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                yield result.model_dump_json() + "\n"
+        finally:
+            # Client went away: don't keep working on its behalf
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+# ============================================
+# PRECOMPUTE (CACHE WARMING)
+# ============================================
+
+class PrecomputeRequest(BaseModel):
+    items: List[FullAnalysisRequest]
+
+async def _analysis_is_warm(request: FullAnalysisRequest, result: FullAnalysisResponse) -> bool:
+    """
+    Whether a later /analyze of the same request will be served from cache.
+    
+    Transient transcript errors aren't cached, and heuristic results while
+    DeepSeek is configured mean the AI call failed - both are worth a retry.
+    """
     if request.fetch_transcript:
-        transcript_response = await get_transcript(
-            TranscriptRequest(video_id=request.video_id)
+        languages = DEFAULT_TRANSCRIPT_LANGUAGES
+        if not await transcript_cache.acontains(transcript_cache_key(request.video_id, languages)):
+            return False
+    if AI_AVAILABLE:
+        methods = [result.quality.method if result.quality else None]
+        if result.greenwashing is not None and result.greenwashing.method != "skip":
+            methods.append(result.greenwashing.method)
+        if any(method is None or method.startswith("heuristic") for method in methods):
+            return False
+    return True
+
+async def _warm_analysis(request: FullAnalysisRequest) -> bool:
+    # Warming only uses DeepSeek capacity nobody interactive is waiting for
+    current_priority.set("prefetch")
+    result = await full_analysis(request)
+    return await _analysis_is_warm(request, result)
+
+precompute_queue = BackgroundQueue(
+    "precompute",
+    handler=_warm_analysis,
+    workers=PRECOMPUTE_WORKERS,
+    max_queued=PRECOMPUTE_MAX_QUEUED,
+    max_attempts=PRECOMPUTE_MAX_ATTEMPTS,
+    retry_base_seconds=PRECOMPUTE_RETRY_BASE_SECONDS,
+)
+
+@router.post("/precompute")
+async def precompute_analyses(request: PrecomputeRequest):
+    """
+    Queue videos (e.g. trending, or the next results page) for background analysis.
+    
+    Runs the same pipeline as /analyze, filling the transcript and DeepSeek
+    result caches, so that the user's /analyze for the same video is a
+    cache read. Returns immediately.
+    """
+    outcomes = {"queued": 0, "duplicate": 0, "rejected": 0}
+    for item in request.items:
+        outcomes[precompute_queue.submit(item.model_dump_json(), item)] += 1
+    return {**outcomes, "queue": precompute_queue.stats()}
+
+@router.get("/precompute/stats")
+async def precompute_stats():
+    return precompute_queue.stats()
+
+# ============================================
+# STREAMING (SERVER-SENT EVENTS)
+# ============================================
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"  # don't let a reverse proxy buffer the events
+}
+
+def _quality_request_heuristic(request: QualityScoreRequest, topic: Optional[TopicSnapshot]) -> QualityScoreResponse:
+    return QualityScoreResponse(
+        success=True,
+        video_id=request.video_id,
+        **score_quality_heuristic(
+            title=request.title,
+            description=request.description,
+            transcript=request.transcript,
+            channel=request.channel_title,
+            subs=request.subscriber_count,
+            query=request.query,
+            topic=topic
         )
-        if transcript_response.success:
-            transcript_text = transcript_response.transcript
+    )
+
+@router.post("/quality-score/stream")
+async def score_video_quality_stream(request: QualityScoreRequest):
+    """
+    /quality-score as server-sent events.
     
-    # Step 2: Quality scoring
-    quality_response = await score_video_quality(
-        QualityScoreRequest(
-            video_id=request.video_id,
+    A `quality` event with the heuristic score is sent immediately, then a
+    second `quality` event with the DeepSeek score if one arrives, then
+    `done`. Clients keep the latest event of each type.
+    """
+    await record_topic_videos(request.query, [(request.video_id, request.channel_title, request.subscriber_count, None)])
+    topic = await topic_snapshot(request.query)
+    
+    async def events():
+        yield sse_event("quality", _quality_request_heuristic(request, topic))
+        
+        ai_result = await score_quality_ai(
             title=request.title,
             description=request.description,
-            transcript=transcript_text,
-            channel_title=request.channel_title,
-            subscriber_count=request.subscriber_count,
+            transcript=request.transcript,
+            channel=request.channel_title,
+            subs=request.subscriber_count,
             query=request.query
         )
-    )
+        if ai_result:
+            yield sse_event("quality", QualityScoreResponse(
+                success=True,
+                video_id=request.video_id,
+                **ai_result
+            ))
+        yield sse_event("done", {"video_id": request.video_id})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.post("/analyze/stream")
+async def full_analysis_stream(request: FullAnalysisRequest):
+    """
+    /analyze as server-sent events, for clients with a short timeout.
+    
+    Heuristic `quality` and `greenwashing` events (title and description
+    only) are sent before any I/O, then `transcript` once it is fetched,
+    then refined `quality` / `greenwashing` events as each finishes, and
+    finally `done` with per-stage timings. Clients keep the latest event
+    of each type; anything received before a timeout is still usable.
+    """
+    logger.info(f"Streaming analysis for video: {request.video_id}")
+    await record_topic_videos(request.query, [(request.video_id, request.channel_title, request.subscriber_count, None)])
+    topic = await topic_snapshot(request.query)
     
-    # Step 3: Greenwashing detection
-    greenwashing_response = await detect_greenwashing(
-        GreenwashingRequest(
+    is_sustainability = is_sustainability_content(request.title, request.description)
+    
+    async def events():
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        
+        def mark(name: str, since: float) -> float:
+            now = time.perf_counter()
+            timings[name] = round((now - since) * 1000, 1)
+            return now
+        
+        base_quality = QualityScoreRequest(
             video_id=request.video_id,
             title=request.title,
             description=request.description,
-            transcript=transcript_text,
-            channel_subscriber_count=request.subscriber_count
+            channel_title=request.channel_title,
+            subscriber_count=request.subscriber_count,
+            query=request.query
         )
+        yield sse_event("quality", _quality_request_heuristic(base_quality, topic))
+        if is_sustainability:
+            yield sse_event("greenwashing", GreenwashingResponse(
+                success=True,
+                video_id=request.video_id,
+                **detect_greenwashing_heuristic(
+                    title=request.title,
+                    description=request.description,
+                    transcript=None,
+                    subs=request.subscriber_count
+                )
+            ))
+        else:
+            yield sse_event("greenwashing", greenwashing_skip_response(request.video_id))
+        stage_started = mark("heuristic", started)
+        
+        transcript = None
+        if request.fetch_transcript:
+            transcript_response = await get_transcript(TranscriptRequest(video_id=request.video_id))
+            stage_started = mark("transcript", stage_started)
+            yield sse_event("transcript", transcript_for_response(transcript_response, request.include_transcript))
+            if transcript_response.success:
+                transcript = transcript_response.transcript
+        
+        fused = None
+        if FUSED_ANALYSIS and AI_AVAILABLE and is_sustainability:
+            fused = await analyze_fused_ai(
+                title=request.title,
+                description=request.description,
+                transcript=transcript,
+                channel=request.channel_title,
+                subs=request.subscriber_count,
+                query=request.query
+            )
+            stage_started = mark("fused", stage_started)
+        
+        if fused:
+            record_analysis_result("quality", fused[0]["method"])
+            record_analysis_result("greenwashing", fused[1]["method"])
+            yield sse_event("quality", QualityScoreResponse(success=True, video_id=request.video_id, **fused[0]))
+            yield sse_event("greenwashing", GreenwashingResponse(success=True, video_id=request.video_id, **fused[1]))
+        else:
+            async def tagged(name: str, coro: Awaitable[BaseModel]) -> Tuple[str, BaseModel]:
+                return name, await coro
+            
+            tasks = [asyncio.create_task(tagged("quality", score_video_quality(
+                base_quality.model_copy(update={"transcript": transcript})
+            )))]
+            if is_sustainability:
+                tasks.append(asyncio.create_task(tagged("greenwashing", detect_greenwashing(
+                    GreenwashingRequest(
+                        video_id=request.video_id,
+                        title=request.title,
+                        description=request.description,
+                        transcript=transcript,
+                        channel_subscriber_count=request.subscriber_count
+                    )
+                ))))
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    name, result = await next_done
+                    mark(name, stage_started)
+                    yield sse_event(name, result)
+            finally:
+                # Client went away: don't keep working on its behalf
+                for task in tasks:
+                    task.cancel()
+        
+        mark("total", started)
+        yield sse_event("done", {"video_id": request.video_id, "timings_ms": timings})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+# ============================================
+# APP FACTORY
+# ============================================
+
+def create_app() -> FastAPI:
+    """Build the ASGI app; subsystems (clients, pools) start lazily or in lifespan"""
+    app = FastAPI(
+        title="Silenced by the Algorithm - Backend",
+        description="Python backend for transcript fetching and DeepSeek AI analysis",
+        version="1.1.0",
+        lifespan=lifespan,
+        # orjson renders the response dicts several times faster than json.dumps
+        default_response_class=ORJSONResponse if orjson is not None else JSONResponse
     )
     
-    return FullAnalysisResponse(
-        success=True,
-        video_id=request.video_id,
-        transcript=transcript_response,
-        quality=quality_response,
-        greenwashing=greenwashing_response
+    # CORS - allow extension to call this
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, restrict to extension origin
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(DeadlineMiddleware, default_budget_ms=DEFAULT_REQUEST_BUDGET_MS)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=RESPONSE_COMPRESSION_MIN_BYTES,
+        gzip_level=RESPONSE_GZIP_LEVEL
     )
+    # Outermost, so it times everything below it
+    app.add_middleware(MetricsMiddleware, requests=http_requests, latency=http_latency, route_of=_route_of)
+    
+    app.include_router(router)
+    return app
+
+app = create_app()
 
 # ============================================
 # MAIN
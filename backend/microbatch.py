@@ -0,0 +1,87 @@
+"""
+Micro-batching for small, independent requests.
+
+Callers submit one item each and await their own result. Items arriving
+within a short window (or until the batch is full) are handed to a single
+batch function together, and its per-item results are fanned back out to
+the waiting callers.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+
+class MicroBatcher:
+    """Collect items for up to window_seconds / max_items, then run them as one batch"""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float,
+        max_items: int,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+        self.run_batch = run_batch
+
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks: hold each
+        # running batch until it finishes
+        self._running: Set[asyncio.Task] = set()
+        self._batches = 0
+        self._items = 0
+        self._max_batch_size = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self._batches += 1
+        self._items += len(batch)
+        self._max_batch_size = max(self._max_batch_size, len(batch))
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size": self._max_batch_size,
+            "pending": len(self._pending),
+            "running": len(self._running),
+        }
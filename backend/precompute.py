@@ -0,0 +1,131 @@
+"""
+Background work queue for warming caches ahead of user requests.
+
+Jobs are keyed: a key that is already queued, running or waiting for a
+retry is not added again. A fixed number of asyncio workers drain the
+queue, so warming never takes more than that many pipeline slots. A job
+whose handler returns False (or raises) is retried with exponential
+backoff and jitter, up to max_attempts.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class BackgroundQueue:
+    """Deduplicating asyncio work queue with bounded concurrency and retries"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[bool]],
+        workers: int,
+        max_queued: int,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 5.0,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._keys: Set[str] = set()  # queued, running or waiting to retry
+        self._retry_timers: Set[asyncio.TimerHandle] = set()
+        self._running = 0
+        self._submitted = 0
+        self._duplicates = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._retries = 0
+        self._runs = 0
+        self._total_run = 0.0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for timer in self._retry_timers:
+            timer.cancel()
+        self._retry_timers.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._keys.clear()
+
+    def submit(self, key: str, item: Any) -> str:
+        """Queue a job; returns "queued", "duplicate" or "rejected" (queue full / not started)"""
+        if key in self._keys:
+            self._duplicates += 1
+            return "duplicate"
+        if self._queue is None or len(self._keys) >= self.max_queued:
+            self._rejected += 1
+            return "rejected"
+        self._keys.add(key)
+        self._submitted += 1
+        self._queue.put_nowait((key, item, 1))
+        return "queued"
+
+    async def _worker(self) -> None:
+        while True:
+            key, item, attempt = await self._queue.get()
+            self._running += 1
+            started = time.perf_counter()
+            try:
+                ok = await self.handler(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                ok = False
+            finally:
+                self._running -= 1
+                self._runs += 1
+                self._total_run += time.perf_counter() - started
+            self._finish(key, item, attempt, ok)
+
+    def _finish(self, key: str, item: Any, attempt: int, ok: bool) -> None:
+        if ok:
+            self._completed += 1
+            self._keys.discard(key)
+        elif attempt >= self.max_attempts:
+            self._failed += 1
+            self._keys.discard(key)
+        else:
+            self._retries += 1
+            delay = self.retry_base_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            self._schedule_retry(delay, (key, item, attempt + 1))
+
+    def _schedule_retry(self, delay: float, job: Tuple[str, Any, int]) -> None:
+        def requeue():
+            self._retry_timers.discard(timer)
+            if self._queue is not None:
+                self._queue.put_nowait(job)
+
+        timer = asyncio.get_running_loop().call_later(delay, requeue)
+        self._retry_timers.add(timer)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "waiting_retry": len(self._retry_timers),
+            "submitted": self._submitted,
+            "duplicates": self._duplicates,
+            "rejected": self._rejected,
+            "completed": self._completed,
+            "failed": self._failed,
+            "retries": self._retries,
+            "avg_run_ms": round(self._total_run / self._runs * 1000, 1) if self._runs else 0.0,
+        }
@@ -0,0 +1,183 @@
+"""
+Priority-aware rate limiting for outbound LLM calls.
+
+Every DeepSeek request takes one permit from a requests-per-second bucket
+and its estimated token count from a tokens-per-minute bucket before it is
+sent. When the buckets are empty, callers queue by priority class:
+interactive requests (the video the user is looking at) are always served
+before batch and prefetch work, so a burst of background analyses can't
+push them behind our own rate limit. A 429 from the API pauses the whole
+scheduler for its Retry-After.
+"""
+
+import asyncio
+import contextvars
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Highest priority first
+PRIORITIES = ("interactive", "batch", "prefetch")
+
+current_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_priority", default="interactive"
+)
+
+
+class RateLimited(Exception):
+    """The API answered 429; retry_after is in seconds"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Retry-After in seconds (HTTP-date values are rare from APIs; use the default)"""
+    try:
+        return max(0.0, float(value)) if value else default
+    except ValueError:
+        return default
+
+
+class TokenBucket:
+    """rate units per second, up to capacity; rate <= 0 means unlimited"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until amount is available"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.capacity) - self._level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self._level -= min(amount, self.capacity)
+
+
+class LLMScheduler:
+    """Token-bucket admission for LLM calls with strict priority between classes"""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_second: float,
+        request_burst: int,
+        tokens_per_minute: float,
+        priorities: Tuple[str, ...] = PRIORITIES,
+    ):
+        self.name = name
+        self.priorities = priorities
+        self._requests = TokenBucket(requests_per_second, max(1, request_burst))
+        self._tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self._blocked_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self._queues: Dict[str, Deque[Tuple[float, asyncio.Future, float]]] = {p: deque() for p in priorities}
+        self._granted = {p: 0 for p in priorities}
+        self._total_wait = {p: 0.0 for p in priorities}
+        self._max_wait = {p: 0.0 for p in priorities}
+        self._throttled = 0
+
+    def _delay(self, tokens: float, now: float) -> float:
+        return max(
+            self._blocked_until - now,
+            self._requests.delay(1, now),
+            self._tokens.delay(tokens, now),
+        )
+
+    def _grant(self, priority: str, tokens: float, waited: float) -> None:
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        self._granted[priority] += 1
+        self._total_wait[priority] += waited
+        self._max_wait[priority] = max(self._max_wait[priority], waited)
+
+    def _priority(self, priority: Optional[str]) -> str:
+        priority = priority or current_priority.get()
+        return priority if priority in self._queues else self.priorities[-1]
+
+    def _grant_now(self, priority: str, tokens: float, now: float) -> bool:
+        """Grant without queueing if nothing of this class or above is waiting and the buckets allow it"""
+        ahead = any(self._queues[p] for p in self.priorities[:self.priorities.index(priority) + 1])
+        if ahead or self._delay(tokens, now) > 0:
+            return False
+        self._grant(priority, tokens, 0.0)
+        return True
+
+    def try_acquire(self, tokens: float, priority: Optional[str] = None) -> bool:
+        """Take a permit only if one is free now (for optional calls such as hedges)"""
+        return self._grant_now(self._priority(priority), tokens, time.monotonic())
+
+    async def acquire(self, tokens: float, priority: Optional[str] = None) -> float:
+        """Wait for permission to send a call of about `tokens` tokens; returns seconds waited"""
+        priority = self._priority(priority)
+        now = time.monotonic()
+        if self._grant_now(priority, tokens, now):
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append((tokens, future, now))
+        self._dispatch()
+        await future
+        return time.monotonic() - now
+
+    def _dispatch(self) -> None:
+        """Grant queued calls in priority order; re-arm a timer for the first one that must wait"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        for priority in self.priorities:
+            queue = self._queues[priority]
+            while queue:
+                tokens, future, enqueued_at = queue[0]
+                if future.done():  # caller gave up (cancelled / timed out)
+                    queue.popleft()
+                    continue
+                delay = self._delay(tokens, now)
+                if delay > 0:
+                    # Lower classes wait too, so they can't starve this one
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                    return
+                queue.popleft()
+                self._grant(priority, tokens, now - enqueued_at)
+                future.set_result(None)
+
+    def backoff(self, retry_after: float) -> None:
+        """Pause all calls for retry_after seconds (after a 429)"""
+        self._throttled += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_second": self._requests.rate,
+            "tokens_per_minute": self._tokens.rate * 60,
+            "throttled": self._throttled,
+            "blocked_for_ms": round(max(0.0, self._blocked_until - time.monotonic()) * 1000, 1),
+            "classes": {
+                p: {
+                    "queued": sum(1 for _, future, _ in self._queues[p] if not future.done()),
+                    "granted": self._granted[p],
+                    "avg_wait_ms": round(self._total_wait[p] / self._granted[p] * 1000, 2) if self._granted[p] else 0.0,
+                    "max_wait_ms": round(self._max_wait[p] * 1000, 2),
+                }
+                for p in self.priorities
+            },
+        }
@@ -0,0 +1,210 @@
+"""
+Latency budgets and failure isolation for upstream calls.
+
+- Deadline: the time a client is still willing to wait, carried in a
+  context variable so every await below the endpoint can see it.
+- CircuitBreaker: after a run of failed or slow calls, stop calling the
+  upstream for a while and let a single probe through to test recovery.
+- LatencyTracker: rolling window of call durations, used to decide when
+  a call is slow enough to be worth hedging.
+"""
+
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs
+
+
+class Deadline:
+    """Absolute point in time (time.monotonic) by which a request must answer"""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, budget_seconds: float):
+        self.expires_at = time.monotonic() + budget_seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def extend(self, other: Optional["Deadline"]) -> None:
+        """Move expires_at out to other's, or drop it entirely if other is None (no deadline)"""
+        self.expires_at = math.inf if other is None else max(self.expires_at, other.expires_at)
+
+
+current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "current_deadline", default=None
+)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current request's budget, or None if it has none"""
+    deadline = current_deadline.get()
+    if deadline is None or deadline.expires_at == math.inf:
+        return None
+    return deadline.remaining()
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware that sets current_deadline from the request.
+
+    The budget is read from a header (milliseconds) or, for clients that
+    can't set headers, a query parameter; requests without either get
+    default_budget_ms (0 = no deadline).
+    """
+
+    def __init__(self, app, header: str = "x-deadline-ms", query_param: str = "deadline_ms", default_budget_ms: float = 0):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+        self.query_param = query_param
+        self.default_budget_ms = default_budget_ms
+
+    def _budget_ms(self, scope) -> float:
+        for name, value in scope.get("headers", ()):
+            if name == self.header:
+                return _parse_ms(value.decode("latin-1"), self.default_budget_ms)
+        query_string = scope.get("query_string", b"")
+        if query_string:
+            values = parse_qs(query_string.decode("latin-1")).get(self.query_param)
+            if values:
+                return _parse_ms(values[0], self.default_budget_ms)
+        return self.default_budget_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        budget_ms = self._budget_ms(scope)
+        token = current_deadline.set(Deadline(budget_ms / 1000) if budget_ms > 0 else None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_deadline.reset(token)
+
+
+def _parse_ms(value: str, default: float) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures (calls slower
+    than slow_call_seconds count as failures). Open -> half-open after
+    reset_seconds, when one probe call is allowed; its outcome closes or
+    re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, slow_call_seconds: float, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_seconds = reset_seconds
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._opened = 0
+        self._rejected = 0
+        self._successes = 0
+        self._failures = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (in half-open state, only the probe)"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record(self, ok: bool, duration_seconds: float) -> None:
+        """Outcome of a call that allow() let through"""
+        ok = ok and duration_seconds <= self.slow_call_seconds
+        with self._lock:
+            if ok:
+                self._successes += 1
+                self._consecutive_failures = 0
+                self._state = self.CLOSED
+            else:
+                self._failures += 1
+                self._consecutive_failures += 1
+                if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                    if self._state != self.OPEN:
+                        self._opened += 1
+                    self._state = self.OPEN
+                    self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """A call that allow() let through ended without an outcome (e.g. rate limited)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "opened": self._opened,
+                "rejected": self._rejected,
+                "successes": self._successes,
+                "failures": self._failures,
+            }
+
+
+class LatencyTracker:
+    """Durations of the last window_size successful calls"""
+
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def record(self, duration_seconds: float) -> None:
+        with self._lock:
+            self._samples.append(duration_seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p-th percentile (0-100), or None until min_samples calls were seen"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def stats(self) -> Dict[str, Any]:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "samples": len(self._samples),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
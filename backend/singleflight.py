@@ -0,0 +1,67 @@
+"""
+Request coalescing ("single-flight") for identical in-flight work.
+
+When a video trends, many clients ask for the same thing within the same
+second. The first caller for a key starts the work; everyone else arriving
+while it is still running awaits the same task instead of repeating it.
+Nothing is remembered once the task finishes - that's the caches' job.
+
+The shared task runs under its own copy of the leader's deadline, which
+every caller that joins loosens to its own: a short-deadline leader must
+not push callers with more time (or none) onto the fallback paths.
+"""
+
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from resilience import Deadline, current_deadline
+
+
+class SingleFlight:
+    """Share one in-flight task between concurrent callers with the same key"""
+
+    def __init__(self, name: str):
+        self.name = name
+        # key -> (task, the deadline it runs under; None = no deadline)
+        self._inflight: Dict[str, Tuple[asyncio.Task, Optional[Deadline]]] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._inflight.get(key)
+        if flight is not None:
+            task, deadline = flight
+            self._coalesced += 1
+            if deadline is not None:
+                deadline.extend(current_deadline.get())
+        else:
+            self._leaders += 1
+            leader_deadline = current_deadline.get()
+            deadline = None if leader_deadline is None else Deadline(leader_deadline.remaining())
+            context = contextvars.copy_context()
+            context.run(current_deadline.set, deadline)
+            task = asyncio.get_running_loop().create_task(fn(), context=context)
+            self._inflight[key] = (task, deadline)
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        # Shielded so one caller disconnecting doesn't cancel the work
+        # for everyone else waiting on it
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        flight = self._inflight.get(key)
+        if flight is not None and flight[0] is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self._leaders + self._coalesced
+        return {
+            "executed": self._leaders,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._inflight),
+            "coalesced_ratio": round(self._coalesced / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,16 @@
+"""
+Shared test setup: import the backend modules flat (as main.py does) and
+keep every cache in a throwaway SQLite file with no external services.
+"""
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Before any backend module is imported: these are read at import time
+os.environ.setdefault("CACHE_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="backend-tests-"), "cache.sqlite3"))
+os.environ.setdefault("STARTUP_WARM_UP", "false")
+os.environ["DEEPSEEK_API_KEY"] = ""
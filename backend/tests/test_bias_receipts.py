@@ -0,0 +1,74 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from topicindex import TopicIndex
+
+numpy_only = pytest.mark.skipif(main.load_numpy() is None, reason="compares against the NumPy path")
+
+
+def make_pool(size, seed):
+    rng = random.Random(seed)
+    keys = [rng.choice([None, "a", "b", "c", f"ch{rng.randint(0, 30)}"]) for _ in range(size)]
+    subs = [rng.choice([0, 10, 999, 25_000, 3_000_000]) for _ in range(size)]
+    # Quarter steps keep the float sums exact, so both paths round identically
+    views = [rng.randint(0, 400) / 4 if rng.random() < 0.8 else 0.0 for _ in range(size)]
+    return keys, subs, views
+
+
+def pure_python(monkeypatch, *columns):
+    with monkeypatch.context() as patched:
+        patched.setattr(main, "load_numpy", lambda: None)
+        return main.topic_statistics(*columns)
+
+
+@numpy_only
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("size", [1, 2, 11, 200])
+def test_numpy_and_pure_python_agree(monkeypatch, seed, size):
+    columns = make_pool(size, seed)
+    assert main.topic_statistics(*columns) == pure_python(monkeypatch, *columns)
+
+
+@numpy_only
+@pytest.mark.parametrize("columns", [
+    ([], [], []),
+    ([None, None], [5, 7], [1.0, 2.0]),
+    (["a", "b", None], [5, 7, 9], [0.0, 0.0, 0.0]),
+])
+def test_numpy_and_pure_python_agree_on_edge_cases(monkeypatch, columns):
+    assert main.topic_statistics(*columns) == pure_python(monkeypatch, *columns)
+
+
+def test_channel_less_videos_stay_out_of_the_share():
+    keys = [f"c{i % 3}" for i in range(30)] + [None] * 300
+    stats = main.topic_statistics(keys, [100] * 330, [1.0] * 330)
+    assert stats.channels == 3
+    assert stats.top10_share == 100.0
+    assert main.topic_statistics([None], [100], [1.0]).top10_share is None
+
+
+def test_subscriber_mean_is_per_video():
+    # One channel with three videos at 90 subs, one at 10: per video, not per channel
+    stats = main.topic_statistics(["a", "a", "a", "b"], [90, 90, 90, 10], [1, 1, 1, 1])
+    assert stats.mean_subscribers == 70.0
+    assert stats.median_subscribers == 90.0
+
+
+def test_batch_and_topic_index_agree(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "topic_index", TopicIndex(str(tmp_path / "topics.sqlite3")))
+    keys, subs, views = make_pool(60, seed=3)
+    candidates = [
+        {"video_id": f"v{i}", "channel_title": key or "", "subscriber_count": s, "views_per_day": v}
+        for i, (key, s, v) in enumerate(zip(keys, subs, views))
+    ]
+
+    with TestClient(main.create_app()) as client:
+        batch = client.post("/bias-receipt/batch", json={"query": "heat pumps", "candidates": candidates}).json()
+        indexed = client.get("/topic-stats", params={"query": "heat pumps"}).json()["stats"]
+
+    assert batch["topic_stats"]["videos"] == round(indexed["videos"])
+    assert batch["topic_stats"]["mean_subscribers"] == pytest.approx(indexed["mean_subscribers"], abs=0.1)
+    assert batch["topic_stats"]["top10_share"] == pytest.approx(indexed["top10_share"], abs=0.1)
@@ -0,0 +1,129 @@
+import itertools
+import math
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+pytestmark = pytest.mark.skipif(main.load_numpy() is None, reason="bulk scoring needs numpy")
+
+WORDS = [
+    "the", "energy", "green", "solar", "SHOCKING", "insane", "!!!", "exposed", "research",
+    "study", "data", "evidence", "according", "to", "explains", "wind", "grid", "costs",
+]
+FIELDS = ("relevance_score", "quality_score", "content_depth_score", "combined_score", "method", "reason", "flags")
+
+
+def make_pool(size: int, seed: int = 7):
+    rng = random.Random(seed)
+
+    def words(low, high):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+    titles = [words(2, 12) for _ in range(size)]
+    titles = [title.upper() if rng.random() < 0.1 else title for title in titles]
+    descriptions = [words(0, 60) for _ in range(size)]
+    subscribers = [rng.choice([0, 999, 1000, 1001, 5000, 250_000]) for _ in range(size)]
+    # None, too short for depth (<= 500 chars), and each depth tier
+    transcripts = [
+        None if rng.random() < 0.3 else " ".join(rng.choice(WORDS) for _ in range(rng.choice([10, 90, 400, 1200])))
+        for _ in range(size)
+    ]
+    return titles, descriptions, subscribers, transcripts
+
+
+def scalar(titles, descriptions, subscribers, transcripts, query):
+    return [
+        main.score_quality_heuristic(titles[i], descriptions[i], transcripts[i], "", subscribers[i], query)
+        for i in range(len(titles))
+    ]
+
+
+@pytest.mark.parametrize("query", ["green energy", "solar research", ""])
+def test_bulk_arrays_match_scalar_heuristic(query):
+    titles, descriptions, subscribers, transcripts = make_pool(300)
+    expected = scalar(titles, descriptions, subscribers, transcripts, query)
+    arrays = main.score_quality_bulk(titles, descriptions, subscribers, query, transcripts=transcripts)
+
+    assert any(row["content_depth_score"] is None for row in expected)
+    assert any(row["content_depth_score"] is not None for row in expected)
+    for i, row in enumerate(expected):
+        for field in ("relevance_score", "quality_score", "combined_score"):
+            assert arrays[field][i] == row[field], (i, field)
+        depth = arrays["content_depth_score"][i]
+        if row["content_depth_score"] is None:
+            assert math.isnan(depth), i
+        else:
+            assert depth == row["content_depth_score"], i
+        assert bool(arrays["has_transcript"][i]) == bool(transcripts[i])
+
+
+def test_round_array_matches_round_on_every_reachable_score():
+    # Every value the scalar heuristic can round, built with its own arithmetic
+    relevance = {
+        min(1, 0.5 + (min(0.3, title * 0.1) if title else 0) + (min(0.2, desc * 0.05) if desc else 0))
+        for title in range(6) for desc in range(7)
+    }
+    quality = {
+        max(0, min(1, 0.5 + 0.1 * subs + 0.1 * desc - (min(0.2, clickbait * 0.1) if clickbait else 0) - 0.1 * caps))
+        for subs, desc, clickbait, caps in itertools.product((0, 1), (0, 1), range(4), (0, 1))
+    }
+    depth = {min(1, 0.5 + 0.2 * a + 0.1 * b + 0.2 * c) for a, b, c in itertools.product((0, 1), repeat=3)}
+    combined = {r * 0.4 + q * 0.4 for r in relevance for q in quality}
+    combined |= {r * 0.3 + q * 0.3 + d * 0.4 for r in relevance for q in quality for d in depth}
+
+    values = sorted(relevance | quality | depth | combined)
+    rounded = main._round_array(main.load_numpy().array(values))
+    assert rounded.tolist() == [round(v, 2) for v in values]
+
+
+def test_bulk_endpoint_matches_scalar_heuristic_field_by_field():
+    titles, descriptions, subscribers, transcripts = make_pool(200, seed=3)
+    video_ids = [f"v{i}" for i in range(len(titles))]
+    expected = dict(zip(video_ids, scalar(titles, descriptions, subscribers, transcripts, "green energy")))
+
+    with TestClient(main.create_app()) as client:
+        response = client.post("/quality-score/bulk", json={
+            "query": "green energy",
+            "video_ids": video_ids,
+            "titles": titles,
+            "descriptions": descriptions,
+            "subscriber_counts": subscribers,
+            "transcripts": transcripts,
+            "top_k": len(titles),
+        })
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == len(titles)
+
+    for result in results:
+        row = expected[result["video_id"]]
+        for field in FIELDS:
+            assert result[field] == row[field], (result["video_id"], field)
+
+    # Ranked by combined score, ties in request order
+    order = [video_ids.index(result["video_id"]) for result in results]
+    assert order == sorted(range(len(titles)), key=lambda i: -expected[video_ids[i]]["combined_score"])
+
+
+def test_bulk_endpoint_with_transcript_lengths_only():
+    titles, descriptions, subscribers, transcripts = make_pool(50, seed=5)
+    video_ids = [f"v{i}" for i in range(len(titles))]
+    lengths = [len(t) if t else 0 for t in transcripts]
+
+    with TestClient(main.create_app()) as client:
+        results = client.post("/quality-score/bulk", json={
+            "query": "green energy",
+            "video_ids": video_ids,
+            "titles": titles,
+            "subscriber_counts": subscribers,
+            "transcript_lengths": lengths,
+            "top_k": len(titles),
+        }).json()["results"]
+
+    for result in results:
+        i = video_ids.index(result["video_id"])
+        expected_depth = lengths[i] > 500
+        assert (result["content_depth_score"] is not None) == expected_depth, i
@@ -0,0 +1,266 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import cache
+from cache import TieredCache, shared_fill
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_hit_after_set(db_path):
+    c = TieredCache("t", path=db_path)
+    assert c.get("k") is None
+    c.set("k", {"a": 1})
+    assert c.get("k") == {"a": 1}
+    stats = c.stats()
+    assert stats["misses"] == 1
+    assert stats["hot_hits"] == 1
+
+
+def test_entries_expire_after_ttl(db_path, clock):
+    c = TieredCache("t", path=db_path, ttl_seconds=60)
+    c.set("k", "v")
+    clock.now += 59
+    assert c.get("k") == "v"
+    clock.now += 2
+    assert c.get("k") is None
+    assert c.stats()["expired"] >= 1
+    # Gone from the disk tier too, not just the memory tier
+    assert TieredCache("t", path=db_path).get("k") is None
+
+
+def test_per_entry_ttl_overrides_default(db_path, clock):
+    c = TieredCache("t", path=db_path, ttl_seconds=3600)
+    c.set("k", "v", ttl_seconds=10)
+    clock.now += 11
+    assert c.get("k") is None
+
+
+def test_negative_entries_use_negative_ttl(db_path, clock):
+    c = TieredCache("t", path=db_path, ttl_seconds=3600, negative_ttl_seconds=60)
+    c.set("missing", {"error": "no captions"}, negative=True)
+    assert c.get("missing") == {"error": "no captions"}
+    assert c.stats()["negative_hits"] == 1
+
+    clock.now += 61
+    assert c.get("missing") is None
+
+
+def test_negative_flag_survives_disk_tier(db_path):
+    TieredCache("t", path=db_path).set("missing", "none", negative=True)
+    c = TieredCache("t", path=db_path)
+    assert c.get("missing") == "none"
+    assert c.stats()["negative_hits"] == 1
+
+
+def test_memory_miss_falls_through_to_disk(db_path):
+    writer = TieredCache("t", path=db_path, hot_size=1)
+    writer.set("a", 1)
+    writer.set("b", 2)  # evicts "a" from the memory tier
+    assert writer.get("a") == 1
+    assert writer.stats()["disk_hits"] == 1
+
+    # A fresh instance (another worker) sees the same disk tier, then serves from memory
+    reader = TieredCache("t", path=db_path)
+    assert reader.get("b") == 2
+    assert reader.get("b") == 2
+    stats = reader.stats()
+    assert (stats["disk_hits"], stats["hot_hits"]) == (1, 1)
+
+
+def test_memory_only_without_path():
+    c = TieredCache("t", path="")
+    c.set("k", "v")
+    assert c.get("k") == "v"
+    assert c.stats()["disk_entries"] is None
+
+
+def test_unreadable_disk_value_is_a_miss(db_path):
+    def loads(raw):
+        raise ValueError("corrupt")
+
+    TieredCache("t", path=db_path).set("k", "v")
+    c = TieredCache("t", path=db_path, loads=loads)
+    assert c.get("k") is None
+    assert c.stats()["misses"] == 1
+
+
+def test_disk_tier_is_trimmed_to_max_entries(db_path, clock):
+    c = TieredCache("t", path=db_path, max_entries=10)
+    for i in range(cache.TRIM_EVERY_N_WRITES):
+        clock.now += 1
+        c.set(f"k{i}", i)
+    assert c.stats()["disk_entries"] == 10
+    # Least recently used go first
+    c._hot.clear()
+    assert c.get(f"k{cache.TRIM_EVERY_N_WRITES - 1}") is not None
+    assert c.get("k0") is None
+
+
+def test_lease_is_exclusive_until_released(db_path):
+    first = TieredCache("t", path=db_path)
+    second = TieredCache("t", path=db_path)
+
+    token = first.try_lease("k", 30)
+    assert token is not None
+    assert second.try_lease("k", 30) is None
+    assert second.lease_held("k")
+
+    first.release_lease("k", token)
+    assert not second.lease_held("k")
+    assert second.try_lease("k", 30) is not None
+
+
+def test_lease_release_needs_the_holders_token(db_path):
+    c = TieredCache("t", path=db_path)
+    token = c.try_lease("k", 30)
+    c.release_lease("k", f"{os.getpid()}:someone-else")
+    assert c.lease_held("k")
+    c.release_lease("k", token)
+    assert not c.lease_held("k")
+
+
+def test_expired_lease_can_be_taken_over(db_path, clock):
+    c = TieredCache("t", path=db_path)
+    stale = c.try_lease("k", 30)
+    clock.now += 31
+    assert not c.lease_held("k")
+    fresh = c.try_lease("k", 30)
+    assert fresh is not None
+    # The old holder releasing late must not drop the new lease
+    c.release_lease("k", stale)
+    assert c.lease_held("k")
+
+
+def test_disk_tier_is_opened_on_first_use(db_path):
+    c = TieredCache("t", path=db_path)
+    assert not os.path.exists(db_path)
+    c.open()
+    assert os.path.exists(db_path)
+
+
+def test_first_use_keeps_memory_tier_entries(db_path):
+    c = TieredCache("t", path=db_path)
+    c.set("k", "v")
+    assert c.get("k") == "v"
+    assert c.stats()["hot_hits"] == 1
+
+
+def test_async_api_round_trip(db_path):
+    async def scenario():
+        c = TieredCache("t", path=db_path, hot_size=1)
+        assert await c.aget("k") is None
+        assert not await c.acontains("k")
+        await c.aset("k", {"a": 1})
+        await c.aset("other", 2)  # pushes k out of the memory tier
+        assert await c.acontains("k")
+        assert await c.aget("k") == {"a": 1}
+        return c.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["disk_hits"], stats["misses"], stats["writes"]) == (1, 1, 2)
+
+
+def test_hot_hits_dont_wait_for_disk_io(db_path):
+    c = TieredCache("t", path=db_path)
+    c.set("k", "v")
+
+    async def scenario():
+        # A pool thread in the middle of a disk write or trim
+        with c._db_lock:
+            assert await asyncio.wait_for(c.aget("k"), 0.5) == "v"
+            assert await asyncio.wait_for(c.acontains("k"), 0.5)
+
+    asyncio.run(scenario())
+
+
+def test_busy_disk_tier_doesnt_block_the_loop(db_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_BUSY_TIMEOUT_MS", 200)
+    c = TieredCache("t", path=db_path)
+    c.open()
+    other = sqlite3.connect(db_path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # another worker holds the write lock
+
+    async def scenario():
+        gaps = []
+
+        async def ticker():
+            last = time.monotonic()
+            for _ in range(40):
+                await asyncio.sleep(0.005)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        tick = asyncio.create_task(ticker())
+        for i in range(3):
+            await c.aset(f"k{i}", "x" * 200_000)
+        await tick
+        return max(gaps)
+
+    try:
+        assert asyncio.run(scenario()) < 0.1
+    finally:
+        other.execute("ROLLBACK")
+
+
+def test_shared_fill_waits_for_the_lease_holder(db_path):
+    first, second = TieredCache("t", path=db_path), TieredCache("t", path=db_path)
+
+    async def scenario():
+        async with shared_fill(first, "k", lease_seconds=5) as value:
+            assert value is None  # we fill it
+            waiter = asyncio.create_task(_fill(second))
+            await asyncio.sleep(0.05)
+            first.set("k", "filled")
+        return await waiter
+
+    async def _fill(c):
+        async with shared_fill(c, "k", lease_seconds=5) as value:
+            return value
+
+    assert asyncio.run(scenario()) == "filled"
+    assert not first.lease_held("k")
+    assert second.stats()["peer_fills"] == 1
+
+
+def test_shared_fill_lease_calls_run_off_the_loop(db_path, monkeypatch):
+    c = TieredCache("t", path=db_path)
+    threads = []
+    for name in ("try_lease", "release_lease"):
+        method = getattr(c, name)
+        monkeypatch.setattr(c, name, lambda *args, _m=method: threads.append(threading.current_thread()) or _m(*args))
+
+    async def scenario():
+        async with shared_fill(c, "k", lease_seconds=5):
+            pass
+
+    asyncio.run(scenario())
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
@@ -0,0 +1,79 @@
+import asyncio
+import gzip
+import zlib
+
+from compression import CompressionMiddleware
+
+
+def app_sending(*messages):
+    async def app(scope, receive, send):
+        for message in messages:
+            await send(message)
+    return app
+
+
+def start(*headers):
+    return {"type": "http.response.start", "status": 200, "headers": list(headers)}
+
+
+def body(data, more_body=False):
+    return {"type": "http.response.body", "body": data, "more_body": more_body}
+
+
+def call(app, accept_encoding="gzip", minimum_size=100):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=minimum_size)(scope, receive, send))
+    return sent
+
+
+def test_small_response_passes_through_unchanged():
+    messages = [start((b"content-length", b"5"), (b"etag", b'"abc"')), body(b"hello")]
+    assert call(app_sending(*messages)) == messages
+
+
+def test_already_encoded_response_passes_through_unchanged():
+    encoded = gzip.compress(b"x" * 1000)
+    messages = [
+        start((b"content-encoding", b"gzip"), (b"content-length", str(len(encoded)).encode())),
+        body(encoded),
+    ]
+    assert call(app_sending(*messages)) == messages
+
+
+def test_response_without_accept_encoding_passes_through_unchanged():
+    messages = [start(), body(b"x" * 1000)]
+    assert call(app_sending(*messages), accept_encoding="") == messages
+
+
+def test_large_response_is_gzipped():
+    data = b"hello there " * 100
+    sent = call(app_sending(start((b"content-length", b"1200"), (b"etag", b'"abc"')), body(data)))
+    headers = dict(sent[0]["headers"])
+
+    assert gzip.decompress(sent[1]["body"]) == data
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"content-length"] == str(len(sent[1]["body"])).encode()
+    assert headers[b"etag"] == b'"abc-gzip"'
+    assert headers[b"vary"] == b"Accept-Encoding"
+
+
+def test_streamed_chunks_are_flushed_as_they_are_sent():
+    chunks = [b"data: one\n\n", b"data: two\n\n", b""]
+    sent = call(app_sending(start(), *(body(chunk, more_body=i < 2) for i, chunk in enumerate(chunks))))
+    headers = dict(sent[0]["headers"])
+    assert b"content-length" not in headers
+
+    decoder = zlib.decompressobj(31)
+    # Each chunk decodes on its own, before the stream ends
+    assert decoder.decompress(sent[1]["body"]) == chunks[0]
+    assert decoder.decompress(sent[2]["body"]) == chunks[1]
+    assert decoder.decompress(sent[3]["body"]) == b""
+    assert decoder.eof
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from ratelimit import LLMScheduler, RateLimited
+from resilience import CircuitBreaker, LatencyTracker
+
+
+class FakeUpstream:
+    """Stands in for the HTTP send: answers after `delay`, or replays scripted outcomes"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.script = []
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self, payload):
+        self.calls += 1
+        outcome = self.script.pop(0) if self.script else self.delay
+        if isinstance(outcome, Exception):
+            raise outcome
+        try:
+            await asyncio.sleep(outcome)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"answer {self.calls}"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = FakeUpstream()
+    monkeypatch.setattr(main, "DEEPSEEK_API_KEY", "test")
+    monkeypatch.setattr(main, "DEEPSEEK_STREAM", False)
+    monkeypatch.setattr(main, "_complete_deepseek", fake)
+    monkeypatch.setattr(main, "deepseek_breaker", CircuitBreaker("test", 5, slow_call_seconds=0.2, reset_seconds=60))
+    monkeypatch.setattr(main, "deepseek_latency", LatencyTracker(min_samples=1))
+    monkeypatch.setattr(main, "deepseek_scheduler", LLMScheduler("test", 0, 1, 0))
+    monkeypatch.setattr(main, "deepseek_guard_stats", dict.fromkeys(main.deepseek_guard_stats, 0))
+    return fake
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_permit_wait_is_not_upstream_latency(upstream, monkeypatch):
+    # 20/s with no burst: the last of 12 calls queues for ~0.5 s, longer than a slow call
+    monkeypatch.setattr(main, "deepseek_scheduler", LLMScheduler("test", 20, 1, 0))
+
+    async def calls():
+        return await asyncio.gather(*(main.call_deepseek_api(f"prompt {i}") for i in range(12)))
+
+    assert all(run(calls()))
+    assert main.deepseek_breaker.stats()["failures"] == 0
+    assert main.deepseek_breaker.state == CircuitBreaker.CLOSED
+    assert main.deepseek_latency.percentile(100) < 0.2
+
+
+def test_rate_limited_send_is_retried_without_tripping_the_breaker(upstream, monkeypatch):
+    monkeypatch.setattr(main, "deepseek_breaker", CircuitBreaker("test", 1, slow_call_seconds=0.2, reset_seconds=60))
+    upstream.script = [RateLimited(0.3), 0.01]
+
+    assert run(main.call_deepseek_api("prompt")) == "answer 2"
+    assert upstream.calls == 2
+    assert main.deepseek_breaker.stats()["failures"] == 0
+    # The Retry-After pause isn't in the latency samples either
+    assert main.deepseek_latency.percentile(100) < 0.2
+
+
+def test_no_hedge_without_a_free_permit(upstream, monkeypatch):
+    monkeypatch.setattr(main, "DEEPSEEK_HEDGE", True)
+    monkeypatch.setattr(main, "deepseek_scheduler", LLMScheduler("test", 1, 1, 0))
+    main.deepseek_latency.record(0.01)
+    upstream.script = [0.1]
+
+    assert run(main.call_deepseek_api("prompt")) == "answer 1"
+    assert upstream.calls == 1
+    assert main.deepseek_guard_stats["hedge_skips"] == 1
+
+
+def test_hedge_wins_and_the_slow_call_is_cancelled(upstream, monkeypatch):
+    monkeypatch.setattr(main, "DEEPSEEK_HEDGE", True)
+    main.deepseek_latency.record(0.02)
+    upstream.script = [5.0, 0.01]
+
+    assert run(main.call_deepseek_api("prompt")) == "answer 2"
+    assert upstream.calls == 2
+    assert upstream.cancelled == 1
+    assert (main.deepseek_guard_stats["hedged"], main.deepseek_guard_stats["hedge_wins"]) == (1, 1)
+
+
+def test_no_hedge_when_the_first_call_is_fast(upstream, monkeypatch):
+    monkeypatch.setattr(main, "DEEPSEEK_HEDGE", True)
+    main.deepseek_latency.record(0.5)
+    upstream.script = [0.01]
+
+    assert run(main.call_deepseek_api("prompt")) == "answer 1"
+    assert upstream.calls == 1
+    assert main.deepseek_guard_stats["hedged"] == 0
+
+
+@pytest.fixture
+def client(upstream, monkeypatch):
+    monkeypatch.setattr(main, "AI_AVAILABLE", True)
+    monkeypatch.setattr(main, "QUALITY_BATCH_WINDOW_MS", 0)
+    with TestClient(main.create_app()) as test_client:
+        yield test_client
+
+
+def score(client, title, deadline_ms):
+    return client.post(
+        "/quality-score",
+        json={"video_id": "v", "title": title, "query": "solar"},
+        headers={"x-deadline-ms": str(deadline_ms)},
+    ).json()
+
+
+def test_small_budget_skips_deepseek(client, upstream):
+    result = score(client, "deadline skip", deadline_ms=main.DEEPSEEK_MIN_BUDGET_MS / 2)
+    assert result["method"].startswith("heuristic")
+    assert upstream.calls == 0
+    assert main.deepseek_guard_stats["deadline_skips"] == 1
+
+
+def test_slow_call_gives_up_at_the_deadline(client, upstream, monkeypatch):
+    monkeypatch.setattr(main, "DEEPSEEK_MIN_BUDGET_MS", 100)
+    upstream.script = [2.0]
+    result = score(client, "deadline timeout", deadline_ms=300)
+    assert result["method"].startswith("heuristic")
+    assert upstream.calls == 1
+    assert main.deepseek_guard_stats["deadline_timeouts"] == 1
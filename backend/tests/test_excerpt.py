@@ -0,0 +1,92 @@
+import re
+
+import pytest
+
+from excerpt import GAP_MARKER, ExcerptBuilder, estimate_tokens, group_spans, group_windows
+
+FILLER = "today we talk about many things and some other stuff too"
+DENSE = "solar panels cut emissions; solar research data shows emissions fell"
+
+
+def segments(count, dense_at=()):
+    """Caption segments, each ~60 chars: numbered so windows can be told apart"""
+    return [f"[{i}] " + (DENSE if i in dense_at else FILLER) for i in range(count)]
+
+
+def builder(budget, window_chars=60, head_chars=200):
+    return ExcerptBuilder("t", ["solar", "emissions", "research"], token_budget=budget,
+                          head_chars=head_chars, window_chars=window_chars)
+
+
+def window_ids(excerpt):
+    return [int(i) for i in re.findall(r"\[(\d+)\]", excerpt)]
+
+
+@pytest.mark.parametrize("budget", [40, 100, 250, 600])
+def test_excerpt_stays_within_the_budget(budget):
+    excerpt = builder(budget).build(segments=segments(200, dense_at={5, 90, 150}))
+    assert 0 < estimate_tokens(excerpt) <= budget
+
+
+def test_densest_windows_are_chosen():
+    # Room for about three windows: exactly the dense ones, wherever they are
+    excerpt = builder(60).build(segments=segments(100, dense_at={70, 12, 95}))
+    assert window_ids(excerpt) == [12, 70, 95]
+
+
+def test_query_keywords_count():
+    parts = segments(50)
+    parts[30] = "[30] heat pump heat pump heat pump install"
+    # Segment 30 is short, so its window also holds segment 31
+    excerpt = builder(30).build(segments=parts, extra_keywords=["heat", "pump", "a"])
+    assert window_ids(excerpt) == [30, 31]
+
+
+def test_windows_in_order_with_gap_markers():
+    excerpt = builder(62).build(segments=segments(60, dense_at={40, 41, 3}))
+    assert window_ids(excerpt) == [3, 40, 41]
+    first, rest = excerpt.split(GAP_MARKER)
+    assert first.startswith("[3]")
+    # Adjacent windows are joined with a plain space
+    assert rest.startswith("[40]") and " [41]" in rest and GAP_MARKER not in rest
+
+
+def test_leftover_budget_is_spread_over_the_video():
+    excerpt = builder(400).build(segments=segments(200, dense_at={0}))
+    ids = window_ids(excerpt)
+    assert ids[0] == 0
+    assert ids[-1] > 150
+    assert ids == sorted(ids)
+
+
+def test_short_transcripts_are_sent_whole():
+    text = " ".join(segments(3))
+    assert builder(1000).build(transcript=text) == text
+
+
+def test_budget_zero_is_head_slicing():
+    text = " ".join(segments(100, dense_at={50}))
+    b = builder(0, head_chars=300)
+    assert b.build(transcript=text) == text[:300]
+    stats = b.stats()
+    assert stats["excerpts"] == 1
+    assert stats["tokens_saved"] == 0
+
+
+def test_boundaries_match_segments():
+    parts = segments(80, dense_at={10, 60})
+    text = " ".join(parts)
+    starts = [0]
+    for part in parts[:-1]:
+        starts.append(starts[-1] + len(part) + 1)
+    assert builder(60).build(transcript=text, boundaries=starts) == builder(60).build(segments=parts)
+    assert group_spans(text, starts, 130) == group_windows(parts, 130)
+
+
+def test_stats_count_tokens_saved():
+    b = builder(50, head_chars=4000)
+    b.build(segments=segments(200, dense_at={7}))
+    stats = b.stats()
+    assert stats["baseline_tokens"] == 1000
+    assert 0 < stats["excerpt_tokens"] <= 50
+    assert stats["tokens_saved"] == stats["baseline_tokens"] - stats["excerpt_tokens"]
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import pytest
+
+from executor import BoundedExecutor, ExecutorSaturated
+
+
+def test_runs_jobs_and_counts_them():
+    pool = BoundedExecutor("test", max_workers=2, max_pending=2)
+
+    async def main():
+        return await asyncio.gather(*(pool.run(pow, i, 2) for i in range(4)))
+
+    assert asyncio.run(main()) == [0, 1, 4, 9]
+    stats = pool.stats()
+    assert (stats["completed"], stats["queued"], stats["active"]) == (4, 0, 0)
+    pool.shutdown()
+
+
+def test_rejects_when_pending_queue_is_full():
+    pool = BoundedExecutor("test", max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.create_task(pool.run(release.wait))
+        queued = asyncio.create_task(pool.run(lambda: None))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await pool.run(lambda: None)
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(main())
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
+
+
+def test_cancelled_queued_job_frees_its_slot():
+    pool = BoundedExecutor("test", max_workers=1, max_pending=1)
+    release = threading.Event()
+    ran = []
+
+    async def main():
+        running = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        queued = asyncio.create_task(pool.run(ran.append, "queued"))
+        await asyncio.sleep(0.05)
+        assert pool.stats()["queued"] == 1
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert pool.stats()["queued"] == 0
+
+        release.set()
+        await running
+        # The slot is free again, and the abandoned job never ran
+        assert await pool.run(lambda: "ok") == "ok"
+
+    asyncio.run(main())
+    assert ran == []
+    assert pool.stats()["queued"] == 0
+    pool.shutdown()
@@ -0,0 +1,67 @@
+import asyncio
+import gc
+
+from microbatch import MicroBatcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_items_in_one_window_share_a_batch():
+    batches = []
+
+    async def run_batch(items):
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    async def main():
+        batcher = MicroBatcher("test", window_seconds=0.01, max_items=10, run_batch=run_batch)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3))), batcher.stats()
+
+    results, stats = run(main())
+    assert results == [0, 2, 4]
+    assert batches == [[0, 1, 2]]
+    assert (stats["batches"], stats["max_batch_size"]) == (1, 3)
+
+
+def test_full_batch_flushes_without_waiting():
+    async def main():
+        batcher = MicroBatcher("test", window_seconds=60, max_items=2, run_batch=lambda items: asyncio.sleep(0, items))
+        return await asyncio.wait_for(asyncio.gather(batcher.submit("a"), batcher.submit("b")), timeout=1)
+
+    assert run(main()) == ["a", "b"]
+
+
+def test_batch_error_reaches_every_caller():
+    async def run_batch(items):
+        raise RuntimeError("upstream down")
+
+    async def main():
+        batcher = MicroBatcher("test", window_seconds=0, max_items=10, run_batch=run_batch)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert [str(error) for error in run(main())] == ["upstream down"] * 2
+
+
+def test_running_batch_is_held_until_it_finishes():
+    release = None
+
+    async def run_batch(items):
+        await release.wait()
+        return items
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        batcher = MicroBatcher("test", window_seconds=0, max_items=1, run_batch=run_batch)
+        caller = asyncio.ensure_future(batcher.submit("x"))
+        await asyncio.sleep(0.01)
+        gc.collect()
+        running = batcher.stats()["running"]
+        release.set()
+        result = await asyncio.wait_for(caller, timeout=1)
+        await asyncio.sleep(0)
+        return running, result, batcher.stats()["running"]
+
+    assert run(main()) == (1, "x", 0)
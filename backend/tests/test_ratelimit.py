@@ -0,0 +1,136 @@
+import asyncio
+import time
+
+import pytest
+
+import ratelimit
+from ratelimit import LLMScheduler, TokenBucket, current_priority, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_token_bucket_refills_at_its_rate(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.delay(2, clock.now) == 0
+    bucket.take(2)
+    assert bucket.delay(1, clock.now) == pytest.approx(0.1)
+    clock.now += 0.05
+    assert bucket.delay(1, clock.now) == pytest.approx(0.05)
+    clock.now += 10
+    # Never above capacity, and oversized requests only wait for a full bucket
+    assert bucket.delay(5, clock.now) == 0
+
+
+def test_unlimited_bucket():
+    bucket = TokenBucket(rate=0, capacity=0)
+    bucket.take(1000)
+    assert bucket.delay(1000, time.monotonic()) == 0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3", 1.0) == 3.0
+    assert parse_retry_after("-2", 1.0) == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2026 07:28:00 GMT", 1.0) == 1.0
+    assert parse_retry_after(None, 1.5) == 1.5
+
+
+def test_interactive_calls_go_before_queued_batch_calls():
+    async def scenario():
+        scheduler = LLMScheduler("t", requests_per_second=20, request_burst=1, tokens_per_minute=0)
+        await scheduler.acquire(1)  # empties the bucket
+        order = []
+
+        async def call(name, priority):
+            await scheduler.acquire(1, priority=priority)
+            order.append(name)
+
+        batch = [asyncio.create_task(call(f"batch{i}", "batch")) for i in range(2)]
+        prefetch = asyncio.create_task(call("prefetch", "prefetch"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("interactive", None))  # current_priority's default
+        await asyncio.gather(*batch, prefetch, interactive)
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["interactive", "batch0", "batch1", "prefetch"]
+    assert stats["classes"]["batch"]["granted"] == 2
+    assert stats["classes"]["batch"]["max_wait_ms"] > stats["classes"]["interactive"]["max_wait_ms"]
+
+
+def test_priority_comes_from_the_context():
+    async def scenario():
+        scheduler = LLMScheduler("t", requests_per_second=0, request_burst=1, tokens_per_minute=0)
+        current_priority.set("prefetch")
+        await scheduler.acquire(1)
+        current_priority.set("bogus")
+        await scheduler.acquire(1)
+        return scheduler.stats()["classes"]["prefetch"]["granted"]
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_rate_limit_pauses_every_class():
+    async def scenario():
+        scheduler = LLMScheduler("t", requests_per_second=0, request_burst=1, tokens_per_minute=0)
+        scheduler.backoff(0.2)
+        blocked = scheduler.stats()["blocked_for_ms"]
+        assert not scheduler.try_acquire(1)
+        waits = await asyncio.gather(
+            scheduler.acquire(1, priority="interactive"), scheduler.acquire(1, priority="batch")
+        )
+        return blocked, waits, scheduler.stats()
+
+    blocked, waits, stats = asyncio.run(scenario())
+    assert blocked > 100
+    assert min(waits) >= 0.18
+    assert stats["throttled"] == 1
+
+
+def test_tokens_per_minute_budget():
+    async def scenario():
+        # 6000 tokens/minute = 100/s: a 6000-token burst leaves a 50-token call waiting ~0.5 s
+        scheduler = LLMScheduler("t", requests_per_second=0, request_burst=1, tokens_per_minute=6000)
+        assert await scheduler.acquire(6000) == 0
+        return await scheduler.acquire(50)
+
+    assert 0.4 <= asyncio.run(scenario()) < 1.0
+
+
+def test_try_acquire_never_waits():
+    async def scenario():
+        scheduler = LLMScheduler("t", requests_per_second=50, request_burst=1, tokens_per_minute=0)
+        assert scheduler.try_acquire(1)
+        assert not scheduler.try_acquire(1)
+        waiter = asyncio.create_task(scheduler.acquire(1, priority="batch"))
+        await asyncio.sleep(0)
+        # A queued call of the same class or above is served first
+        assert not scheduler.try_acquire(1, priority="prefetch")
+        await waiter
+        return scheduler.stats()["classes"]
+
+    classes = asyncio.run(scenario())
+    assert (classes["interactive"]["granted"], classes["batch"]["granted"]) == (1, 1)
+
+
+def test_cancelled_waiter_is_skipped():
+    async def scenario():
+        scheduler = LLMScheduler("t", requests_per_second=20, request_burst=1, tokens_per_minute=0)
+        await scheduler.acquire(1)
+        gone = asyncio.create_task(scheduler.acquire(1))
+        await asyncio.sleep(0)
+        gone.cancel()
+        wait = await scheduler.acquire(1)
+        return wait, scheduler.stats()["classes"]["interactive"]
+
+    wait, interactive = asyncio.run(scenario())
+    assert wait < 0.1
+    assert interactive["granted"] == 2
+    assert interactive["queued"] == 0
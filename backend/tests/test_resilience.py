@@ -0,0 +1,112 @@
+import asyncio
+import math
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, Deadline, DeadlineMiddleware, LatencyTracker, current_deadline, remaining_budget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, "time", fake)
+    return fake
+
+
+def test_breaker_opens_probes_and_closes(clock):
+    breaker = CircuitBreaker("t", failure_threshold=3, slow_call_seconds=1.0, reset_seconds=30)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    breaker.record(True, 5.0)  # too slow: a failure
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()       # the probe
+    assert not breaker.allow()   # only one at a time
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    assert breaker.stats()["opened"] == 1
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker("t", failure_threshold=1, slow_call_seconds=1.0, reset_seconds=30)
+    breaker.allow()
+    breaker.record(False, 0.1)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 29
+    assert not breaker.allow()
+
+
+def test_released_probe_lets_the_next_one_through(clock):
+    breaker = CircuitBreaker("t", failure_threshold=1, slow_call_seconds=1.0, reset_seconds=30)
+    breaker.allow()
+    breaker.record(False, 0.1)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.release()  # e.g. rate limited: no outcome either way
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_latency_percentiles():
+    tracker = LatencyTracker(min_samples=5)
+    for ms in (10, 20, 30, 40):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(95) is None
+    tracker.record(0.5)
+    assert tracker.percentile(50) == 0.03
+    assert tracker.percentile(100) == 0.5
+
+
+def test_deadline_extend():
+    deadline = Deadline(1.0)
+    deadline.extend(Deadline(5.0))
+    assert deadline.remaining() > 4
+    deadline.extend(None)
+    assert deadline.expires_at == math.inf
+
+
+@pytest.mark.parametrize("headers, query, expected", [
+    ([(b"x-deadline-ms", b"1500")], b"", 1.5),
+    ([], b"deadline_ms=800", 0.8),
+    ([(b"x-deadline-ms", b"oops")], b"", 2.0),
+    ([], b"", 2.0),
+])
+def test_middleware_sets_the_request_deadline(headers, query, expected):
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(remaining_budget())
+
+    middleware = DeadlineMiddleware(app, default_budget_ms=2000)
+    asyncio.run(middleware({"type": "http", "headers": headers, "query_string": query}, None, None))
+    assert seen[0] == pytest.approx(expected, abs=0.05)
+    assert current_deadline.get() is None
+
+
+def test_middleware_without_default_sets_no_deadline():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(remaining_budget())
+
+    asyncio.run(DeadlineMiddleware(app)({"type": "http", "headers": [], "query_string": b""}, None, None))
+    assert seen == [None]
@@ -0,0 +1,87 @@
+import asyncio
+
+from resilience import Deadline, current_deadline, remaining_budget
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["done"] * 5
+    assert calls == [1]
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_joining_caller_loosens_the_shared_deadline():
+    flight = SingleFlight("test")
+    seen = []
+
+    async def work():
+        await asyncio.sleep(0.02)  # let the second caller join
+        seen.append(remaining_budget())
+        return "done"
+
+    async def caller(budget_seconds):
+        current_deadline.set(Deadline(budget_seconds) if budget_seconds is not None else None)
+        return await flight.do("k", work)
+
+    async def main():
+        leader = asyncio.create_task(caller(0.5))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(caller(30))
+        await asyncio.gather(leader, follower)
+
+    asyncio.run(main())
+    assert seen[0] > 20
+
+
+def test_caller_without_deadline_removes_it():
+    flight = SingleFlight("test")
+    seen = []
+
+    async def work():
+        await asyncio.sleep(0.02)
+        seen.append(remaining_budget())
+
+    async def caller(deadline):
+        current_deadline.set(deadline)
+        await flight.do("k", work)
+
+    async def main():
+        leader = asyncio.create_task(caller(Deadline(0.5)))
+        await asyncio.sleep(0)
+        await asyncio.gather(leader, caller(None))
+
+    asyncio.run(main())
+    assert seen == [None]
+
+
+def test_leader_deadline_is_not_modified():
+    flight = SingleFlight("test")
+    leader_deadline = Deadline(0.5)
+    expires_at = leader_deadline.expires_at
+
+    async def work():
+        await asyncio.sleep(0.02)
+
+    async def caller(deadline):
+        current_deadline.set(deadline)
+        await flight.do("k", work)
+
+    async def main():
+        leader = asyncio.create_task(caller(leader_deadline))
+        await asyncio.sleep(0)
+        await asyncio.gather(leader, caller(None))
+
+    asyncio.run(main())
+    assert leader_deadline.expires_at == expires_at
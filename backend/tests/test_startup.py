@@ -0,0 +1,35 @@
+"""
+Cold-start regression test: import-to-ready time of a fresh interpreter
+(see benchmarks/startup.py). STARTUP_BUDGET_MS overrides the budget on
+slow CI machines.
+"""
+
+import os
+import statistics
+
+import pytest
+
+from benchmarks.startup import LAZY_MODULES, measure_once
+
+BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", 500))
+RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def runs():
+    return [measure_once() for _ in range(RUNS)]
+
+
+def test_import_to_ready_within_budget(runs):
+    total_ms = statistics.median(run["total_ms"] for run in runs)
+    assert total_ms <= BUDGET_MS, f"import-to-ready took {total_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+def test_lazy_modules_not_loaded_at_startup(runs):
+    for run in runs:
+        assert run["eager_lazy_modules"] == [], f"loaded before the first request (of {LAZY_MODULES})"
+
+
+def test_cache_databases_not_opened_at_import(runs):
+    for run in runs:
+        assert run["opened_at_import"] == []
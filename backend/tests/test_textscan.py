@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from textscan import JOIN_DIRECTLY_BELOW, JoinedScan, KeywordMatcher, has_digit
+
+TERM_LISTS = {
+    "greenwash": ["carbon neutral", "eco-friendly", "green", "clean", "natural"],
+    "evidence": ["data shows", "research", "study", "peer-reviewed", "ipcc"],
+    "clickbait": ["you won't believe", "shocking", "!!!", "exposed", "😱"],
+    "edu": ["research", "study", "data", "according to", "explains"],
+}
+
+
+def legacy_hits(text: str, terms) -> list:
+    """The predicate every heuristic used before KeywordMatcher"""
+    lowered = text.lower()
+    return [term for term in terms if term.lower() in lowered]
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher(TERM_LISTS)
+
+
+def assert_matches_legacy(scan, text):
+    for name, terms in TERM_LISTS.items():
+        expected = legacy_hits(text, terms)
+        assert scan.hits(name) == expected, name
+        assert scan.count(name) == len(expected)
+        assert scan.any(name) == bool(expected)
+        for term in expected:
+            assert scan.position(term.lower()) == text.lower().find(term.lower())
+
+
+@pytest.mark.parametrize("text", [
+    "green",                                   # whole document is a term
+    "Green energy, CLEAN air",                 # mixed case
+    "a greenhouse uncleaned unnatural",        # inside longer words (substring semantics)
+    "research-based; data.",                   # punctuation boundaries
+    "Peer-Reviewed study, according to IPCC",  # multi-word and hyphenated terms
+    "YOU WON'T BELIEVE this!!! 😱",            # apostrophes, symbols, emoji
+    "gre en cle an",                           # broken-up terms don't hit
+    "",
+])
+def test_scan_matches_legacy_predicates(matcher, text):
+    assert_matches_legacy(matcher.scan(text), text)
+
+
+def test_joined_title_and_description_match_legacy(matcher):
+    title, description = "Is this Carbon", "Neutral? The data shows it is ECO-friendly"
+    joined = f"{title} {description}"
+    assert_matches_legacy(matcher.scan_joined([title, description]), joined)
+    # "carbon neutral" only exists across the separator
+    assert "carbon neutral" in matcher.scan_joined([title, description]).hits("greenwash")
+    assert "carbon neutral" not in matcher.scan(title).hits("greenwash")
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_long_joined_scan_matches_legacy(matcher, seed):
+    rng = random.Random(seed)
+    vocabulary = ["the", "Green", "energy", "Research", "carbon", "neutral", "data", "shows",
+                  "STUDY", "according", "to", "cleaning", "plan", "😱", "!!", "!"]
+
+    def text(words):
+        return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+    parts = [text(3), text(20), text(JOIN_DIRECTLY_BELOW // 3)]
+    scan = matcher.scan_joined(parts)
+    assert isinstance(scan, JoinedScan)
+    assert_matches_legacy(scan, " ".join(parts))
+    assert scan.length == len(" ".join(parts))
+
+
+def test_term_spanning_a_long_join_is_found(matcher):
+    padding = "x" * JOIN_DIRECTLY_BELOW
+    parts = [padding + " peer-", "reviewed " + padding]
+    scan = matcher.scan_joined(parts, sep="")
+    assert isinstance(scan, JoinedScan)
+    assert scan.hits("evidence") == ["peer-reviewed"]
+    assert scan.position("peer-reviewed") == "".join(parts).find("peer-reviewed")
+
+
+def test_scans_are_memoized_per_document(matcher):
+    assert matcher.scan("Some text") is matcher.scan("Some text")
+
+
+@pytest.mark.parametrize("text", ["no digits", "year 2030", "²", "①", "٣", ""])
+def test_has_digit_matches_str_isdigit(text):
+    assert has_digit(text) == any(c.isdigit() for c in text)
@@ -0,0 +1,237 @@
+import os
+import statistics
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import topicindex
+from topicindex import RELATIVE_ACCURACY, TopicIndex, TopicSketch, normalize_topic
+
+HALF_LIFE = 14 * 86400
+
+
+@pytest.fixture
+def store(tmp_path):
+    return str(tmp_path / "topics.sqlite3")
+
+
+def rows(count, channels=3, start=0, views=10.0):
+    return [(f"v{i}", f"channel {i % channels}", 1000 * (i + 1), views) for i in range(start, start + count)]
+
+
+def test_normalize_topic():
+    assert normalize_topic("Green Energy!") == normalize_topic("energy and the green") == "energy green"
+    assert normalize_topic("The Energy of energy") == "energy"
+    assert normalize_topic("the a of") is None
+    assert normalize_topic(None) is None
+
+
+def test_snapshot_statistics():
+    index = TopicIndex("")
+    subscribers = [10, 200, 3000, 40_000, 500_000]
+    index.ingest("solar", [(f"v{i}", f"c{i}", subs, 1.0) for i, subs in enumerate(subscribers)])
+    snapshot = index.snapshot("solar")
+
+    assert snapshot.videos == pytest.approx(5, rel=1e-3)
+    assert snapshot.mean_subscribers == pytest.approx(statistics.mean(subscribers))
+    assert snapshot.median_subscribers == pytest.approx(3000, rel=RELATIVE_ACCURACY)
+    assert snapshot.subscriber_rank(3000) == pytest.approx(0.4)
+    assert snapshot.subscriber_percentile(3000) == pytest.approx(0.6)
+    assert snapshot.top10_share == 100.0
+    assert index.snapshot("solar", min_videos=6) is None
+    assert index.snapshot("wind") is None
+
+
+def test_duplicate_videos_count_once():
+    index = TopicIndex("")
+    assert index.ingest("solar", rows(5)) == 5
+    assert index.ingest("Solar!", rows(5)) == 0
+    assert index.stats()["duplicates"] == 5
+
+
+def test_top10_share_ignores_rows_without_a_channel():
+    index = TopicIndex("")
+    index.ingest("solar", rows(40))
+    assert index.snapshot("solar").top10_share == 100.0
+
+    index.ingest("solar", [(f"bulk{i}", None, 500, 0.0) for i in range(400)])
+    index.ingest("solar", [(f"title{i}", "", 500, 3.0) for i in range(400)])
+    snapshot = index.snapshot("solar")
+    assert snapshot.videos == pytest.approx(840, rel=1e-3)
+    assert snapshot.top10_share == 100.0
+
+
+def test_top10_share_unknown_without_channels():
+    index = TopicIndex("")
+    index.ingest("solar", [(f"v{i}", None, 500, 1.0) for i in range(10)])
+    assert index.snapshot("solar").top10_share is None
+
+
+def test_top10_share_of_views():
+    index = TopicIndex("")
+    index.ingest("solar", [(f"big{i}", f"big{i}", 100, 90.0) for i in range(10)])
+    index.ingest("solar", [(f"small{i}", f"small{i}", 100, 1.0) for i in range(40)])
+    assert index.snapshot("solar").top10_share == pytest.approx(900 / 940 * 100, abs=0.1)
+
+
+def test_sketch_decays_with_half_life():
+    old = TopicSketch(0.0)
+    old.add("a", 100, 1.0, now=0.0, half_life=HALF_LIFE, capacity=8)
+    old.add("b", 100, 1.0, now=HALF_LIFE, half_life=HALF_LIFE, capacity=8)
+    # The later video weighs twice the earlier one
+    assert old.channels["b"][0] == pytest.approx(2 * old.channels["a"][0])
+
+
+def test_sketch_merge_and_json():
+    first, second = TopicSketch(0.0), TopicSketch(HALF_LIFE)
+    first.add("a", 100, 4.0, now=0.0, half_life=HALF_LIFE, capacity=8)
+    second.add("b", 1000, 2.0, now=HALF_LIFE, half_life=HALF_LIFE, capacity=8)
+    second.add(None, 10, 6.0, now=HALF_LIFE, half_life=HALF_LIFE, capacity=8)
+    first.merge(second, HALF_LIFE, capacity=8)
+
+    assert first.landmark == HALF_LIFE
+    assert first.weight == pytest.approx(2.5)
+    assert first.channel_weight == pytest.approx(1.5)
+    assert first.channel_views == pytest.approx(4.0)
+    assert set(first.channels) == {"a", "b"}
+
+    restored = TopicSketch.from_json(first.to_json())
+    assert restored.to_json() == first.to_json()
+
+
+def test_sketch_merge_keeps_capacity():
+    sketch = TopicSketch(0.0)
+    for name in "abcdef":
+        other = TopicSketch(0.0)
+        other.add(name, 1, 1.0, now=0.0, half_life=HALF_LIFE, capacity=4)
+        sketch.merge(other, HALF_LIFE, capacity=4)
+    assert len(sketch.channels) == 4
+
+
+def test_flush_merges_workers(store):
+    first, second = TopicIndex(store), TopicIndex(store)
+    first.ingest("solar", rows(10))
+    second.ingest("solar", rows(10, start=10))
+    assert first.flush() == 1
+    assert second.flush() == 1
+    assert first.flush() == 0
+
+    reader = TopicIndex(store)
+    assert reader.snapshot("solar").videos == pytest.approx(20, rel=1e-3)
+    # A flush also makes the other workers' videos visible locally
+    assert second.snapshot("solar").videos == pytest.approx(20, rel=1e-3)
+
+
+def test_flush_of_evicted_topics(store):
+    index = TopicIndex(store, max_topics=2)
+    for topic in ("solar", "wind", "hydro"):
+        index.ingest(topic, rows(5, start=hash(topic) % 1000))
+    assert index.stats()["pending_topics"] == 1
+    assert index.flush() == 3
+    assert TopicIndex(store).snapshot("solar").videos == pytest.approx(5, rel=1e-3)
+
+
+def test_failed_flush_keeps_deltas(store, monkeypatch):
+    index = TopicIndex(store)
+    index.ingest("solar", rows(5))
+    monkeypatch.setattr(TopicSketch, "to_json", lambda self: object())  # not bindable: sqlite3 error
+    assert index.flush() == 0
+    assert index.stats()["flush_errors"] == 1
+    monkeypatch.undo()
+
+    assert index.snapshot("solar").videos == pytest.approx(5, rel=1e-3)
+    assert index.flush() == 1
+    assert TopicIndex(store).snapshot("solar").videos == pytest.approx(5, rel=1e-3)
+
+
+def test_store_opens_lazily(store):
+    index = TopicIndex(store)
+    assert index._db is None and not os.path.exists(store)
+    index.open()
+    assert index._db is not None
+
+
+def test_memory_only_without_path():
+    index = TopicIndex("")
+    index.ingest("solar", rows(3))
+    assert index.flush() == 0
+    assert index.snapshot("solar").videos == pytest.approx(3, rel=1e-3)
+
+
+def test_bias_receipt_uses_topic_index(store, monkeypatch):
+    monkeypatch.setattr(main, "topic_index", TopicIndex(store))
+    monkeypatch.setattr(main, "TOPIC_INDEX_MIN_VIDEOS", 20)
+    candidates = [
+        {"video_id": video_id, "channel_title": channel, "subscriber_count": subs, "views_per_day": views}
+        for video_id, channel, subs, views in rows(40)
+    ]
+
+    with TestClient(main.create_app()) as client:
+        client.post("/bias-receipt/batch", json={"query": "solar power", "candidates": candidates})
+        # A channel-less bulk pool on the same topic doesn't dilute the share
+        client.post("/quality-score/bulk", json={
+            "query": "power solar",
+            "video_ids": [f"bulk{i}" for i in range(400)],
+            "titles": ["solar"] * 400,
+            "subscriber_counts": [500] * 400,
+        })
+        stats = client.get("/topic-stats", params={"query": "solar power"}).json()
+        receipt = client.post("/bias-receipt", json={
+            "video_id": "new", "subscriber_count": 100, "query": "solar power",
+        }).json()
+
+    assert stats["usable"]
+    assert stats["stats"]["top10_share"] == 100.0
+    assert "Topic is 100% dominated by top 10 channels" in receipt["why_not_shown"]
+
+
+def test_sketch_bucket_bounds():
+    assert topicindex._bucket(0) == 0
+    assert topicindex._bucket(10 ** 12) == topicindex.NUM_BUCKETS - 1
+
+
+def test_unknown_views_stay_out_of_views_statistics():
+    index = TopicIndex("")
+    index.ingest("solar", [(f"q{i}", f"c{i}", 100, None) for i in range(10)])
+    index.ingest("solar", [("v1", "big", 100, 30.0), ("v2", "small", 100, 10.0)])
+    snapshot = index.snapshot("solar")
+    assert snapshot.videos == pytest.approx(12, rel=1e-3)
+    assert snapshot.mean_views_per_day == pytest.approx(20.0)
+    assert snapshot.top10_share == 100.0
+
+
+def test_later_row_adds_views_and_channel():
+    index = TopicIndex("")
+    # /quality-score and the bulk pool first, without views; then the bias receipts with them
+    index.ingest("solar", [(f"v{i}", f"c{i % 20}", 100, None) for i in range(30)])
+    index.ingest("solar", [(f"b{i}", None, 100, None) for i in range(10)])
+    assert index.snapshot("solar").mean_views_per_day == 0.0
+
+    receipts = [(f"v{i}", f"c{i % 20}", 100, 90.0 if i < 10 else 1.0) for i in range(30)]
+    receipts += [(f"b{i}", "late", 100, 5.0) for i in range(10)]
+    assert index.ingest("solar", receipts) == 0
+    assert index.ingest("solar", receipts) == 0
+
+    snapshot = index.snapshot("solar")
+    stats = index.stats()
+    assert (stats["ingested"], stats["amended"], stats["duplicates"]) == (40, 40, 40)
+    assert snapshot.videos == pytest.approx(40, rel=1e-3)
+    assert snapshot.mean_views_per_day == pytest.approx((900 + 20 + 50) / 40)
+    # Views-weighted: the top 10 of 21 channels hold c0..c9's 90/day (plus 1/day each for c0..c9)
+    assert snapshot.top10_share == pytest.approx(910 / 970 * 100, abs=0.1)
+    assert dict(snapshot.top_channels)["late"] == pytest.approx(10, rel=1e-3)
+
+
+def test_bias_receipt_views_count_after_quality_score(store, monkeypatch):
+    monkeypatch.setattr(main, "topic_index", TopicIndex(store))
+    with TestClient(main.create_app()) as client:
+        for i in range(30):
+            video = {"video_id": f"v{i}", "channel_title": f"c{i % 3}", "subscriber_count": 100, "query": "wind"}
+            client.post("/quality-score", json={**video, "title": "wind power"})
+            client.post("/bias-receipt", json={**video, "views_per_day": 40.0})
+        stats = client.get("/topic-stats", params={"query": "wind"}).json()["stats"]
+
+    assert stats["videos"] == pytest.approx(30, abs=0.1)
+    assert stats["mean_views_per_day"] == 40.0
+    assert main.topic_index.stats()["amended"] == 30
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+
+class Track(SimpleNamespace):
+    def translate(self, language):
+        return Track(language_code=language, is_generated=self.is_generated, translated_from=self.language_code)
+
+
+def track(language, generated=False, translations=()):
+    return Track(
+        language_code=language,
+        is_generated=generated,
+        translation_languages=[SimpleNamespace(language_code=code) for code in translations],
+    )
+
+
+def test_preferred_language_before_manual_tracks():
+    tracks = [track("en"), track("de", generated=True)]
+    assert main._select_track(tracks, ["de", "en"]) is tracks[1]
+
+
+def test_manual_before_generated_in_the_same_language():
+    tracks = [track("de", generated=True), track("de")]
+    assert main._select_track(tracks, ["de"]) is tracks[1]
+
+
+def test_later_preferred_language():
+    tracks = [track("fr"), track("en-US", generated=True)]
+    assert main._select_track(tracks, ["en", "en-US"]) is tracks[1]
+
+
+def test_translation_then_any_track(monkeypatch):
+    tracks = [track("fr", generated=True), track("es", translations=["de"])]
+    monkeypatch.setattr(main, "TRANSCRIPT_ALLOW_TRANSLATION", True)
+    assert main._select_track(tracks, ["de"]).translated_from == "es"
+    monkeypatch.setattr(main, "TRANSCRIPT_ALLOW_TRANSLATION", False)
+    assert main._select_track(tracks, ["de"]) is tracks[1]
+    assert main._select_track([], ["de"]) is None
@@ -0,0 +1,110 @@
+import sqlite3
+import struct
+
+import pytest
+
+from cache import TieredCache
+from transcript import (
+    CODECS,
+    CompactTranscript,
+    dump_cache_value,
+    load_cache_value,
+    resolve_codec,
+    segment_boundaries,
+)
+
+
+class Segment:
+    def __init__(self, text, start, duration):
+        self.text, self.start, self.duration = text, start, duration
+
+
+SEGMENTS = [
+    Segment("Welcome back", 0.0, 2.5),
+    Segment("today we look at solar – and wind ☀", 2.5, 4.0),
+    Segment("the data shows costs fell", 6.5, 3.25),
+]
+TEXT = " ".join(segment.text for segment in SEGMENTS)
+
+
+@pytest.fixture(params=CODECS)
+def transcript(request):
+    return CompactTranscript.from_segments("vid", "en", SEGMENTS, codec=request.param)
+
+
+def test_text_and_segments(transcript):
+    assert transcript.codec == resolve_codec(transcript.codec)
+    assert transcript.text == TEXT
+    assert len(transcript) == 3
+    assert transcript.segment(1) == ("today we look at solar – and wind ☀", 2.5, 4.0)
+    assert transcript.segment(2)[0] == "the data shows costs fell"
+    assert transcript.duration_seconds == 9.75
+
+
+def test_time_lookups(transcript):
+    assert transcript.segment_at(0.0) == 0
+    assert transcript.segment_at(3.0) == 1
+    assert transcript.segment_at(100) == 2
+    assert transcript.segment_at(-1) == -1
+    assert transcript.text_between(2.5, 6.5) == SEGMENTS[1].text
+    assert transcript.text_between(0, 100) == TEXT
+    assert transcript.text_between(7, 8) == ""
+
+
+def test_segment_boundaries_of_handed_out_text(transcript):
+    text = transcript.text
+    assert list(segment_boundaries(text)) == [0, 13, 49]
+    assert segment_boundaries("some other text") is None
+
+
+def test_bytes_round_trip(transcript):
+    restored = CompactTranscript.from_bytes(transcript.to_bytes())
+    assert (restored.video_id, restored.language, restored.codec) == ("vid", "en", transcript.codec)
+    assert restored.text == TEXT
+    assert list(restored.offsets) == list(transcript.offsets)
+    assert list(restored.starts) == list(transcript.starts)
+    assert list(restored.durations) == list(transcript.durations)
+
+
+def test_empty_transcript_round_trip():
+    empty = CompactTranscript.from_segments("vid", None, [])
+    restored = CompactTranscript.from_bytes(empty.to_bytes())
+    assert restored.text == ""
+    assert restored.duration_seconds is None
+
+
+def test_every_truncation_is_a_value_error(transcript):
+    data = transcript.to_bytes()
+    for cut in range(len(data)):
+        with pytest.raises(ValueError):
+            CompactTranscript.from_bytes(data[:cut])
+
+
+def test_bad_magic_and_codec_are_value_errors(transcript):
+    data = bytearray(transcript.to_bytes())
+    with pytest.raises(ValueError):
+        CompactTranscript.from_bytes(b"XXXX" + bytes(data[4:]))
+    data[4] = 200  # codec id
+    with pytest.raises(ValueError):
+        CompactTranscript.from_bytes(bytes(data))
+
+
+def test_cache_values_round_trip():
+    transcript = CompactTranscript.from_segments("vid", "en", SEGMENTS)
+    assert isinstance(dump_cache_value(transcript), bytes)
+    assert load_cache_value(dump_cache_value(transcript)).text == TEXT
+    assert load_cache_value(dump_cache_value({"success": False})) == {"success": False}
+
+
+@pytest.mark.parametrize("blob", [b"", b"CTR1", b"CTR1\x09" + bytes(12), struct.pack("<4sBIII", b"CTR1", 0, 1000, 0, 5)])
+def test_corrupt_disk_entry_is_a_cache_miss(tmp_path, blob):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = TieredCache("transcripts", path=path, dumps=dump_cache_value, loads=load_cache_value)
+    writer.set("k", CompactTranscript.from_segments("vid", "en", SEGMENTS))
+    db = sqlite3.connect(path)
+    db.execute('UPDATE "transcripts" SET value = ? WHERE key = ?', (blob, "k"))
+    db.commit()
+
+    reader = TieredCache("transcripts", path=path, dumps=dump_cache_value, loads=load_cache_value)
+    assert reader.get("k") is None
+    assert reader.stats()["misses"] == 1
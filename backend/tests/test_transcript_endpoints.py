@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+
+import main
+from transcript import CompactTranscript
+
+
+class Segment:
+    def __init__(self, text, start, duration):
+        self.text, self.start, self.duration = text, start, duration
+
+
+def store_transcript(video_id, languages, text="hello there"):
+    """Cache entries as a fetch for `languages` leaves them"""
+    track_key = f"{video_id}:track:en:manual"
+    main.transcript_cache.set(track_key, CompactTranscript.from_segments(video_id, "en", [Segment(text, 0, 2)]))
+    main.transcript_cache.set(main.transcript_cache_key(video_id, languages), {"track_key": track_key})
+
+
+def test_summary_url_hits_the_analyze_cache_entry(monkeypatch):
+    def no_fetch(*args):
+        raise AssertionError("the summary URL should be served from the cache")
+
+    monkeypatch.setattr(main, "_fetch_transcript", no_fetch)
+    store_transcript("vid-summary", main.DEFAULT_TRANSCRIPT_LANGUAGES)
+    summary = main.summarize_transcript(main.TranscriptResponse(success=True, video_id="vid-summary", transcript="hello there"))
+    assert summary.url == "/transcript/vid-summary?languages=en,en-US,en-GB"
+
+    with TestClient(main.create_app()) as client:
+        response = client.get(summary.url)
+    assert response.status_code == 200
+    assert response.json()["transcript"] == "hello there"
+    assert response.headers["cache-control"].startswith("public")
+
+
+def test_lang_parameter_still_resolves_its_own_languages(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "_fetch_transcript", lambda video_id, languages: calls.append(languages) or {
+        "success": False, "video_id": video_id, "error": "No transcript available for this video",
+    })
+    with TestClient(main.create_app()) as client:
+        client.get("/transcript/vid-lang", params={"lang": "de"})
+    assert calls == [["de", "en", "en-US"]]
+
+
+def test_compressed_transcript_revalidates_with_304():
+    store_transcript("vid-etag", main.DEFAULT_TRANSCRIPT_LANGUAGES, text="hello there " * 500)
+    url = "/transcript/vid-etag?languages=en,en-US,en-GB"
+    with TestClient(main.create_app()) as client:
+        first = client.get(url, headers={"Accept-Encoding": "gzip"})
+        etag = first.headers["etag"]
+        again = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        # The uncompressed representation's ETag validates the same body
+        plain = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": etag.replace("-gzip", "")})
+
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert etag.endswith('-gzip"')
+    assert again.status_code == 304
+    assert again.content == b""
+    assert "content-encoding" not in again.headers
+    assert plain.status_code == 304
@@ -0,0 +1,183 @@
+"""
+Shared keyword matching for the heuristic scorers.
+
+All term lists are compiled into one matcher. A document is lowercased
+once and each distinct term is searched at most once per document, on
+first use (terms shared between lists, e.g. 'research', are not searched
+twice). Scans are memoized per document, so the quality heuristic, the
+greenwashing heuristic and the sustainability gate reuse each other's work
+within a request, and scans of concatenated fields are built from the
+scans of the individual fields.
+
+Matching keeps the original semantics exactly: a term "hits" if it occurs
+anywhere as a lowercase substring, and each list's count is the number of
+its entries that hit.
+
+Note: for term lists of this size (~45 literals) one C-level str.find per
+term beats a single compiled regex alternation on 200 KB transcripts
+(measured ~6 ms for every term vs ~18-27 ms), and a pure-Python
+Aho-Corasick automaton would be a per-character Python loop, so the
+matcher is a memoized table of str.find calls over a once-normalized
+buffer.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+_ASCII_DIGIT = re.compile(r"\d")
+
+# Joined texts up to this many characters are scanned as one string
+JOIN_DIRECTLY_BELOW = 8192
+
+
+def has_digit(text: str) -> bool:
+    """Same result as any(c.isdigit() for c in text), without a Python-level loop"""
+    if _ASCII_DIGIT.search(text):
+        return True
+    # str.isdigit also accepts superscripts, circled digits etc. that \d
+    # does not; those can only appear in non-ASCII text
+    return not text.isascii() and any(map(str.isdigit, text))
+
+
+class BaseScan:
+    """Per-list queries on top of position(term)"""
+
+    matcher: "KeywordMatcher"
+
+    def position(self, term: str) -> int:
+        """Offset of the first occurrence of term in the lowercased text, or -1"""
+        raise NotImplementedError
+
+    @property
+    def has_digits(self) -> bool:
+        raise NotImplementedError
+
+    def hits(self, list_name: str) -> List[str]:
+        """Entries of the list that occur in the document, in list order"""
+        return [term for term in self.matcher.term_lists[list_name] if self.position(term) >= 0]
+
+    def count(self, list_name: str) -> int:
+        return sum(1 for term in self.matcher.term_lists[list_name] if self.position(term) >= 0)
+
+    def any(self, list_name: str) -> bool:
+        return any(self.position(term) >= 0 for term in self.matcher.term_lists[list_name])
+
+    def counts(self) -> Dict[str, int]:
+        return {name: self.count(name) for name in self.matcher.term_lists}
+
+    def first_positions(self, list_name: str) -> Dict[str, int]:
+        return {term: self.position(term) for term in self.hits(list_name)}
+
+
+class TextScan(BaseScan):
+    """One lowercased document; term positions are found on first use and memoized"""
+
+    __slots__ = ("matcher", "normalized", "length", "_positions", "_has_digits")
+
+    def __init__(self, matcher: "KeywordMatcher", text: str):
+        self.matcher = matcher
+        self.normalized = text.lower()
+        self.length = len(text)
+        self._positions: Dict[str, int] = {}
+        self._has_digits: Optional[bool] = None
+
+    def position(self, term: str) -> int:
+        index = self._positions.get(term)
+        if index is None:
+            index = self._positions[term] = self.normalized.find(term)
+        return index
+
+    @property
+    def has_digits(self) -> bool:
+        if self._has_digits is None:
+            self._has_digits = has_digit(self.normalized)
+        return self._has_digits
+
+
+class JoinedScan(BaseScan):
+    """
+    sep.join(parts), answered from the (memoized) scans of each part.
+
+    Only the short windows around each separator are searched directly,
+    which is enough to find terms that span a boundary.
+    """
+
+    def __init__(self, matcher: "KeywordMatcher", parts: Sequence[str], sep: str):
+        self.matcher = matcher
+        self._sep = sep
+        self._parts = []
+        self._windows = []
+        self._positions: Dict[str, int] = {}
+        self._has_digits: Optional[bool] = None
+
+        offset = 0
+        for i, part in enumerate(parts):
+            if i > 0:
+                self._windows.append(offset)
+                offset += len(sep)
+            self._parts.append((offset, matcher.scan(part)))
+            offset += len(part)
+        self.length = offset
+
+        # Text around each separator, long enough to hold any term crossing it
+        reach = matcher.max_term_length - 1
+        if self._windows and reach > 0:
+            joined = sep.join(parts)
+            self._windows = [
+                (max(0, boundary - reach), joined[max(0, boundary - reach):boundary + len(sep) + reach].lower())
+                for boundary in self._windows
+            ]
+        else:
+            self._windows = []
+
+    def position(self, term: str) -> int:
+        index = self._positions.get(term)
+        if index is not None:
+            return index
+
+        index = -1
+        for offset, part_scan in self._parts:
+            found = part_scan.position(term)
+            if found >= 0:
+                index = offset + found
+                break
+        for start, window in self._windows:
+            if 0 <= index <= start:
+                break
+            found = window.find(term)
+            if found >= 0 and (index < 0 or start + found < index):
+                index = start + found
+        self._positions[term] = index
+        return index
+
+    @property
+    def has_digits(self) -> bool:
+        if self._has_digits is None:
+            self._has_digits = (
+                any(part_scan.has_digits for _, part_scan in self._parts)
+                or (len(self._parts) > 1 and has_digit(self._sep))
+            )
+        return self._has_digits
+
+
+class KeywordMatcher:
+    """Named term lists compiled into a single table of distinct lowercase terms"""
+
+    def __init__(self, term_lists: Dict[str, Sequence[str]], cache_size: int = 32):
+        self.term_lists = {name: tuple(term.lower() for term in terms) for name, terms in term_lists.items()}
+        self.terms = tuple(dict.fromkeys(term for terms in self.term_lists.values() for term in terms))
+        self.max_term_length = max((len(term) for term in self.terms), default=0)
+        self.scan = lru_cache(maxsize=cache_size)(self._scan)
+
+    def _scan(self, text: str) -> TextScan:
+        """Scan one document (memoized on the text itself)"""
+        return TextScan(self, text)
+
+    def scan_joined(self, parts: Sequence[str], sep: str = " ") -> BaseScan:
+        """Scan sep.join(parts), reusing the memoized scans of each part"""
+        if sum(len(part) for part in parts) <= JOIN_DIRECTLY_BELOW:
+            # Short fields (title + description): composing per-part scans
+            # costs more than scanning the joined string
+            return self.scan(sep.join(parts))
+        return JoinedScan(self, parts, sep)
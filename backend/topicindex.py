@@ -0,0 +1,593 @@
+"""
+Per-topic channel statistics, maintained incrementally.
+
+Every video the backend analyzes is ingested under its normalized query
+("Green Energy!" and "energy green" are one topic). Each topic keeps a
+fixed-size, mergeable sketch, so memory does not grow with the number of
+videos, and at most max_topics sketches are held in memory:
+
+- a Space-Saving heavy-hitter table of the channels that appear most
+  (with their views/day), for the top-10 channels' share of the topic
+  among the videos whose channel is known,
+- a log-bucketed quantile sketch of subscriber counts (relative error
+  RELATIVE_ACCURACY), for the median and for a channel's rank, and
+- decayed sums for the means.
+
+Views/day may be unknown (None) for a video; such videos are left out of
+the views mean and share. A video seen again with a channel or views it
+lacked the first time gets just that added, without being counted twice.
+
+Everything decays with a half-life (forward decay: new events get
+exponentially larger weights relative to a landmark time, so updates
+never touch old data and ratios need no correction at read time).
+
+Sketches are persisted in SQLite. Each worker keeps the deltas it
+ingested since its last flush and merges them into the stored row in a
+transaction, so several workers sharing the database all contribute.
+Reads return a memoized TopicSnapshot: a median, mean, share or rank
+lookup is O(1).
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cache import CACHE_BUSY_TIMEOUT_MS, CACHE_DB_PATH
+
+RELATIVE_ACCURACY = 0.05
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+# Bucket 0 holds zero subscribers; bucket i >= 1 holds (gamma^(i-2), gamma^(i-1)]
+NUM_BUCKETS = int(math.ceil(math.log(1e10) / _LOG_GAMMA)) + 2
+
+# Rescale a sketch once its newest weights reach 2^RESCALE_AFTER_HALF_LIVES
+RESCALE_AFTER_HALF_LIVES = 64
+
+TOP_CHANNELS = 10
+
+# What a recently ingested video contributed (values of TopicIndex._seen)
+_HAS_CHANNEL = 1
+_HAS_VIEWS = 2
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or the to vs what why with".split()
+)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_topic(query: Optional[str]) -> Optional[str]:
+    """Canonical topic key: lowercase words, minus stopwords, deduplicated and sorted"""
+    words = sorted({word for word in _WORD.findall((query or "").lower()) if word not in STOPWORDS})
+    return " ".join(words) or None
+
+
+def _bucket(subscribers: float) -> int:
+    if subscribers < 1:
+        return 0
+    return min(NUM_BUCKETS - 1, int(math.ceil(math.log(subscribers) / _LOG_GAMMA)) + 1)
+
+
+def _bucket_value(index: int) -> float:
+    """Representative subscriber count of a bucket (within RELATIVE_ACCURACY of its members)"""
+    if index == 0:
+        return 0.0
+    return 2 * _GAMMA ** (index - 1) / (_GAMMA + 1)
+
+
+class TopicSketch:
+    """Decayed, mergeable aggregates for one topic"""
+
+    __slots__ = (
+        "landmark", "weight", "subs_sum", "views_sum", "views_weight", "buckets", "channels",
+        "channel_weight", "channel_views",
+    )
+
+    def __init__(self, landmark: float):
+        self.landmark = landmark
+        self.weight = 0.0      # videos
+        self.subs_sum = 0.0
+        self.views_sum = 0.0
+        self.views_weight = 0.0   # videos with known views/day
+        self.buckets = array("d", bytes(8 * NUM_BUCKETS))
+        # Space-Saving: channel -> [videos, views/day, overestimate]
+        self.channels: Dict[str, List[float]] = {}
+        # Videos with a known channel (and their views/day): the base of the top-10 share
+        self.channel_weight = 0.0
+        self.channel_views = 0.0
+
+    def empty(self) -> bool:
+        return self.weight == 0
+
+    def _rescale(self, landmark: float, half_life: float) -> None:
+        factor = 2 ** ((self.landmark - landmark) / half_life)
+        self.landmark = landmark
+        self.weight *= factor
+        self.subs_sum *= factor
+        self.views_sum *= factor
+        self.views_weight *= factor
+        self.channel_weight *= factor
+        self.channel_views *= factor
+        for i, value in enumerate(self.buckets):
+            if value:
+                self.buckets[i] = value * factor
+        for counter in self.channels.values():
+            counter[0] *= factor
+            counter[1] *= factor
+            counter[2] *= factor
+
+    def add(
+        self,
+        channel: Optional[str],
+        subscribers: int,
+        views_per_day: Optional[float],
+        now: float,
+        half_life: float,
+        capacity: int,
+        video_counted: bool = False,
+        channel_counted: bool = False,
+    ) -> None:
+        """
+        Count a video. For a video counted before (video_counted) only its
+        views/day, if not None, and its channel, unless channel_counted, are added.
+        """
+        if (now - self.landmark) / half_life > RESCALE_AFTER_HALF_LIVES:
+            self._rescale(now, half_life)
+        w = 2 ** ((now - self.landmark) / half_life)
+        if not video_counted:
+            self.weight += w
+            self.subs_sum += w * subscribers
+            self.buckets[_bucket(subscribers)] += w
+        views = 0.0
+        if views_per_day is not None:
+            views = w * views_per_day
+            self.views_sum += views
+            self.views_weight += w
+        if not channel:
+            return
+        if not channel_counted:
+            self.channel_weight += w
+        if views_per_day is not None:
+            self.channel_views += views
+
+        counter = self.channels.get(channel)
+        if counter is not None:
+            if not channel_counted:
+                counter[0] += w
+            counter[1] += views
+        elif channel_counted:
+            return  # evicted since; its views are lost with it
+        elif len(self.channels) < capacity:
+            self.channels[channel] = [w, views, 0.0]
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as error
+            smallest = min(self.channels, key=lambda name: self.channels[name][0])
+            floor = self.channels.pop(smallest)[0]
+            self.channels[channel] = [floor + w, views, floor]
+
+    def merge(self, other: "TopicSketch", half_life: float, capacity: int) -> None:
+        """Add other into this sketch (both are aligned to the later landmark)"""
+        if other.empty():
+            return
+        landmark = max(self.landmark, other.landmark)
+        if self.landmark != landmark:
+            self._rescale(landmark, half_life)
+        if other.landmark != landmark:
+            other = other.copy()
+            other._rescale(landmark, half_life)
+
+        self.weight += other.weight
+        self.subs_sum += other.subs_sum
+        self.views_sum += other.views_sum
+        self.views_weight += other.views_weight
+        self.channel_weight += other.channel_weight
+        self.channel_views += other.channel_views
+        for i, value in enumerate(other.buckets):
+            if value:
+                self.buckets[i] += value
+        for name, (count, views, error) in other.channels.items():
+            counter = self.channels.setdefault(name, [0.0, 0.0, 0.0])
+            counter[0] += count
+            counter[1] += views
+            counter[2] += error
+        if len(self.channels) > capacity:
+            kept = sorted(self.channels.items(), key=lambda item: -item[1][0])[:capacity]
+            self.channels = dict(kept)
+
+    def copy(self) -> "TopicSketch":
+        clone = TopicSketch(self.landmark)
+        clone.weight = self.weight
+        clone.subs_sum = self.subs_sum
+        clone.views_sum = self.views_sum
+        clone.views_weight = self.views_weight
+        clone.buckets = array("d", self.buckets)
+        clone.channels = {name: list(counter) for name, counter in self.channels.items()}
+        clone.channel_weight = self.channel_weight
+        clone.channel_views = self.channel_views
+        return clone
+
+    # ---------- persistence ----------
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "landmark": self.landmark,
+            "weight": self.weight,
+            "subs_sum": self.subs_sum,
+            "views_sum": self.views_sum,
+            "views_weight": self.views_weight,
+            "buckets": {i: value for i, value in enumerate(self.buckets) if value},
+            "channels": self.channels,
+            "channel_weight": self.channel_weight,
+            "channel_views": self.channel_views,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "TopicSketch":
+        data = json.loads(raw)
+        sketch = cls(data["landmark"])
+        sketch.weight = data["weight"]
+        sketch.subs_sum = data["subs_sum"]
+        sketch.views_sum = data["views_sum"]
+        for i, value in data["buckets"].items():
+            sketch.buckets[int(i)] = value
+        sketch.channels = {name: list(counter) for name, counter in data["channels"].items()}
+        # Rows stored before these were tracked count every video as having both
+        sketch.views_weight = data.get("views_weight", sketch.weight)
+        sketch.channel_weight = data.get("channel_weight", sketch.weight)
+        sketch.channel_views = data.get("channel_views", sketch.views_sum)
+        return sketch
+
+
+@dataclass(frozen=True)
+class TopicSnapshot:
+    """Read-only statistics of one topic; every query is O(1)"""
+    topic: str
+    videos: float               # decayed count as of the last update
+    mean_subscribers: float
+    median_subscribers: float
+    p90_subscribers: float
+    mean_views_per_day: float   # over the videos whose views/day are known
+    # % of views/day (or of videos, without views) held by the top 10 channels, among
+    # videos whose channel is known; None if there are none
+    top10_share: Optional[float]
+    top_channels: Tuple[Tuple[str, float], ...]
+    _cumulative: Tuple[float, ...]  # fraction of videos at or below each bucket
+
+    def subscriber_rank(self, subscribers: int) -> float:
+        """Fraction of the topic's videos from channels with fewer subscribers"""
+        index = _bucket(subscribers)
+        return self._cumulative[index - 1] if index > 0 else 0.0
+
+    def subscriber_percentile(self, subscribers: int) -> float:
+        """Fraction of the topic's videos from channels with at most this many subscribers"""
+        return self._cumulative[_bucket(subscribers)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "topic": self.topic,
+            "videos": round(self.videos, 1),
+            "mean_subscribers": round(self.mean_subscribers, 1),
+            "median_subscribers": round(self.median_subscribers, 1),
+            "p90_subscribers": round(self.p90_subscribers, 1),
+            "mean_views_per_day": round(self.mean_views_per_day, 1),
+            "top10_share": self.top10_share,
+            "top_channels": [
+                {"channel": name, "videos": round(count, 1)} for name, count in self.top_channels
+            ],
+        }
+
+
+def _snapshot(topic: str, sketch: TopicSketch, half_life: float) -> TopicSnapshot:
+    total = sketch.weight
+    cumulative = []
+    running = 0.0
+    for value in sketch.buckets:
+        running += value
+        cumulative.append(running / total)
+
+    def quantile(q: float) -> float:
+        return _bucket_value(min(bisect_left(cumulative, q), NUM_BUCKETS - 1))
+
+    # Space-Saving counts overestimate by up to their error; report the guaranteed part
+    ranked = sorted(
+        ((name, counter[0] - counter[2], counter[1]) for name, counter in sketch.channels.items()),
+        key=lambda item: -item[1],
+    )
+    top = ranked[:TOP_CHANNELS]
+    # Videos without a channel can't be attributed to any, so they aren't in the base
+    if sketch.channel_views > 0:
+        top_views = sorted((views for _, _, views in ranked), reverse=True)[:TOP_CHANNELS]
+        share: Optional[float] = sum(top_views) / sketch.channel_views
+    elif sketch.channel_weight > 0:
+        share = sum(count for _, count, _ in top) / sketch.channel_weight
+    else:
+        share = None
+    # Weights are relative to the landmark; express counts as of the newest event
+    scale = 2 ** ((sketch.landmark - time.time()) / half_life)
+
+    return TopicSnapshot(
+        topic=topic,
+        videos=total * scale,
+        mean_subscribers=sketch.subs_sum / total,
+        median_subscribers=quantile(0.5),
+        p90_subscribers=quantile(0.9),
+        mean_views_per_day=sketch.views_sum / sketch.views_weight if sketch.views_weight else 0.0,
+        top10_share=round(min(share, 1.0) * 100, 1) if share is not None else None,
+        top_channels=tuple((name, count * scale) for name, count, _ in top),
+        _cumulative=tuple(cumulative),
+    )
+
+
+class _Topic:
+    __slots__ = ("view", "delta", "snapshot")
+
+    def __init__(self, view: TopicSketch, delta: TopicSketch):
+        self.view = view      # stored state + local delta: what reads see
+        self.delta = delta    # ingested here since the last flush
+        self.snapshot: Optional[TopicSnapshot] = None
+
+
+class TopicIndex:
+    """Incrementally updated per-topic channel statistics, persisted in SQLite"""
+
+    def __init__(
+        self,
+        path: str = CACHE_DB_PATH,
+        name: str = "topic_stats",
+        max_topics: int = 500,
+        max_stored: int = 100000,
+        half_life_seconds: float = 14 * 86400,
+        heavy_hitters: int = 64,
+        dedup_size: int = 20000,
+    ):
+        self.path = path
+        self.name = name
+        self.max_topics = max_topics
+        self.max_stored = max_stored
+        self.half_life = half_life_seconds
+        self.capacity = heavy_hitters
+        self.dedup_size = dedup_size
+
+        self._topics: "OrderedDict[str, _Topic]" = OrderedDict()
+        # Deltas of topics evicted from memory before they were flushed
+        self._pending: Dict[str, TopicSketch] = {}
+        # Recently ingested (topic, video) pairs: re-analyzing a video doesn't count twice
+        self._seen: "OrderedDict[int, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "ingested": 0, "duplicates": 0, "amended": 0, "flushes": 0, "flushed_topics": 0, "flush_errors": 0, "dropped_deltas": 0,
+        }
+
+        self._pid: Optional[int] = None
+        self._db: Optional[sqlite3.Connection] = None
+
+    # ---------- storage ----------
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        """Open the store; on failure the index works in memory only"""
+        if not self.path:
+            return None
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(
+                self.path,
+                timeout=CACHE_BUSY_TIMEOUT_MS / 1000,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.name}" ('
+                "topic TEXT PRIMARY KEY, "
+                "state TEXT NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+            db.execute(f'CREATE INDEX IF NOT EXISTS "{self.name}_updated" ON "{self.name}" (updated_at)')
+            return db
+        except sqlite3.Error:
+            return None
+
+    def open(self) -> None:
+        """Open the store now rather than on first use (e.g. during app startup)"""
+        with self._lock:
+            self._disk()
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """The store connection (call with the lock held); opened lazily, reopened in a forked child"""
+        if self._pid != os.getpid():
+            if self._pid is not None:
+                # The parent flushes its own deltas; the child starts from the stored state
+                self._topics.clear()
+                self._pending.clear()
+            self._pid = os.getpid()
+            self._db = self._open()
+        return self._db
+
+    def _load(self, db: Optional[sqlite3.Connection], topic: str) -> Optional[TopicSketch]:
+        if db is None:
+            return None
+        try:
+            row = db.execute(f'SELECT state FROM "{self.name}" WHERE topic = ?', (topic,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return TopicSketch.from_json(row[0]) if row else None
+
+    # ---------- in-memory topics ----------
+
+    def _topic(self, topic: str, create: bool) -> Optional[_Topic]:
+        """The in-memory entry for topic (lock held), loading the stored state on first use"""
+        db = self._disk()
+        entry = self._topics.get(topic)
+        if entry is not None:
+            self._topics.move_to_end(topic)
+            return entry
+
+        stored = self._load(db, topic)
+        delta = self._pending.pop(topic, None)
+        if stored is None and delta is None and not create:
+            return None
+        now = time.time()
+        view = stored or TopicSketch(now)
+        if delta is not None:
+            view.merge(delta, self.half_life, self.capacity)
+        entry = _Topic(view, delta or TopicSketch(now))
+        self._topics[topic] = entry
+
+        while len(self._topics) > self.max_topics:
+            evicted_topic, evicted = self._topics.popitem(last=False)
+            if not evicted.delta.empty():
+                self._pending[evicted_topic] = evicted.delta
+        while len(self._pending) > self.max_topics:
+            # Flushes are falling behind; bound memory by dropping the oldest delta
+            del self._pending[next(iter(self._pending))]
+            self._counters["dropped_deltas"] += 1
+        return entry
+
+    # ---------- public API ----------
+
+    def ingest(
+        self,
+        query: Optional[str],
+        rows: Iterable[Tuple[str, Optional[str], int, Optional[float]]],
+    ) -> int:
+        """
+        Add analyzed videos under query's topic: (video_id, channel, subscribers, views/day)
+        rows, with None for an unknown channel or views/day. A video seen recently
+        only adds a channel or views/day it lacked. Returns how many videos were new.
+        """
+        topic = normalize_topic(query)
+        if topic is None:
+            return 0
+        now = time.time()
+        added = amended = 0
+        with self._lock:
+            entry = None
+            for video_id, channel, subscribers, views_per_day in rows:
+                channel = channel or None
+                views_per_day = max(0.0, float(views_per_day)) if views_per_day is not None else None
+                has = (_HAS_CHANNEL if channel else 0) | (_HAS_VIEWS if views_per_day is not None else 0)
+                key = hash((topic, video_id))
+                seen = self._seen.get(key)
+                if seen is not None:
+                    self._seen.move_to_end(key)
+                    if not has & ~seen:
+                        self._counters["duplicates"] += 1
+                        continue
+                    self._seen[key] = seen | has
+                    if seen & _HAS_VIEWS:
+                        views_per_day = None
+                    amended += 1
+                else:
+                    self._seen[key] = has
+                    if len(self._seen) > self.dedup_size:
+                        self._seen.popitem(last=False)
+                    added += 1
+
+                if entry is None:
+                    entry = self._topic(topic, create=True)
+                subscribers = max(0, int(subscribers or 0))
+                for sketch in (entry.view, entry.delta):
+                    sketch.add(
+                        channel, subscribers, views_per_day, now, self.half_life, self.capacity,
+                        video_counted=seen is not None,
+                        channel_counted=seen is not None and bool(seen & _HAS_CHANNEL),
+                    )
+
+            if added or amended:
+                entry.snapshot = None
+                self._counters["ingested"] += added
+                self._counters["amended"] += amended
+        return added
+
+    def snapshot(self, query: Optional[str], min_videos: float = 0) -> Optional[TopicSnapshot]:
+        """Current statistics for query's topic, or None if it has fewer than min_videos"""
+        topic = normalize_topic(query)
+        if topic is None:
+            return None
+        with self._lock:
+            entry = self._topic(topic, create=False)
+            if entry is None or entry.view.empty():
+                return None
+            if entry.snapshot is None:
+                entry.snapshot = _snapshot(topic, entry.view, self.half_life)
+            snapshot = entry.snapshot
+        return snapshot if snapshot.videos >= min_videos else None
+
+    def flush(self) -> int:
+        """
+        Merge local deltas into the stored sketches (blocking; run off the event loop).
+
+        The lock is held for the whole transaction: loads share the connection,
+        so they must not see its uncommitted (or rolled back) rows.
+        """
+        with self._lock:
+            db = self._disk()
+            if db is None:
+                return 0
+            deltas = dict(self._pending)
+            for topic, entry in self._topics.items():
+                if not entry.delta.empty():
+                    deltas[topic] = entry.delta
+            if not deltas:
+                return 0
+
+            merged: Dict[str, TopicSketch] = {}
+            try:
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    now = time.time()
+                    for topic, delta in deltas.items():
+                        row = db.execute(f'SELECT state FROM "{self.name}" WHERE topic = ?', (topic,)).fetchone()
+                        stored = TopicSketch.from_json(row[0]) if row else TopicSketch(delta.landmark)
+                        stored.merge(delta, self.half_life, self.capacity)
+                        db.execute(
+                            f'INSERT OR REPLACE INTO "{self.name}" (topic, state, updated_at) VALUES (?, ?, ?)',
+                            (topic, stored.to_json(), now),
+                        )
+                        merged[topic] = stored
+                    count = db.execute(f'SELECT COUNT(*) FROM "{self.name}"').fetchone()[0]
+                    if count > self.max_stored:
+                        db.execute(
+                            f'DELETE FROM "{self.name}" WHERE topic IN ('
+                            f'SELECT topic FROM "{self.name}" ORDER BY updated_at ASC LIMIT ?)',
+                            (count - self.max_stored,),
+                        )
+                    db.execute("COMMIT")
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error:
+                # The deltas stay where they are for the next attempt
+                self._counters["flush_errors"] += 1
+                return 0
+
+            self._pending.clear()
+            for topic, stored in merged.items():
+                entry = self._topics.get(topic)
+                if entry is not None:
+                    # Other workers' contributions become visible
+                    entry.view = stored
+                    entry.delta = TopicSketch(time.time())
+                    entry.snapshot = None
+            self._counters["flushes"] += 1
+            self._counters["flushed_topics"] += len(merged)
+        return len(merged)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "topics_in_memory": len(self._topics),
+                "pending_topics": len(self._pending),
+                "max_topics": self.max_topics,
+            }
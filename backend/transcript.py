@@ -0,0 +1,278 @@
+"""
+Compact in-memory transcripts.
+
+A fetched transcript used to be cached as a TranscriptResponse dict: the
+caption segments joined into one string, with every segment's timing
+thrown away. CompactTranscript keeps the same text once, contiguously,
+plus three typed arrays (segment start offsets into the text, and each
+segment's start time and duration), so a transcript costs little more
+than its text and time-aware analysis needs no re-fetch.
+
+The text can optionally be kept compressed (zstd if the `zstandard`
+package is installed, otherwise zlib); it is then decompressed on each
+access to .text. Uncompressed, .text hands out the stored string itself,
+so scorers work on it without any copy.
+
+Scorers only see plain strings. segment_boundaries(text) looks up the
+segment offsets of a text recently handed out by a CompactTranscript
+(memoized on the text itself, like the keyword scans), which lets the
+excerpt builders cut windows at caption boundaries instead of splitting
+the text into words.
+"""
+
+import json
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional: "zstd" falls back to zlib
+    zstandard = None
+
+CODECS = ("none", "zlib", "zstd")
+
+# How many recently handed-out texts segment_boundaries() remembers
+BOUNDARY_CACHE_SIZE = 32
+
+# magic, codec, segment count, metadata length, text length (chars)
+_HEADER = struct.Struct("<4sBIII")
+_MAGIC = b"CTR1"
+# offsets, starts, durations
+_COLUMNS = ("I", "f", "f")
+
+
+def resolve_codec(codec: str) -> str:
+    """The codec actually used for a configured name"""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown transcript codec {codec!r}, expected one of {CODECS}")
+    if codec == "zstd" and zstandard is None:
+        return "zlib"
+    return codec
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _le_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _le_array(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class CompactTranscript:
+    """One transcript: text stored once, segment offsets and timings in typed arrays"""
+
+    __slots__ = ("video_id", "language", "codec", "length", "offsets", "starts", "durations", "_data")
+
+    def __init__(
+        self,
+        video_id: str,
+        language: Optional[str],
+        text: str,
+        offsets: array,
+        starts: array,
+        durations: array,
+        codec: str = "none",
+    ):
+        self.video_id = video_id
+        self.language = language
+        self.codec = resolve_codec(codec)
+        self.length = len(text)
+        self.offsets = offsets      # 'I': where each segment starts in text
+        self.starts = starts        # 'f': segment start, seconds
+        self.durations = durations  # 'f': segment duration, seconds
+        self._data = text if self.codec == "none" else _compress(self.codec, text.encode("utf-8"))
+
+    @classmethod
+    def from_segments(
+        cls,
+        video_id: str,
+        language: Optional[str],
+        segments: Iterable[Any],
+        codec: str = "none",
+    ) -> "CompactTranscript":
+        """From caption snippets (anything with .text, .start and .duration)"""
+        pieces = []
+        offsets = array("I")
+        starts = array("f")
+        durations = array("f")
+        position = 0
+        for segment in segments:
+            offsets.append(position)
+            starts.append(segment.start)
+            durations.append(segment.duration)
+            pieces.append(segment.text)
+            position += len(segment.text) + 1
+        # Same text as joining the segments with single spaces
+        return cls(video_id, language, " ".join(pieces), offsets, starts, durations, codec)
+
+    # ---------- text ----------
+
+    @property
+    def text(self) -> str:
+        if self.codec == "none":
+            text = self._data
+        else:
+            text = _decompress(self.codec, self._data).decode("utf-8")
+        _remember_boundaries(text, self.offsets)
+        return text
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def segment(self, index: int) -> Tuple[str, float, float]:
+        """(text, start, duration) of one caption segment"""
+        text = self.text
+        end = self.offsets[index + 1] - 1 if index + 1 < len(self.offsets) else len(text)
+        return text[self.offsets[index]:end], self.starts[index], self.durations[index]
+
+    def segment_at(self, seconds: float) -> int:
+        """Index of the segment playing at `seconds` (the last one started), or -1"""
+        return bisect_right(self.starts, seconds) - 1
+
+    def text_between(self, start_seconds: float, end_seconds: float) -> str:
+        """Text of the segments that start within [start_seconds, end_seconds)"""
+        first = bisect_left(self.starts, start_seconds)
+        last = bisect_left(self.starts, end_seconds)
+        if last <= first:
+            return ""
+        text = self.text
+        end = self.offsets[last] - 1 if last < len(self.offsets) else len(text)
+        return text[self.offsets[first]:end]
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if not self.starts:
+            return None
+        # Timings are float32; round off the representation noise
+        return round(self.starts[-1] + self.durations[-1], 3)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by this transcript"""
+        arrays = sum(sys.getsizeof(values) for values in (self.offsets, self.starts, self.durations))
+        return sys.getsizeof(self) + sys.getsizeof(self._data) + arrays
+
+    # ---------- persistence ----------
+
+    def to_bytes(self) -> bytes:
+        """Serialized form for the disk cache tier"""
+        meta = json.dumps({"video_id": self.video_id, "language": self.language}).encode("utf-8")
+        payload = self._data.encode("utf-8") if self.codec == "none" else self._data
+        return b"".join((
+            _HEADER.pack(_MAGIC, CODECS.index(self.codec), len(self.offsets), len(meta), self.length),
+            meta,
+            _le_bytes(self.offsets),
+            _le_bytes(self.starts),
+            _le_bytes(self.durations),
+            payload,
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactTranscript":
+        """Inverse of to_bytes; raises ValueError for anything that isn't a complete serialized transcript"""
+        if len(data) < _HEADER.size:
+            raise ValueError("Truncated CompactTranscript header")
+        magic, codec_id, count, meta_length, length = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a serialized CompactTranscript")
+        if codec_id >= len(CODECS):
+            raise ValueError(f"Unknown transcript codec id {codec_id}")
+        codec = CODECS[codec_id]
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("Transcript was stored zstd-compressed but zstandard is not installed")
+        sizes = [count * array(typecode).itemsize for typecode in _COLUMNS]
+        if len(data) < _HEADER.size + meta_length + sum(sizes):
+            raise ValueError("Truncated CompactTranscript")
+        view = memoryview(data)  # slice the columns without intermediate copies
+        position = _HEADER.size
+        meta = json.loads(bytes(view[position:position + meta_length]))
+        position += meta_length
+
+        columns = []
+        for typecode, size in zip(_COLUMNS, sizes):
+            columns.append(_le_array(typecode, view[position:position + size]))
+            position += size
+
+        transcript = cls.__new__(cls)
+        transcript.video_id = meta["video_id"]
+        transcript.language = meta["language"]
+        transcript.codec = codec
+        transcript.length = length
+        transcript.offsets, transcript.starts, transcript.durations = columns
+        payload = bytes(view[position:])
+        if codec == "none":
+            transcript._data = payload.decode("utf-8")  # UnicodeDecodeError is a ValueError
+            if len(transcript._data) != length:
+                raise ValueError("Truncated CompactTranscript text")
+        else:
+            transcript._data = payload
+            try:
+                text = _decompress(codec, payload).decode("utf-8")
+            except Exception as e:  # zlib.error / zstd.ZstdError / UnicodeDecodeError
+                raise ValueError(f"Corrupt compressed CompactTranscript text: {e}") from e
+            if len(text) != length:
+                raise ValueError("Truncated CompactTranscript text")
+        return transcript
+
+# ============================================
+# SEGMENT BOUNDARY LOOKUP
+# ============================================
+
+_boundaries: "OrderedDict[str, array]" = OrderedDict()
+_boundaries_lock = threading.Lock()
+
+
+def _remember_boundaries(text: str, offsets: array) -> None:
+    with _boundaries_lock:
+        _boundaries[text] = offsets
+        _boundaries.move_to_end(text)
+        while len(_boundaries) > BOUNDARY_CACHE_SIZE:
+            _boundaries.popitem(last=False)
+
+
+def segment_boundaries(text: Optional[str]) -> Optional[array]:
+    """Segment start offsets of a text recently read from a CompactTranscript, if any"""
+    if not text:
+        return None
+    with _boundaries_lock:
+        return _boundaries.get(text)
+
+# ============================================
+# CACHE SERIALIZATION
+# ============================================
+
+def dump_cache_value(value: Any):
+    """TieredCache serializer: CompactTranscripts as bytes, anything else as JSON"""
+    if isinstance(value, CompactTranscript):
+        return value.to_bytes()
+    return json.dumps(value)
+
+
+def load_cache_value(raw) -> Any:
+    if isinstance(raw, bytes):
+        return CompactTranscript.from_bytes(raw)
+    return json.loads(raw)